@@ -0,0 +1,195 @@
+import threading
+from orders import Position
+from typing import Dict, List
+
+
+class AccountState():
+    """
+    Local copy of position and balance of a pair.
+
+    It is seeded with REST responses (seed) and kept
+    current with events of the futures user data stream
+    (handle_event), so position queries do not make
+    HTTP requests. Events are plain dicts, any source
+    (websocket or a fake stream) can feed them.
+
+    Liquidation price is not sent by the stream, it is
+    cleared when position changes and must be seeded
+    again. Available balance is not sent either, it is
+    kept but marked outdated when balance or position
+    changes, until next seed.
+
+    Init Attributes:
+    pair: Pair of position, like BTCUSDT
+    quote: Quote asset of balance, like USDT
+
+    Attributes:
+    ready: Tells if state was seeded and not invalidated
+    positions: Amount (signed) and entry price of each
+            position side (BOTH, LONG, SHORT)
+    leverage: Leverage of pair
+    liquidation_price: Liquidation price, None if unknown
+    balance: Wallet balance of quote
+    available_balance: Available balance of quote (last seeded)
+    available_fresh: Tells if available_balance was seeded
+                    after last balance or position change
+                    (of any pair, margin is shared)
+    open_orders: Status of orders not finished by id
+    updated_at: Event time (ms) of last update
+    lock: Lock used because stream runs on its own thread
+    """
+    finished_status = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+    def __init__(self, pair: str, quote: str) -> None:
+        self.pair = pair
+        self.quote = quote
+        self.lock = threading.Lock()
+        self.positions: Dict[str, Dict[str, float]] = dict()
+        self.leverage: int = None
+        self.liquidation_price: float = None
+        self.balance: float = None
+        self.available_balance: float = None
+        self.available_fresh = False
+        self.open_orders: Dict[int, str] = dict()
+        self.updated_at: int = None
+        self.ready = False
+
+    def invalidate(self) -> None:
+        """
+        Marks state as outdated until next seed
+        """
+        self.ready = False
+
+    def snapshot(self) -> tuple:
+        """
+        Values compared to detect drift
+        """
+        return (
+            {
+                side: (info["amount"], info["entry_price"])
+                for side, info in self.positions.items()
+            },
+            self.leverage,
+            self.balance
+        )
+
+    def seed(self, positions: List[dict], balances: List[dict]) -> bool:
+        """
+        Replaces state with REST responses of
+        futures_position_information and
+        futures_account_balance.
+
+        Returns True if state was ready and differed
+        from responses (drift).
+        """
+        with self.lock:
+            previous = self.snapshot() if self.ready else None
+            self.positions = dict()
+            self.liquidation_price = None
+            for info in positions:
+                if info["symbol"] != self.pair:
+                    continue
+                self.positions[info.get("positionSide", "BOTH")] = {
+                    "amount": float(info["positionAmt"]),
+                    "entry_price": float(info["entryPrice"])
+                }
+                self.leverage = int(info["leverage"])
+                if self.liquidation_price is None:
+                    self.liquidation_price = float(info["liquidationPrice"])
+            for info in balances:
+                if info["asset"] == self.quote:
+                    self.balance = float(info["balance"])
+                    self.available_balance = float(
+                        info["availableBalance"]
+                    )
+                    self.available_fresh = True
+            self.ready = True
+            return previous is not None and previous != self.snapshot()
+
+    def handle_event(self, event: dict) -> None:
+        """
+        Updates state with an event of user data stream
+        """
+        with self.lock:
+            match event.get("e"):
+                case "ACCOUNT_UPDATE":
+                    self.handle_account_update(event)
+                case "ORDER_TRADE_UPDATE":
+                    self.handle_order_update(event)
+                case "ACCOUNT_CONFIG_UPDATE":
+                    self.handle_config_update(event)
+                case "listenKeyExpired":
+                    self.ready = False
+                    return
+                case _:
+                    return
+            self.updated_at = event.get("E", self.updated_at)
+
+    def handle_account_update(self, event: dict) -> None:
+        """
+        Balance and position changes
+        """
+        for info in event["a"].get("B", []):
+            if info["a"] == self.quote:
+                self.balance = float(info["wb"])
+                self.available_fresh = False
+        for info in event["a"].get("P", []):
+            self.available_fresh = False
+            if info["s"] != self.pair:
+                continue
+            self.positions[info.get("ps", "BOTH")] = {
+                "amount": float(info["pa"]),
+                "entry_price": float(info["ep"])
+            }
+            self.liquidation_price = None
+
+    def handle_order_update(self, event: dict) -> None:
+        """
+        Order status changes
+        """
+        order = event["o"]
+        if order["s"] != self.pair:
+            return
+        if order["X"] in self.finished_status:
+            self.open_orders.pop(order["i"], None)
+        else:
+            self.open_orders[order["i"]] = order["X"]
+
+    def handle_config_update(self, event: dict) -> None:
+        """
+        Leverage changes
+        """
+        config = event.get("ac")
+        if config and config["s"] == self.pair:
+            self.leverage = int(config["l"])
+
+    def get_pos_info(self) -> dict:
+        """
+        Same response as FuturesTrader.get_pos_info
+        """
+        with self.lock:
+            response = {
+                "size_base": 0,
+                "position": Position.NEUTRAL,
+                "leverage": self.leverage
+            }
+            for info in self.positions.values():
+                size_base = info["amount"]
+                response["size_base"] += abs(size_base)
+                if size_base > 0:
+                    response["position"] = Position.LONG
+                elif size_base < 0:
+                    response["position"] = Position.SHORT
+            return response
+
+    @property
+    def entry_price(self) -> float:
+        """
+        Entry price of open position side, 0 if
+        there is none.
+        """
+        with self.lock:
+            for info in self.positions.values():
+                if info["amount"]:
+                    return info["entry_price"]
+            return 0.0
@@ -0,0 +1,446 @@
+from config.settings import (
+    TEST_API_KEY, TEST_SECRET_KEY,
+    API_KEY, SECRET_KEY,
+)
+import asyncio
+import aiohttp
+import threading
+from binance import AsyncClient, BinanceSocketManager
+from futures_trader import FuturesTrader
+from account_state import AccountState
+from helpers import (
+    INVALID_PERIOD,
+    ACCOUNT_STATE_DRIFT,
+    async_binance_run,
+    available_periods
+)
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict
+
+
+class AsyncFuturesTrader(FuturesTrader):
+    """
+    FuturesTrader whose trading session runs on asyncio,
+    so slow REST calls never delay the next kline.
+
+    Tasks of a session (see trade):
+    market_data: receives klines and puts them in klines
+    strategy: writes klines into data and runs run_strategy
+            in a worker thread, orders it creates are put
+            in orders instead of being sent
+    orders: sends orders in the same order they were created,
+            with AsyncClient (one pooled aiohttp session)
+    user_data: keeps account state current
+    reconcile: checks account state with REST
+    heartbeat: push request every heartbeat_period
+
+    Out of a session (before trade, or in stop_trading),
+    methods behave like FuturesTrader.
+
+    In a session account state is never fetched with the
+    sync client: it is seeded before tasks start, kept
+    current by user_data events and refreshed with the
+    async client (after MARKET orders if user_data is not
+    running, or when a value is missing or outdated)
+    without making strategy wait. Meanwhile strategy reads
+    last known values (e.g. available balance).
+
+    To use it with a strategy:
+    class AsyncStrategy(Strategy, AsyncFuturesTrader): pass
+
+    Init Attributes:
+    Same as FuturesTrader
+    queue_size: Max items waiting in klines and orders queues
+
+    Attributes:
+    async_client: Async Binance client
+    socket_manager: Websockets of async_client
+    session: HTTP session used by heartbeat
+    loop: Event loop of session
+    klines: Queue of (reception perf_counter, kline message)
+    orders: Queue of (coroutine function, kwargs)
+    tasks: Running tasks by name
+    refresh: Task seeding account state, see
+            refresh_account_state
+    trading: Tells if tasks are running
+    stopped: Set when session ends
+    """
+
+    def __init__(
+        self,
+        *args,
+        queue_size: int = 100,
+        **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.queue_size: int = queue_size
+        self.async_client: AsyncClient = None
+        self.socket_manager: BinanceSocketManager = None
+        self.session: aiohttp.ClientSession = None
+        self.loop: asyncio.AbstractEventLoop = None
+        self.klines: asyncio.Queue = None
+        self.orders: asyncio.Queue = None
+        self.tasks: Dict[str, asyncio.Task] = dict()
+        self.refresh: asyncio.Task = None
+        self.trading: bool = False
+        self.stopped = threading.Event()
+
+    @property
+    def streaming_account(self) -> bool:
+        """
+        Tells if account state is kept current
+        by user_data task
+        """
+        task = self.tasks.get("user_data")
+        return task is not None and not task.done()
+
+    def fetch_account_state(self) -> bool:
+        """
+        Seeds account state with REST. While trading
+        it is only scheduled (see refresh_account_state)
+        and False is returned.
+        """
+        if not self.trading:
+            return super().fetch_account_state()
+        self.refresh_account_state()
+        return False
+
+    def get_account_state(self) -> AccountState:
+        """
+        Gets account state. While trading cached state
+        is returned, a refresh is scheduled if it is
+        not ready.
+        """
+        if not self.trading:
+            return super().get_account_state()
+        if not self.account.ready:
+            self.refresh_account_state()
+        return self.account
+
+    def refresh_account_state(self) -> None:
+        """
+        Schedules a seed of account state with async
+        client in session loop, without waiting for it.
+        It can be called from any thread, a refresh is
+        not repeated while one is running.
+        """
+        self.loop.call_soon_threadsafe(self.start_refresh)
+
+    def start_refresh(self) -> None:
+        """
+        Starts refresh task if none is running
+        """
+        if self.refresh is None or self.refresh.done():
+            self.refresh = self.loop.create_task(
+                self.fetch_account_state_async(), name="refresh"
+            )
+            self.refresh.add_done_callback(self.task_done)
+
+    def enqueue_order(
+        self,
+        function: Callable[..., Awaitable[Any]],
+        **kwargs
+    ) -> None:
+        """
+        Puts an order action in orders queue from the
+        strategy thread. It waits only if queue is full.
+        """
+        asyncio.run_coroutine_threadsafe(
+            self.orders.put((function, kwargs)),
+            self.loop
+        ).result()
+
+    def submit_order(self, params: dict) -> dict:
+        """
+        Submits an order to Binance. While trading it is
+        put in orders queue and None is returned.
+        """
+        if not self.trading:
+            return super().submit_order(params=params)
+        self.enqueue_order(self.async_submit_order, params=params)
+
+    def cancel_all_open_orders(self):
+        """
+        Cancels all open orders. While trading it is
+        put in orders queue.
+        """
+        if not self.trading:
+            return super().cancel_all_open_orders()
+        self.enqueue_order(
+            self.async_client.futures_cancel_all_open_orders,
+            symbol=self.pair
+        )
+
+    def close_all_stop_market(self) -> None:
+        """
+        Closes all stop market orders. While trading it is
+        put in orders queue.
+        """
+        if not self.trading:
+            return super().close_all_stop_market()
+        self.enqueue_order(self.async_close_all_stop_market)
+
+    async def async_submit_order(self, params: dict) -> dict:
+        """
+        Submits an order with async client. After a
+        MARKET order account state is fetched again,
+        unless user_data is updating it.
+        """
+        start = perf_counter()
+        order_open = await async_binance_run(
+            self.async_client.futures_create_order,
+            **params
+        )
+        self.record_latency("order_ack", perf_counter() - start)
+        self.register_order(order_type=params["type"], order=order_open)
+        if params["type"] == "MARKET" and not self.streaming_account:
+            await self.fetch_account_state_async()
+        return order_open
+
+    async def async_close_all_stop_market(self) -> None:
+        """
+        Closes all stop market orders with async client
+        """
+        open_orders = await async_binance_run(
+            self.async_client.futures_get_open_orders,
+            symbol=self.pair
+        )
+        for order in open_orders:
+            if order["origType"] == "STOP_MARKET":
+                await async_binance_run(
+                    self.async_client.futures_cancel_order,
+                    symbol=self.pair,
+                    orderId=order["orderId"]
+                )
+
+    async def fetch_account_state_async(self) -> bool:
+        """
+        Seeds account state with async client.
+
+        Returns True if cached state had drifted.
+        """
+        positions = await async_binance_run(
+            self.async_client.futures_position_information,
+            symbol=self.pair
+        )
+        balances = await async_binance_run(
+            self.async_client.futures_account_balance
+        )
+        return self.account.seed(positions=positions, balances=balances)
+
+    async def market_data_task(self, interval: str) -> None:
+        """
+        Receives klines of pair
+        """
+        socket = self.socket_manager.futures_multiplex_socket(
+            ["{}@kline_{}".format(self.pair.lower(), interval)]
+        )
+        async with socket as stream:
+            while True:
+                msg = await stream.recv()
+                received = perf_counter()
+                msg = msg.get("data", msg)
+                if msg.get("e") != "kline":
+                    self.print_message(msg=repr(msg))
+                    continue
+                await self.klines.put((received, msg))
+
+    async def strategy_task(self) -> None:
+        """
+        Runs strategy with each kline. Candles are written
+        here (loop thread) while strategy thread is idle.
+        """
+        while True:
+            item = await self.klines.get()
+            if item is None:
+                return
+            received, msg = item
+            self.message_received = received
+            self.print_message(msg=".", end="", flush=True)
+            start_time, close, complete = self.store_kline(msg=msg)
+            try:
+                await asyncio.to_thread(
+                    self.run_strategy,
+                    period_completed=complete,
+                    last_price=close,
+                    date=start_time
+                )
+            except Exception as exception:
+                self.print_message(msg=repr(exception))
+            if complete:
+                self.print_message(msg="C", flush=True)
+
+    async def orders_task(self) -> None:
+        """
+        Sends order actions one by one
+        """
+        while True:
+            function, kwargs = await self.orders.get()
+            start = perf_counter()
+            try:
+                await function(**kwargs)
+            except Exception as exception:
+                self.print_message(msg=repr(exception))
+            finally:
+                self.orders.task_done()
+            self.record_latency("order_action", perf_counter() - start)
+
+    async def user_data_task(self) -> None:
+        """
+        Updates account state with user data stream,
+        listen key is kept alive by socket manager. If
+        it expires, a new stream is opened right away.
+        """
+        while True:
+            async with self.socket_manager.futures_user_socket() as stream:
+                await self.fetch_account_state_async()
+                while True:
+                    event = await stream.recv()
+                    self.account.handle_event(event)
+                    if event.get("e") == "listenKeyExpired":
+                        break
+                    if (
+                        not self.account.ready
+                        or self.account.liquidation_price is None
+                        or not self.account.available_fresh
+                    ):
+                        self.start_refresh()
+
+    async def reconcile_task(self) -> None:
+        """
+        Checks account state every reconcile_period
+        """
+        while True:
+            await asyncio.sleep(self.reconcile_period)
+            try:
+                if await self.fetch_account_state_async():
+                    self.print_message(ACCOUNT_STATE_DRIFT)
+            except Exception as exception:
+                self.print_message(msg=repr(exception))
+
+    async def heartbeat_task(self) -> None:
+        """
+        Sends push request every heartbeat_period
+        """
+        while True:
+            try:
+                async with self.session.get(self.heartbeat_url) as response:
+                    await response.read()
+            except Exception:
+                pass
+            await asyncio.sleep(self.heartbeat_period)
+
+    async def trade(
+        self,
+        interval: str,
+        initial_lev: int = 1,
+        num_candles: int = 1000,
+    ) -> None:
+        """
+        Trading session, it runs until stop_trading
+        """
+        if interval not in available_periods(num_candles).keys():
+            self.print_message(INVALID_PERIOD)
+            return
+        test = self.testnet
+        self.loop = asyncio.get_running_loop()
+        self.async_client = await AsyncClient.create(
+            api_key=TEST_API_KEY if test else API_KEY,
+            api_secret=TEST_SECRET_KEY if test else SECRET_KEY,
+            testnet=test
+        )
+        self.socket_manager = BinanceSocketManager(self.async_client)
+        self.session = aiohttp.ClientSession()
+        self.klines = asyncio.Queue(maxsize=self.queue_size)
+        self.orders = asyncio.Queue(maxsize=self.queue_size)
+
+        await asyncio.to_thread(
+            self.get_most_recent_data,
+            num_candles=num_candles,
+            interval=interval
+        )
+        await asyncio.to_thread(self.change_leverage, new_leverage=initial_lev)
+        await asyncio.to_thread(self.prepare_strategy)
+        await self.fetch_account_state_async()
+
+        coroutines = {
+            "market_data": self.market_data_task(interval),
+            "strategy": self.strategy_task(),
+            "orders": self.orders_task(),
+            "user_data": self.user_data_task(),
+            "reconcile": self.reconcile_task(),
+        }
+        if not self.testnet:
+            coroutines["heartbeat"] = self.heartbeat_task()
+        self.tasks = {
+            name: asyncio.create_task(coroutine, name=name)
+            for name, coroutine in coroutines.items()
+        }
+        for task in self.tasks.values():
+            task.add_done_callback(self.task_done)
+        self.trading = True
+        self.stopped.clear()
+        try:
+            await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        finally:
+            self.trading = False
+            if self.refresh is not None:
+                self.refresh.cancel()
+            self.account.invalidate()
+            await self.session.close()
+            await self.async_client.close_connection()
+            self.stopped.set()
+
+    def task_done(self, task: asyncio.Task) -> None:
+        """
+        Prints error of a task that ended unexpectedly
+        """
+        if not task.cancelled() and task.exception() is not None:
+            self.print_message(
+                msg="Task {} failed: {!r}".format(
+                    task.get_name(), task.exception()
+                )
+            )
+
+    def start_trading(
+        self,
+        interval: str,
+        initial_lev: int = 1,
+        num_candles: int = 1000,
+    ) -> None:
+        """
+        Starts trading session, blocks until it ends
+        """
+        asyncio.run(self.trade(
+            interval=interval,
+            initial_lev=initial_lev,
+            num_candles=num_candles
+        ))
+
+    async def stop_tasks(self) -> None:
+        """
+        Stops receiving klines, waits current strategy
+        and queued orders and cancels the rest of tasks
+        """
+        self.tasks["market_data"].cancel()
+        while not self.klines.empty():
+            self.klines.get_nowait()
+        self.klines.put_nowait(None)
+        await asyncio.wait([self.tasks["strategy"]])
+        await self.orders.join()
+        for task in self.tasks.values():
+            task.cancel()
+
+    def stop_trading(self, go_neutral: bool = False) -> None:
+        """
+        Stops trading. Call it from another thread
+        than the session.
+        """
+        if self.trading:
+            asyncio.run_coroutine_threadsafe(
+                self.stop_tasks(), self.loop
+            ).result()
+            self.stopped.wait()
+        self.cancel_all_open_orders()
+        if go_neutral:
+            self.go_neutral()
@@ -0,0 +1,116 @@
+"""
+Check of AccountState with a fake user data stream:
+recorded events of fixtures/user_data_events.jsonl are fed
+to handle_event one by one, after seeding state with REST
+responses of a neutral account, and state is asserted
+after each event. Available balance must be kept but
+marked outdated by balance and position changes. Time per event is printed too.
+
+Run from production directory:
+python -m benchmarks.account_state
+"""
+import os
+import json
+from time import perf_counter
+from typing import List
+from account_state import AccountState
+from orders import Position
+
+EVENTS_FILE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "user_data_events.jsonl"
+)
+
+POSITIONS = [{
+    "symbol": "BTCUSDT",
+    "positionAmt": "0.000",
+    "entryPrice": "0.0",
+    "leverage": "3",
+    "liquidationPrice": "0",
+    "positionSide": "BOTH"
+}]
+
+BALANCES = [{
+    "asset": "USDT",
+    "balance": "10000.00",
+    "availableBalance": "9000.00"
+}]
+
+# (size_base, position, leverage, open orders, ready) after each event
+EXPECTED = [
+    (0.0, Position.NEUTRAL, 5, set(), True),
+    (0.0, Position.NEUTRAL, 5, {8886774}, True),
+    (0.0, Position.NEUTRAL, 5, {8886774}, True),
+    (0.02, Position.LONG, 5, {8886774}, True),
+    (0.02, Position.LONG, 5, {8886774}, True),
+    (0.02, Position.LONG, 5, {8886774}, True),
+    (0.02, Position.LONG, 5, set(), True),
+    (0.02, Position.LONG, 5, set(), True),
+    (0.03, Position.SHORT, 5, set(), True),
+    (0.03, Position.SHORT, 5, set(), False),
+]
+
+
+def read_events() -> List[dict]:
+    """
+    Gets recorded events, one per line
+    """
+    with open(EVENTS_FILE) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def check_events(events: List[dict]) -> None:
+    """
+    Feeds events and asserts state after each one
+    """
+    account = AccountState(pair="BTCUSDT", quote="USDT")
+    assert not account.ready
+    assert not account.seed(positions=POSITIONS, balances=BALANCES)
+    assert account.ready and account.balance == 10000
+    assert account.available_fresh and account.available_balance == 9000
+
+    for event, expected in zip(events, EXPECTED, strict=True):
+        account.handle_event(event)
+        info = account.get_pos_info()
+        size_base, position, leverage, open_orders, ready = expected
+        state = (
+            round(info["size_base"], 8),
+            info["position"],
+            info["leverage"],
+            set(account.open_orders),
+            account.ready
+        )
+        assert state == expected, (event["e"], state, expected)
+
+    assert account.balance == 9998.93
+    assert account.entry_price == 41990.1
+    assert account.liquidation_price is None
+    assert not account.available_fresh
+    assert account.available_balance == 9000
+    assert account.updated_at == events[-2]["E"]
+
+    assert account.seed(positions=POSITIONS, balances=BALANCES) is False
+    account.handle_event(events[3])
+    assert account.seed(positions=POSITIONS, balances=BALANCES) is True
+    account.handle_event(events[5])
+    assert not account.available_fresh
+
+
+def time_events(events: List[dict], repeat: int = 10000) -> float:
+    """
+    Gets microseconds per event handled
+    """
+    account = AccountState(pair="BTCUSDT", quote="USDT")
+    account.seed(positions=POSITIONS, balances=BALANCES)
+    start = perf_counter()
+    for _ in range(repeat):
+        for event in events:
+            account.handle_event(event)
+    return (perf_counter() - start) / (repeat * len(events)) * 1e6
+
+
+if __name__ == "__main__":
+    events = read_events()
+    check_events(events)
+    print("{} events checked, {:.2f} us per event".format(
+        len(events), time_events(events)
+    ))
@@ -0,0 +1,141 @@
+"""
+Benchmark of kline message decoding: previous path of
+message_handler (json, pd.to_datetime and a dict per
+message) against KlineDecoder writing into a CandleBuffer.
+
+Messages are read from a file with one raw stream message
+per line (as received by message_handler), or generated
+like 1m klines of BTCUSDT if no file is given.
+
+Run from production directory:
+python -m benchmarks.kline_decoder [messages_file]
+"""
+import sys
+import json
+import random
+import pandas as pd
+from time import perf_counter
+from typing import List
+from candle_buffer import CandleBuffer
+from kline_decoder import KLINE_FIELDS, KlineDecoder, loads
+
+COLUMNS = list(KLINE_FIELDS.keys())
+
+
+def generate_messages(
+    candles: int = 200,
+    per_candle: int = 100,
+    pair: str = "BTCUSDT"
+) -> List[str]:
+    """
+    Gets raw kline messages, several updates per candle
+    and the last one complete.
+    """
+    random.seed(0)
+    messages = []
+    price = 40000.0
+    start = 1704067200000
+    for _ in range(candles):
+        high = low = oopen = price
+        volume = 0.0
+        for update in range(per_candle):
+            price += random.uniform(-5, 5)
+            high, low = max(high, price), min(low, price)
+            volume += random.uniform(0, 2)
+            messages.append(json.dumps({
+                "e": "kline",
+                "E": start + update * 600,
+                "s": pair,
+                "k": {
+                    "t": start,
+                    "T": start + 59999,
+                    "s": pair,
+                    "i": "1m",
+                    "f": 100,
+                    "L": 200 + update,
+                    "o": "{:.2f}".format(oopen),
+                    "c": "{:.2f}".format(price),
+                    "h": "{:.2f}".format(high),
+                    "l": "{:.2f}".format(low),
+                    "v": "{:.3f}".format(volume),
+                    "n": 100 + update,
+                    "x": update == per_candle - 1,
+                    "q": "{:.4f}".format(volume * price),
+                    "V": "{:.3f}".format(volume / 2),
+                    "Q": "{:.4f}".format(volume * price / 2),
+                    "B": "0"
+                }
+            }))
+        start += 60000
+    return messages
+
+
+def read_messages(filename: str) -> List[str]:
+    """
+    Gets kline messages of a file, one per line
+    """
+    with open(filename) as file:
+        lines = [line.strip() for line in file if line.strip()]
+    return [line for line in lines if '"kline"' in line]
+
+
+def previous_decoder(messages: List[str], capacity: int) -> None:
+    """
+    Decoding done by message_handler before KlineDecoder
+    """
+    candles = CandleBuffer(columns=COLUMNS, capacity=capacity)
+    for raw in messages:
+        msg = json.loads(raw)
+        pd.to_datetime(msg["k"]["t"], unit="ms")
+        new_row = {
+            column: float(msg["k"][field])
+            for column, field in KLINE_FIELDS.items()
+        }
+        candles.update(
+            date=int(msg["k"]["t"]),
+            values=list(new_row.values()),
+            complete=msg["k"]["x"]
+        )
+
+
+def kline_decoder(messages: List[str], capacity: int) -> None:
+    """
+    Decoding done by KlineDecoder
+    """
+    candles = CandleBuffer(columns=COLUMNS, capacity=capacity)
+    decoder = KlineDecoder(columns=COLUMNS)
+    for raw in messages:
+        decoder.store(msg=decoder.parse(raw), candles=candles)
+
+
+def best_time(function, messages: List[str], repeat: int = 3) -> float:
+    """
+    Gets best seconds of several runs of a decoder
+    """
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function(messages, capacity=1000)
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        messages = read_messages(sys.argv[1])
+    else:
+        messages = generate_messages()
+    print("{} messages, parser {}".format(
+        len(messages), loads.__module__
+    ))
+    print("decoder      | messages/s | us per message")
+    for name, function in (
+        ("previous", previous_decoder),
+        ("KlineDecoder", kline_decoder),
+    ):
+        seconds = best_time(function, messages)
+        print("{:12} | {:10.0f} | {:14.2f}".format(
+            name,
+            len(messages) / seconds,
+            seconds / len(messages) * 1e6
+        ))
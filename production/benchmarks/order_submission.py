@@ -0,0 +1,191 @@
+"""
+Check of order submission against a local fake futures
+REST endpoint (http.server): each MARKET order must make
+one POST /fapi/v1/order with newOrderRespType=RESULT and
+no GET, save its fill in history["last_pos_fill"] and add
+one order_ack latency sample. Sync (submit_order) and
+async (async_submit_order) paths are checked.
+
+Run from production directory:
+python -m benchmarks.order_submission
+"""
+import json
+import asyncio
+import threading
+from time import sleep
+from typing import List, Tuple
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from binance import AsyncClient
+from binance.client import Client
+from futures_trader import FuturesTrader
+from async_trader import AsyncFuturesTrader
+from orders import Position
+
+ACK_SECONDS = 0.02
+FILL_PRICE = "42000.10"
+
+
+class FakeFuturesAPI(BaseHTTPRequestHandler):
+    """
+    Answers ping and new order requests like Binance,
+    requests received are stored in requests.
+    """
+    requests: List[Tuple[str, str, dict]] = []
+
+    def log_message(self, *args) -> None:
+        return
+
+    def reply(self, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def get_params(self) -> dict:
+        """
+        Params of query and body of request
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        params = parse_qs(self.rfile.read(length).decode())
+        params.update(parse_qs(urlparse(self.path).query))
+        return {key: values[0] for key, values in params.items()}
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        self.requests.append(("GET", path, self.get_params()))
+        self.reply({})
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        params = self.get_params()
+        self.requests.append(("POST", path, params))
+        sleep(ACK_SECONDS)
+        order = {
+            "orderId": len(self.requests),
+            "symbol": params["symbol"],
+            "status": "NEW",
+            "type": params["type"],
+            "side": params["side"]
+        }
+        if params.get("newOrderRespType") == "RESULT":
+            order.update(
+                status="FILLED",
+                avgPrice=FILL_PRICE,
+                executedQty=params["quantity"]
+            )
+        self.reply(order)
+
+
+def local_client(client_class: type, url: str) -> Client:
+    """
+    Gets a testnet client of client_class that sends
+    requests to url
+    """
+    class LocalClient(client_class):
+        API_TESTNET_URL = url + "/api"
+        FUTURES_TESTNET_URL = url + "/fapi"
+    return LocalClient(api_key="key", api_secret="secret", testnet=True)
+
+
+class LocalFuturesTrader(FuturesTrader):
+    """
+    FuturesTrader connected to the fake endpoint
+    """
+    url: str = None
+
+    def init_client(self) -> Client:
+        return local_client(Client, self.url)
+
+
+class LocalAsyncFuturesTrader(AsyncFuturesTrader, LocalFuturesTrader):
+    """
+    AsyncFuturesTrader connected to the fake endpoint
+    """
+
+
+def futures_requests() -> List[Tuple[str, str, dict]]:
+    """
+    Requests received by the fake futures API
+    """
+    return [
+        request for request in FakeFuturesAPI.requests
+        if request[1].startswith("/fapi")
+    ]
+
+
+def check_trader(trader: FuturesTrader, orders: int, base: float) -> None:
+    """
+    Checks requests, history and latency after
+    orders MARKET orders of base
+    """
+    requests = futures_requests()
+    assert len(requests) == orders, requests
+    for method, path, params in requests:
+        assert (method, path) == ("POST", "/fapi/v1/order"), (method, path)
+        assert params["newOrderRespType"] == "RESULT", params
+    assert trader.history["last_pos_open"] == len(FakeFuturesAPI.requests)
+    assert trader.history["last_pos_fill"] == {
+        "status": "FILLED", "price": float(FILL_PRICE), "base": base
+    }, trader.history["last_pos_fill"]
+    assert trader.get_latency("order_ack")["count"] == orders
+
+
+def check_sync(orders: int = 5) -> dict:
+    """
+    Submits MARKET orders with submit_order
+    """
+    FakeFuturesAPI.requests.clear()
+    trader = LocalFuturesTrader(
+        pair="BTCUSDT", heartbeat_url="", verbose=False
+    )
+    for _ in range(orders):
+        trader.create_order(base=0.01, side=Position.LONG)
+    check_trader(trader=trader, orders=orders, base=0.01)
+    return trader.get_latency("order_ack")
+
+
+async def submit_async(trader: AsyncFuturesTrader, orders: int) -> None:
+    """
+    Submits MARKET orders with async client, user_data
+    is considered running so account state is not
+    fetched again.
+    """
+    trader.tasks["user_data"] = asyncio.get_running_loop().create_future()
+    trader.async_client = local_client(AsyncClient, trader.url)
+    try:
+        for _ in range(orders):
+            await trader.async_submit_order(params=trader.get_order_params(
+                base=0.02, side=Position.SHORT
+            ))
+    finally:
+        await trader.async_client.close_connection()
+
+
+def check_async(orders: int = 5) -> dict:
+    """
+    Submits MARKET orders with async_submit_order
+    """
+    trader = LocalAsyncFuturesTrader(
+        pair="BTCUSDT", heartbeat_url="", verbose=False
+    )
+    FakeFuturesAPI.requests.clear()
+    asyncio.run(submit_async(trader=trader, orders=orders))
+    check_trader(trader=trader, orders=orders, base=0.02)
+    return trader.get_latency("order_ack")
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeFuturesAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    LocalFuturesTrader.url = "http://127.0.0.1:{}".format(server.server_port)
+
+    print("path  | orders | order_ack p50 ms | max ms")
+    for name, check in (("sync", check_sync), ("async", check_async)):
+        latency = check()
+        print("{:5} | {:6} | {:16.1f} | {:6.1f}".format(
+            name, latency["count"], latency["p50"], latency["max"]
+        ))
+    server.shutdown()
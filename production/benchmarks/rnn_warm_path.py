@@ -0,0 +1,131 @@
+"""
+Check of RNN.calculate_for_row: the warm path (rolling
+window and traced function, see warm_up) must give the
+same prediction as the model.predict path for each row,
+reading rows from data or from candles (CandleBuffer
+views, as the live bot does while candles arrive).
+
+A small dense model with random weights and scalers fit
+on random candles stand in for the trained files. Time
+per row of both paths is printed too.
+
+Run from production directory:
+python -m benchmarks.rnn_warm_path
+"""
+import numpy as np
+import pandas as pd
+from time import perf_counter
+from keras import Input, Sequential, layers
+from sklearn.preprocessing import StandardScaler
+from candle_buffer import CandleBuffer
+from strategies import RNN
+
+COLUMNS = ["Close", "Volume"]
+
+
+def random_candles(rows: int = 300) -> pd.DataFrame:
+    """
+    Gets candles with a random walk close and volume
+    """
+    random = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Close": 40000 + random.normal(0, 20, rows).cumsum(),
+            "Volume": random.uniform(10, 100, rows)
+        },
+        index=pd.date_range("2024-01-01", periods=rows, freq="1h")
+    )
+
+
+def stand_in_rnn(data: pd.DataFrame, timestamps: int = 24) -> RNN:
+    """
+    Gets an RNN with a stand-in model and scalers
+    """
+    model = Sequential([
+        Input(shape=(timestamps, len(COLUMNS))),
+        layers.Flatten(),
+        layers.Dense(8, activation="tanh"),
+        layers.Dense(1)
+    ])
+    rnn = RNN(
+        data=data,
+        model_dir="",
+        scaler_dir="",
+        scaler_obj_dir="",
+        columns_to_use=COLUMNS,
+        predictions={}
+    )
+    rnn.model = model
+    rnn.timestamps = timestamps
+    rnn.scaler = StandardScaler().fit(data[COLUMNS])
+    rnn.scaler_obj = StandardScaler().fit(data[["Close"]])
+    return rnn
+
+
+def predictions(rnn: RNN, rows: range) -> tuple:
+    """
+    Gets predictions of rows calculated one by one
+    and mean seconds per row.
+    """
+    values = []
+    start = perf_counter()
+    for row in rows:
+        index = rnn.data.index[row]
+        rnn.calculate_for_row(index=index)
+        values.append(rnn.get_prediction(index))
+    return np.array(values), (perf_counter() - start) / len(rows)
+
+
+def candle_predictions(rnn: RNN, data: pd.DataFrame, rows: range) -> tuple:
+    """
+    Gets predictions of rows added one by one to
+    candles, and mean seconds per row.
+    """
+    candles = CandleBuffer.from_frame(
+        data=data.iloc[:rows[0]], capacity=200, columns=COLUMNS
+    )
+    rnn.candles = candles
+    rnn.warm_up()
+    values = []
+    seconds = 0.0
+    for row in rows:
+        index = data.index[row]
+        candles.update(
+            date=index.value // 1_000_000,
+            values=data[COLUMNS].iloc[row].to_numpy(),
+            complete=True
+        )
+        start = perf_counter()
+        rnn.calculate_for_row(index=index)
+        values.append(rnn.get_prediction(index))
+        seconds += perf_counter() - start
+        rnn.strategy(index=index)
+    rnn.candles = None
+    return np.array(values), seconds / len(rows)
+
+
+if __name__ == "__main__":
+    data = random_candles()
+    rnn = stand_in_rnn(data=data)
+    rows = range(len(data) - 100, len(data))
+
+    expected, predict_seconds = predictions(rnn, rows)
+
+    rnn.data = data.iloc[:rows[0]].copy()
+    rnn.warm_up()
+    rnn.data = data
+    warm, warm_seconds = predictions(rnn, rows)
+    candle, candle_seconds = candle_predictions(rnn, data, rows)
+
+    for values in (warm, candle):
+        assert np.allclose(values, expected, rtol=1e-5, atol=1e-3), (
+            np.abs(values - expected).max()
+        )
+    print("rows | max difference | model.predict us | warm us | candles us")
+    print("{:4} | {:14.2e} | {:16.1f} | {:7.1f} | {:10.1f}".format(
+        len(rows),
+        max(np.abs(warm - expected).max(), np.abs(candle - expected).max()),
+        predict_seconds * 1e6,
+        warm_seconds * 1e6,
+        candle_seconds * 1e6
+    ))
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from typing import List, Sequence
+
+
+class CandleBuffer():
+    """
+    Fixed capacity columnar ring buffer of live candles.
+
+    Updating the open candle is done in place and a new
+    candle overwrites the oldest one, both in O(1), so
+    memory and latency do not depend on how long the bot
+    runs.
+
+    Each row is written twice (at p and p + capacity), so
+    the last n rows are always a contiguous slice and
+    get returns views without copying.
+
+    Init Attributes:
+    columns: Names of float columns
+    capacity: Max candles stored
+
+    Attributes:
+    values: Rows of float columns, shape (2*capacity, columns)
+    dates: Open time of rows (ms since epoch)
+    complete: Tells if candle of each row is closed
+    position: Row of last candle in [0, capacity)
+    size: Candles stored
+    version: Increased on every update
+    """
+
+    def __init__(self, columns: List[str], capacity: int) -> None:
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.indexes = {column: i for i, column in enumerate(self.columns)}
+        self.values = np.full((2 * capacity, len(self.columns)), np.nan)
+        self.dates = np.zeros(2 * capacity, dtype=np.int64)
+        self.complete = np.zeros(2 * capacity, dtype=bool)
+        self.position = -1
+        self.size = 0
+        self.version = 0
+
+    @classmethod
+    def from_frame(
+        cls,
+        data: pd.DataFrame,
+        capacity: int = None,
+        columns: List[str] = None
+    ) -> "CandleBuffer":
+        """
+        Creates buffer with last rows of a dataframe indexed
+        by date, like data of FuturesTrader.
+        """
+        columns = columns or [
+            column for column in data.columns if column != "Complete"
+        ]
+        buffer = cls(columns=columns, capacity=capacity or len(data))
+        buffer.load(data)
+        return buffer
+
+    def __len__(self) -> int:
+        return self.size
+
+    def load(self, data: pd.DataFrame) -> None:
+        """
+        Replaces candles with last capacity rows of data
+        """
+        data = data.iloc[-self.capacity:]
+        rows = len(data)
+        values = data[self.columns].to_numpy(dtype=np.float64)
+        dates = pd.DatetimeIndex(data.index).asi8 // 1_000_000
+        complete = np.ones(rows, dtype=bool)
+        if "Complete" in data.columns:
+            complete = data["Complete"].astype("boolean").fillna(False).to_numpy(
+                dtype=bool
+            )
+        for start in (0, self.capacity):
+            self.values[start:start + rows] = values
+            self.dates[start:start + rows] = dates
+            self.complete[start:start + rows] = complete
+        self.position = rows - 1
+        self.size = rows
+        self.version += 1
+
+    def write(
+        self,
+        date: int,
+        values: Sequence[float],
+        complete: bool
+    ) -> None:
+        """
+        Writes last candle in both halves
+        """
+        for row in (self.position, self.position + self.capacity):
+            self.values[row] = values
+            self.dates[row] = date
+            self.complete[row] = complete
+        self.version += 1
+
+    def update(
+        self,
+        date: int,
+        values: Sequence[float],
+        complete: bool
+    ) -> bool:
+        """
+        Updates open candle (same date) or adds a new one
+        (later date) overwriting the oldest. Messages of
+        older candles are ignored.
+
+        date: Open time in ms since epoch
+        values: Values ordered like columns
+
+        Returns True if candle was stored.
+        """
+        if self.size and date < self.dates[self.position]:
+            return False
+        if not self.size or date > self.dates[self.position]:
+            self.position = (self.position + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        self.write(date=date, values=values, complete=complete)
+        return True
+
+    def get_slice(self, bars: int = None) -> slice:
+        """
+        Slice of last bars rows (all stored by default)
+        """
+        bars = self.size if bars is None else min(bars, self.size)
+        end = self.position + self.capacity + 1
+        return slice(end - bars, end)
+
+    def get(self, column: str, bars: int = None) -> np.ndarray:
+        """
+        View (not copied) of last bars of a column
+        """
+        return self.values[self.get_slice(bars), self.indexes[column]]
+
+    def get_dates(self, bars: int = None) -> np.ndarray:
+        """
+        View of open times (ms) of last bars
+        """
+        return self.dates[self.get_slice(bars)]
+
+    def last(self, column: str) -> float:
+        """
+        Value of column in last candle
+        """
+        return self.values[self.position, self.indexes[column]].item()
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        """
+        Open time of last candle
+        """
+        return pd.Timestamp(self.dates.item(self.position), unit="ms")
+
+    def to_frame(self, bars: int = None) -> pd.DataFrame:
+        """
+        Copy of last bars as a dataframe like data of
+        FuturesTrader (indexed by Date, Complete column)
+        """
+        rows = self.get_slice(bars)
+        data = pd.DataFrame(
+            self.values[rows].copy(),
+            columns=self.columns,
+            index=pd.DatetimeIndex(
+                pd.to_datetime(self.dates[rows], unit="ms"), name="Date"
+            )
+        )
+        data["Complete"] = self.complete[rows]
+        return data
@@ -13,16 +13,25 @@ from helpers import (
     ERROR_STOP_MARKET,
     INVALID_PERIOD,
     CHOOSE_ONE_WALLET_PRC,
+    ACCOUNT_STATE_DRIFT,
+    UNKNOWN_LIQUIDATION_PRICE,
     is_zero,
     available_periods
 )
 import pandas as pd
 import requests
 from orders import Position, MIN_ORDERS
+from account_state import AccountState
+from candle_buffer import CandleBuffer
+from kline_decoder import KlineDecoder
 from datetime import datetime
 import json
+import threading
+import numpy as np
+from collections import deque
+from time import perf_counter
 from helpers import binance_run
-from typing import Callable, Any
+from typing import Callable, Any, Deque, Dict
 
 
 class FuturesTrader():
@@ -36,18 +45,37 @@ class FuturesTrader():
                     heartbeat
     testnet: Tells if connection must be to testnet
     verbose: Print relevant actions
+    reconcile_period: Seconds between REST checks of
+                    account state while trading
 
     Attributes:
     client: Stores connection
     quote: stores the quote of the pair
     strategy: Stores the strategy
     stream:
-    data: Stores historical candle data
+    candles: Stores last candles (ring buffer), see
+            candle_buffer.py
+    data: Candles as a dataframe, built from candles
+        when they changed and data is read. It copies all
+        candles, use it to prepare strategies, debug or
+        export. Per candle, read views of candles (get).
+    kline_decoder: Writes kline messages into candles, see
+                kline_decoder.py
     min_base_open: min base to buy
     strategy: Stores strategy info for message handler.
     history: Saves actions like last orders submitted.
     crons: stores last time actions were executed.
+    latencies: stores last latency_samples measures (seconds)
+            of each latency metric, see record_latency.
+    message_received: perf_counter of last stream message,
+                    used to measure candle-to-signal latency.
+    account: Position and balance cache, see account_state.py.
+            It is used while user stream is running, otherwise
+            queries go to REST.
+    user_stream: User data stream that updates account
+    listen_key: Key of user data stream
     """
+    latency_samples: int = 1000
 
     def __init__(
         self,
@@ -55,23 +83,61 @@ class FuturesTrader():
         heartbeat_url: str,
         heartbeat_period: int = 60,
         testnet: bool = True,
-        verbose: bool = True
+        verbose: bool = True,
+        reconcile_period: int = 300
     ) -> None:
         self.pair: str = pair.upper()
         self.heartbeat_url: str = heartbeat_url
         self.heartbeat_period: int = heartbeat_period
         self.testnet: bool = testnet
         self.verbose: bool = verbose
+        self.reconcile_period: int = reconcile_period
 
         self.client: Client = self.init_client()
         self.quote = self.get_quote_symbol(self.pair)
         self.strategy: dict = dict()
         self.stream: UMFuturesWebsocketClient = None
-        self.data: pd.DataFrame = None
+        self.candles: CandleBuffer = None
+        self.data_frame: pd.DataFrame = None
+        self.data_version: int = None
+        self.kline_decoder = KlineDecoder(
+            columns=list(self.cols_to_use().keys())
+        )
         self.min_base_open = MIN_ORDERS.get_min_units(self.pair)
         self.strategy = None
         self.history = dict()
         self.crons = dict()
+        self.latencies: Dict[str, Deque[float]] = dict()
+        self.message_received: float = None
+        self.account = AccountState(pair=self.pair, quote=self.quote)
+        self.user_stream: UMFuturesWebsocketClient = None
+        self.listen_key: str = None
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        Gets candles as a dataframe (a copy). It is
+        rebuilt only if candles changed since last call,
+        so do not read it on every candle.
+        """
+        if self.candles is None:
+            return None
+        if self.data_version != self.candles.version:
+            self.data_frame = self.candles.to_frame()
+            self.data_version = self.candles.version
+        return self.data_frame
+
+    @data.setter
+    def data(self, data: pd.DataFrame) -> None:
+        """
+        Replaces candles with rows of a dataframe
+        """
+        self.candles = None
+        if data is not None:
+            self.candles = CandleBuffer.from_frame(
+                data=data,
+                columns=list(self.cols_to_use().keys())
+            )
 
     def init_client(self) -> Client:
         """
@@ -113,6 +179,31 @@ class FuturesTrader():
             return result
         return None
 
+    def record_latency(self, name: str, seconds: float) -> None:
+        """
+        Stores a measure of a latency metric in seconds.
+        """
+        if name not in self.latencies:
+            self.latencies[name] = deque(maxlen=self.latency_samples)
+        self.latencies[name].append(seconds)
+
+    def get_latency(self, name: str) -> dict:
+        """
+        Summary of a latency metric in milliseconds
+        over its last measures.
+        """
+        measures = np.array(self.latencies.get(name, ())) * 1000
+        if not len(measures):
+            return {"count": 0}
+        return {
+            "count": len(measures),
+            "last": measures[-1],
+            "mean": measures.mean(),
+            "p50": np.percentile(measures, 50),
+            "p95": np.percentile(measures, 95),
+            "max": measures.max()
+        }
+
     def print_message(self, msg: str, **kwargs) -> None:
         """
         Prints message if verbose is True.
@@ -140,29 +231,51 @@ class FuturesTrader():
                 return quote
         raise ValueError(INVALID_PAIR)
 
-    def get_pos_info(self) -> dict:
+    def fetch_account_state(self) -> bool:
         """
-        Gets real time position size.
+        Seeds account state with REST.
+
+        Returns True if cached state had drifted.
         """
-        infos = binance_run(
+        positions = binance_run(
             function=self.client.futures_position_information,
-            symbol=self.pair 
+            symbol=self.pair
+        )
+        balances = binance_run(
+            function=self.client.futures_account_balance
         )
-        response = {
-            "size_base": 0,
-            "position": Position.NEUTRAL
+        return self.account.seed(positions=positions, balances=balances)
 
-        }
-        for info in infos:
-            if info["symbol"] == self.pair:
-                size_base = float(info["positionAmt"])
-                response["size_base"] += abs(size_base)
-                if size_base > 0:
-                    response["position"] = Position.LONG
-                elif size_base < 0:
-                    response["position"] = Position.SHORT
-                response["leverage"] = int(info["leverage"])
-        return response
+    @property
+    def streaming_account(self) -> bool:
+        """
+        Tells if account state is kept current
+        by a user data stream
+        """
+        return self.user_stream is not None
+
+    def get_account_state(self) -> AccountState:
+        """
+        Gets account state. It is fetched with REST
+        if user stream is not running or state is
+        not ready.
+        """
+        if not self.streaming_account or not self.account.ready:
+            self.fetch_account_state()
+        return self.account
+
+    def reconcile_account_state(self) -> None:
+        """
+        Checks account state against REST
+        """
+        if self.fetch_account_state():
+            self.print_message(ACCOUNT_STATE_DRIFT)
+
+    def get_pos_info(self) -> dict:
+        """
+        Gets real time position size.
+        """
+        return self.get_account_state().get_pos_info()
 
     def get_position(self) -> Position:
         """
@@ -214,30 +327,16 @@ class FuturesTrader():
         Gets current quote balance.
         Includes the amount of positions
         """
-        info = binance_run(
-            function=self.client.futures_account_balance
-        )
-        balance = pd.DataFrame(info)
-        quote = float(
-            balance[balance["asset"] == self.quote].iloc[0]["balance"]
-        )
-        return quote
+        return self.get_account_state().balance
 
     def get_available_balance(self) -> float:
         """
         Gets current quote balance.
         Includes just wallet available balance.
         """
-        info = binance_run(
-            function=self.client.futures_account_balance
-        )
-        balance = pd.DataFrame(info)
-        quote = float(
-            balance[balance["asset"] == self.quote].iloc[0][
-                "availableBalance"
-            ]
-        )
-        return quote
+        if not self.get_account_state().available_fresh:
+            self.fetch_account_state()
+        return self.account.available_balance
 
     def get_current_leverage(self) -> int:
         """
@@ -260,27 +359,15 @@ class FuturesTrader():
         """
         Gets current liquidation price.
         """
-        info = binance_run(
-            function=self.client.futures_position_information,
-            symbol=self.pair
-        )
-        liq_price = float(
-            info[0]["liquidationPrice"]
-        )
-        return liq_price
+        if self.get_account_state().liquidation_price is None:
+            self.fetch_account_state()
+        return self.account.liquidation_price
 
     def get_entry_price(self) -> float:
         """
         Gets current entry price.
         """
-        info = binance_run(
-            function=self.client.futures_position_information,
-            symbol=self.pair
-        )
-        entry_price = float(
-            info[0]["entryPrice"]
-        )
-        return entry_price
+        return self.get_account_state().entry_price
 
     def change_leverage(
         self,
@@ -298,6 +385,7 @@ class FuturesTrader():
             symbol=self.pair,
             leverage=new_leverage
         )
+        self.account.invalidate()
         return self.get_current_leverage()
 
     def get_most_recent_data(
@@ -331,7 +419,11 @@ class FuturesTrader():
         for column in df.columns:
             df[column] = pd.to_numeric(df[column], errors="coerce")
         df["Complete"] = [True for row in range(len(df)-1)] + [pd.NA]
-        self.data = df
+        self.candles = CandleBuffer.from_frame(
+            data=df,
+            capacity=num_candles,
+            columns=list(self.cols_to_use().keys())
+        )
 
     def start_streaming(
         self,
@@ -354,6 +446,77 @@ class FuturesTrader():
         Stops streaming of Binance.
         """
         self.stream.stop()
+        self.stop_user_stream()
+
+    def start_user_stream(self) -> None:
+        """
+        Starts user data stream, it keeps account
+        state current.
+        """
+        self.listen_key = binance_run(
+            function=self.client.futures_stream_get_listen_key
+        )
+        kwargs = dict()
+        if self.testnet:
+            kwargs["stream_url"] = "wss://stream.binancefuture.com"
+        self.user_stream = UMFuturesWebsocketClient(
+            on_message=self.user_data_handler,
+            **kwargs
+        )
+        self.user_stream.user_data(listen_key=self.listen_key, id=2)
+        self.fetch_account_state()
+
+    def stop_user_stream(self) -> None:
+        """
+        Stops user data stream, account state
+        queries go back to REST.
+        """
+        if self.user_stream is None:
+            return
+        self.user_stream.stop()
+        self.user_stream = None
+        self.account.invalidate()
+
+    def restart_user_stream(self) -> None:
+        """
+        Starts a new user data stream with a new
+        listen key, account state is seeded again.
+        """
+        self.stop_user_stream()
+        self.start_user_stream()
+
+    def keepalive_user_stream(self) -> None:
+        """
+        Extends listen key of user data stream
+        (it expires after 60 minutes), a new stream
+        is started if it expired.
+        """
+        if self.listen_key is None:
+            self.restart_user_stream()
+            return
+        binance_run(
+            function=self.client.futures_stream_keepalive,
+            listenKey=self.listen_key
+        )
+
+    def user_data_handler(self, _, msg: dict) -> None:
+        """
+        Handles user data streaming. If listen key
+        expired, stream is restarted right away from
+        another thread (stopping a stream joins the
+        thread running this handler).
+        """
+        msg = json.loads(msg)
+        if self.skip_first_message(msg=msg):
+            return
+        self.account.handle_event(msg)
+        if msg.get("e") == "listenKeyExpired":
+            self.listen_key = None
+            threading.Thread(
+                target=self.restart_user_stream,
+                name="restart_user_stream",
+                daemon=True
+            ).start()
 
     def start_trading(
         self,
@@ -372,6 +535,7 @@ class FuturesTrader():
             interval=interval
         )
         self.change_leverage(new_leverage=initial_lev)
+        self.start_user_stream()
         self.prepare_strategy()
         self.start_streaming(interval)
 
@@ -428,47 +592,26 @@ class FuturesTrader():
             "Taker Buy Quote Asset Volume": TBQAV
         }
 
+    def store_kline(self, msg: dict) -> tuple:
+        """
+        Writes candle of a kline message into candles.
+
+        Returns start time, close price and if candle
+        is complete.
+        """
+        return self.kline_decoder.store(msg=msg, candles=self.candles)
+
     def message_handler(self, _, msg: dict) -> None:
         """
         Handles the streaming
         """
-        msg = json.loads(msg)
+        self.message_received = perf_counter()
+        msg = self.kline_decoder.parse(msg)
         if self.skip_first_message(msg=msg):
             return
         self.print_message(msg=".", end="", flush=True)
 
-        event_time = pd.to_datetime(msg["E"], unit="ms")
-        start_time = pd.to_datetime(msg["k"]["t"], unit="ms")
-        oopen = float(msg["k"]["o"])
-        high = float(msg["k"]["h"])
-        low = float(msg["k"]["l"])
-        close = float(msg["k"]["c"])
-        volume = float(msg["k"]["v"])
-
-        QAVol = float(msg["k"]["q"])
-        NoT = float(msg["k"]["n"])
-        TBBAV = float(msg["k"]["V"])
-        TBQAV = float(msg["k"]["Q"])
-
-        complete = msg["k"]["x"]
-
-        new_row = self.cols_to_use(
-            oopen=oopen,
-            high=high,
-            low=low,
-            close=close,
-            volume=volume,
-            QAVol=QAVol,
-            NoT=NoT,
-            TBBAV=TBBAV,
-            TBQAV=TBBAV
-        )
-
-        new_row["Complete"] = complete
-
-        col_names = list(new_row.keys())
-        col_values = list(new_row.values())
-        self.data.loc[start_time, col_names] = col_values
+        start_time, close, complete = self.store_kline(msg=msg)
         self.run_strategy(
             period_completed=complete,
             last_price=close,
@@ -476,6 +619,17 @@ class FuturesTrader():
         )
         if complete:
             self.print_message(msg="C", flush=True)
+        if self.streaming_account:
+            self.cron_action(
+                action_id="reconcile_account_state",
+                wait_seconds=self.reconcile_period,
+                function=self.reconcile_account_state,
+            )
+            self.cron_action(
+                action_id="keepalive_user_stream",
+                wait_seconds=30 * 60,
+                function=self.keepalive_user_stream,
+            )
         if not self.testnet:
             self.cron_action(
                 action_id="heartbeat",
@@ -510,14 +664,18 @@ class FuturesTrader():
         """
         Makes a stop market in order to lose less money.
         """
-        if cancel_previous:
-            self.close_all_stop_market()
         base = self.get_open_base()
         side = self.get_opposite_position()
+        if side != Position.NEUTRAL:
+            liq_price = self.get_liquidation_price()
+            if liq_price is None:
+                self.print_message(UNKNOWN_LIQUIDATION_PRICE)
+                return
+        if cancel_previous:
+            self.close_all_stop_market()
         if side == Position.NEUTRAL:
             self.print_message(ERROR_STOP_MARKET)
             return
-        liq_price = self.get_liquidation_price()
         entry_price = self.get_entry_price()
         rangee = entry_price - liq_price
         stopPrice = round(
@@ -527,14 +685,14 @@ class FuturesTrader():
         print("ENTRY:", str(entry_price))
         print("LIQ: ", str(liq_price))
         print("STOP:", str(stopPrice))
-        self.client.futures_create_order(
+        self.submit_order(params=dict(
             stopPrice=stopPrice,
             quantity=base,
             symbol=self.pair,
             side=side.value,
             type="STOP_MARKET",
             reduceOnly=True
-        )
+        ))
 
     def close_all_stop_market(self) -> None:
         """
@@ -571,7 +729,7 @@ class FuturesTrader():
         response = self.get_pos_info()
         return response["position"]
 
-    def create_order(
+    def get_order_params(
         self,
         base: float,
         side: Position,
@@ -579,9 +737,10 @@ class FuturesTrader():
         order_type: str = "MARKET",
         reduceOnly: bool = False,
         stopPrice: float = None
-    ):
+    ) -> dict:
         """
-        Creates order for Binance
+        Gets params of futures_create_order, None if
+        order is not valid.
 
         Notes:
         Binance accepts max 3 decimals.
@@ -597,27 +756,20 @@ class FuturesTrader():
                     str(base)
                 )
             )
-            return
+            return None
 
         match order_type:
             case "MARKET":
-                order_open = binance_run(
-                    function=self.client.futures_create_order,
+                return dict(
                     quantity=base,
                     symbol=self.pair,
                     side=side.value,
                     type=order_type,
                     reduceOnly=reduceOnly,
+                    newOrderRespType="RESULT",
                 )
-                pos_open = binance_run(
-                    function=self.client.futures_get_order,
-                    symbol=self.pair,
-                    orderId=order_open["orderId"]
-                )
-                self.history["last_pos_open"] = pos_open["orderId"]
             case "LIMIT":
-                order_open = binance_run(
-                    function=self.client.futures_create_order,
+                return dict(
                     quantity=base,
                     price=price,
                     symbol=self.pair,
@@ -626,10 +778,8 @@ class FuturesTrader():
                     reduceOnly=reduceOnly,
                     timeInForce="GTC",
                 )
-                self.history["last_limit_order"] = order_open["orderId"]
             case "TAKE_PROFIT":
-                order_open = binance_run(
-                    function=self.client.futures_create_order,
+                return dict(
                     quantity=base,
                     price=price,
                     stopPrice=stopPrice,
@@ -637,10 +787,74 @@ class FuturesTrader():
                     side=side.value,
                     type=order_type,
                 )
-                self.history["last_take_profit"] = order_open["orderId"]
             case _:
                 self.print_message(INVALID_ORDER_TYPE)
-                return
+                return None
+
+    def register_order(self, order_type: str, order: dict) -> None:
+        """
+        Saves id of an order submitted in history. Fill
+        of MARKET orders (RESULT response) is saved too.
+        """
+        order_id = order["orderId"]
+        match order_type:
+            case "MARKET":
+                self.history["last_pos_open"] = order_id
+                self.history["last_pos_fill"] = {
+                    "status": order.get("status"),
+                    "price": float(order.get("avgPrice", 0)),
+                    "base": float(order.get("executedQty", 0))
+                }
+            case "LIMIT":
+                self.history["last_limit_order"] = order_id
+            case "TAKE_PROFIT":
+                self.history["last_take_profit"] = order_id
+            case "STOP_MARKET":
+                self.history["last_stop_market"] = order_id
+
+    def submit_order(self, params: dict) -> dict:
+        """
+        Submits an order to Binance. Time until response
+        is recorded as order_ack latency.
+
+        Account state is not fetched again, while user
+        stream runs its events update position and balance.
+        """
+        start = perf_counter()
+        order_open = binance_run(
+            function=self.client.futures_create_order,
+            **params
+        )
+        self.record_latency("order_ack", perf_counter() - start)
+        self.register_order(order_type=params["type"], order=order_open)
+        return order_open
+
+    def create_order(
+        self,
+        base: float,
+        side: Position,
+        price: float = None,
+        order_type: str = "MARKET",
+        reduceOnly: bool = False,
+        stopPrice: float = None
+    ):
+        """
+        Creates order for Binance
+
+        Notes:
+        Binance accepts max 3 decimals.
+        """
+        params = self.get_order_params(
+            base=base,
+            side=side,
+            price=price,
+            order_type=order_type,
+            reduceOnly=reduceOnly,
+            stopPrice=stopPrice
+        )
+        if params is None:
+            return
+        self.submit_order(params=params)
 
     def go_neutral(
         self,
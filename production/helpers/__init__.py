@@ -1,4 +1,4 @@
 from .error_messages import * # noqa
 from .is_zero import is_zero # noqa
 from.available_periods import available_periods # noqa
-from .binance_connection import binance_run # noqa
\ No newline at end of file
+from .binance_connection import binance_run, async_binance_run # noqa
\ No newline at end of file
@@ -1,5 +1,6 @@
+import asyncio
 from retrying import retry
-from typing import Callable, Any
+from typing import Awaitable, Callable, Any
 from binance.exceptions import BinanceAPIException
 
 
@@ -32,3 +33,23 @@ def binance_run(function: Callable[..., Any], *args, **kwargs) -> Any:
     '''Run Binance API methods and handle errors'''
     result = function(*args, **kwargs)
     return result
+
+
+async def async_binance_run(
+    function: Callable[..., Awaitable[Any]],
+    *args,
+    **kwargs
+) -> Any:
+    '''
+    Run async Binance API methods and handle errors,
+    same retries as binance_run without blocking loop
+    '''
+    attempt = 1
+    while True:
+        try:
+            return await function(*args, **kwargs)
+        except Exception as exception:
+            if attempt >= 3 or not retry_predict_if(exception):
+                raise
+            await asyncio.sleep(min(2 ** attempt, 10))
+            attempt += 1
@@ -9,3 +9,7 @@ ERROR_STOP_MARKET = "Can't go stop market, no active position"
 INVALID_PERIOD = "Invalid period"
 
 CHOOSE_ONE_WALLET_PRC = "Must choose only one wallet balance"
+
+ACCOUNT_STATE_DRIFT = "Account state differed from Binance, reseeded"
+
+UNKNOWN_LIQUIDATION_PRICE = "Can't go stop market, liquidation price is being fetched"
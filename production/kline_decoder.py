@@ -0,0 +1,103 @@
+import json
+import numpy as np
+import pandas as pd
+from candle_buffer import CandleBuffer
+from typing import Dict, List, Tuple, Union
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        loads = ujson.loads
+    except ImportError:
+        loads = json.loads
+
+KLINE_FIELDS: Dict[str, str] = {
+    "Open": "o",
+    "High": "h",
+    "Low": "l",
+    "Close": "c",
+    "Volume": "v",
+    "Quote Asset Volume": "q",
+    "Number of Trades": "n",
+    "Taker Buy Base Asset Volume": "V",
+    "Taker Buy Quote Asset Volume": "Q"
+}
+
+NS_PER_MS = 1_000_000
+
+
+class KlineDecoder():
+    """
+    Decodes kline messages of Binance streams into a
+    CandleBuffer.
+
+    Messages are parsed with orjson or ujson if they are
+    installed (json otherwise). Fields are converted in
+    column order into a preallocated row, and the start
+    time is kept in ms: a Timestamp is only built (from
+    integer ns) when a new candle starts, not on every
+    message of the same candle.
+
+    Init Attributes:
+    columns: Columns of candles, keys of KLINE_FIELDS
+
+    Attributes:
+    fields: Kline field of each column
+    row: Preallocated values of last message
+    close_index: Position of Close in row
+    start: Start time (ms) of last candle
+    date: Start time of last candle
+    """
+
+    def __init__(self, columns: List[str]) -> None:
+        self.fields = [KLINE_FIELDS[column] for column in columns]
+        self.row = np.empty(len(self.fields))
+        self.close_index = self.fields.index("c")
+        self.start: int = None
+        self.date: pd.Timestamp = None
+
+    def parse(self, msg: Union[str, bytes, dict]) -> dict:
+        """
+        Parses a raw message, dicts are returned as they are
+        """
+        if isinstance(msg, dict):
+            return msg
+        return loads(msg)
+
+    def get_date(self, start: int) -> pd.Timestamp:
+        """
+        Start time of a candle from ms since epoch
+        """
+        if start != self.start:
+            self.start = start
+            self.date = pd.Timestamp(start * NS_PER_MS)
+        return self.date
+
+    def decode(self, kline: dict) -> None:
+        """
+        Writes fields of a kline (k of message) into row
+        """
+        row = self.row
+        for i, field in enumerate(self.fields):
+            row[i] = float(kline[field])
+
+    def store(
+        self,
+        msg: dict,
+        candles: CandleBuffer
+    ) -> Tuple[pd.Timestamp, float, bool]:
+        """
+        Writes candle of a parsed kline message into candles.
+
+        Returns start time, close price and if candle
+        is complete.
+        """
+        kline = msg["k"]
+        self.decode(kline)
+        start = int(kline["t"])
+        complete = kline["x"]
+        candles.update(date=start, values=self.row, complete=complete)
+        return self.get_date(start), self.row.item(self.close_index), complete
@@ -5,12 +5,15 @@ from pydantic import (
     ConfigDict
 )
 import keras
-from typing import List, Union
+import tensorflow as tf
+from time import perf_counter
+from typing import Callable, Dict, List, Union
 from pickle import load
 import numpy as np
 from keras import Sequential
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime
+from candle_buffer import CandleBuffer
 import pandas_ta as ta
 
 
@@ -29,6 +32,12 @@ class RNN(BaseModel):
     columns_filename_dir: File where columns are stored
     last_position: stores last position
     column_name: Column where prediction is saved
+    predictions: Last predictions by date, they are kept
+                when data is replaced by a newer dataframe
+    candles: Live candles (see candle_buffer.py). If set,
+            calculate_for_row and strategy read rows from
+            its views instead of data, and predictions are
+            only kept in predictions
 
     Post-Init Attributes:
     model: Architecture of model
@@ -37,6 +46,11 @@ class RNN(BaseModel):
     timestamps: Timestamps of model
     columns_to_use: columns to use of model
 
+    Warm Attributes (see warm_up):
+    predict_function: Traced inference function of model
+    window: Scaled inputs of last timestamps rows
+    window_date: Date of last row of window
+    last_inference: Seconds of last prediction
     """
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -48,6 +62,8 @@ class RNN(BaseModel):
     columns_filename_dir: str = None
     last_position: Position = Position.NEUTRAL
     column_name: str = "rnn"
+    predictions: Dict[pd.Timestamp, float] = {}
+    candles: CandleBuffer = None
 
     model: Sequential = None
     scaler: StandardScaler = None
@@ -55,6 +71,11 @@ class RNN(BaseModel):
     timestamps: int = None
     columns_to_use: List[str] = ['Close']
 
+    predict_function: Callable = None
+    window: np.ndarray = None
+    window_date: pd.Timestamp = None
+    last_inference: float = None
+
     def load_model(self) -> None:
         """
         Loads model and stores it on model
@@ -82,6 +103,54 @@ class RNN(BaseModel):
         """
         return row + 1 >= self.timestamps
 
+    def get_size(self) -> int:
+        """
+        Gets rows of candles if set, of data otherwise
+        """
+        if self.candles is None:
+            return len(self.data)
+        return len(self.candles)
+
+    def get_row(
+        self,
+        index: Union[datetime, pd.Timestamp]
+    ) -> int:
+        """
+        Gets position of a date in candles if set,
+        in data otherwise.
+        """
+        if self.candles is None:
+            return self.data.index.get_loc(index)
+        dates = self.candles.get_dates()
+        date = pd.Timestamp(index).value // 1_000_000
+        row = int(np.searchsorted(dates, date))
+        if row == len(dates) or dates[row] != date:
+            raise KeyError(index)
+        return row
+
+    def get_date(self, row: int) -> pd.Timestamp:
+        """
+        Gets date of a row
+        """
+        if self.candles is None:
+            return self.data.index[row]
+        return pd.Timestamp(self.candles.get_dates().item(row), unit="ms")
+
+    def get_inputs(self, start: int, stop: int) -> np.ndarray:
+        """
+        Gets values of columns_to_use from row start to
+        stop (excluded), from views of candles if set.
+        """
+        start = max(0, start)
+        if self.candles is None:
+            return self.data[self.columns_to_use].iloc[start:stop].to_numpy(
+                dtype=np.float64
+            )
+        return np.column_stack([
+            self.candles.get(column)[start:stop]
+            for column in self.columns_to_use
+        ])
+
     def calculate(self, force=False) -> None:
         """
         1. Gets data and scales it
@@ -109,6 +178,95 @@ class RNN(BaseModel):
         self.data[self.column_name] = self.scaler_obj.inverse_transform(
             predicted_position.reshape(-1, 1)
         )
+        self.predictions = self.data[self.column_name].iloc[-2:].to_dict()
+
+    def set_prediction(
+        self,
+        index: Union[datetime, pd.Timestamp],
+        prediction: float
+    ) -> None:
+        """
+        Stores prediction of a row in data (unless
+        candles are used) and in predictions (only last
+        two are kept).
+        """
+        if self.candles is None:
+            self.data.loc[index, self.column_name] = prediction
+        self.predictions[index] = prediction
+        while len(self.predictions) > 2:
+            self.predictions.pop(next(iter(self.predictions)))
+
+    def get_prediction(
+        self,
+        index: Union[datetime, pd.Timestamp]
+    ) -> float:
+        """
+        Gets prediction of a row
+        """
+        if index in self.predictions:
+            return self.predictions[index]
+        return self.data.loc[index, self.column_name]
+
+    def warm_up(self) -> None:
+        """
+        Prepares low latency predictions for calculate_for_row:
+        traces model once into a tf.function with a fixed
+        input shape and runs it, so graph building does not
+        happen on the first candle. Also fills window with
+        last rows of candles (or data).
+
+        Call it after load_model.
+        """
+        signature = tf.TensorSpec(
+            shape=(1, self.timestamps, len(self.columns_to_use)),
+            dtype=tf.float32
+        )
+        model = self.model
+        self.predict_function = tf.function(
+            lambda X: model(X, training=False),
+            input_signature=[signature]
+        )
+        self.load_window(row=self.get_size() - 1)
+        self.predict_function(tf.constant(self.window[np.newaxis]))
+
+    def scale_row(self, values: np.ndarray) -> np.ndarray:
+        """
+        Scales a row of inputs like scaler.transform,
+        without building a dataframe.
+        """
+        return (values - self.scaler.mean_) / self.scaler.scale_
+
+    def load_window(self, row: int) -> None:
+        """
+        Fills window with scaled inputs of the
+        timestamps rows ending at row.
+        """
+        inputs = self.get_inputs(start=row+1-self.timestamps, stop=row+1)
+        self.window = np.zeros(
+            (self.timestamps, len(self.columns_to_use)), dtype=np.float32
+        )
+        if len(inputs):
+            self.window[-len(inputs):] = self.scale_row(inputs)
+        self.window_date = self.get_date(row) if self.get_size() else None
+
+    def push_row(self, row: int) -> None:
+        """
+        Updates window so its last row is row of data.
+        The next candle is shifted in, the same candle
+        (still open) is overwritten and any other row
+        reloads window. Candles are matched by date, so
+        data can be replaced by a newer dataframe.
+        """
+        date = self.get_date(row)
+        if row > 0 and self.get_date(row-1) == self.window_date:
+            self.window[:-1] = self.window[1:]
+        elif date != self.window_date:
+            self.load_window(row=row)
+            return
+        self.window[-1] = self.scale_row(
+            self.get_inputs(start=row, stop=row+1)[0]
+        )
+        self.window_date = date
 
     def calculate_for_row(
         self,
@@ -116,19 +274,43 @@ class RNN(BaseModel):
     ) -> None:
         """
         Calculate for row...
+
+        If warm_up was called, the rolling window and the
+        traced function are used instead of model.predict.
+        Seconds used are stored in last_inference.
         """
-        index_num = self.data.index.get_loc(index)
-        inputs = self.data[index_num+1-self.timestamps:index_num+1].copy()[
-            self.columns_to_use
-        ]
-        inputs = self.scaler_obj.transform(inputs)
+        start = perf_counter()
+        index_num = self.get_row(index)
+        if self.predict_function is not None:
+            self.push_row(row=index_num)
+            predicted_position = self.predict_function(
+                tf.constant(self.window[np.newaxis])
+            ).numpy()
+            self.set_prediction(
+                index=index,
+                prediction=(
+                    predicted_position.item() * self.scaler_obj.scale_[0]
+                    + self.scaler_obj.mean_[0]
+                )
+            )
+            self.last_inference = perf_counter() - start
+            return
+        inputs = pd.DataFrame(
+            self.get_inputs(
+                start=index_num+1-self.timestamps, stop=index_num+1
+            ),
+            columns=self.columns_to_use
+        )
+        inputs = self.scaler.transform(inputs)
         X = np.array([inputs])
         predicted_position = self.model.predict(X, verbose=0)
-        self.data.loc[index, self.column_name] = (
-            self.scaler_obj.inverse_transform(
+        self.set_prediction(
+            index=index,
+            prediction=self.scaler_obj.inverse_transform(
                 predicted_position.reshape(-1, 1)
-            )[0]
+            )[0][0]
         )
+        self.last_inference = perf_counter() - start
 
     def strategy(
         self,
@@ -137,14 +319,17 @@ class RNN(BaseModel):
         '''
         Returns predicted position for a row.
         '''
-        idx_num = self.data.index.get_loc(index)
+        idx_num = self.get_row(index)
         if not self.enough_info_to_predict(row=idx_num):
             self.last_position = Position.NEUTRAL
             return self.last_position
-        prev_index = self.data.index[idx_num-1]
-        current_price = self.data.loc[index, "Close"]
-        previous_prediction = self.data.loc[prev_index, self.column_name]
-        current_prediction = self.data.loc[index, self.column_name]
+        prev_index = self.get_date(idx_num-1)
+        if self.candles is None:
+            current_price = self.data.loc[index, "Close"]
+        else:
+            current_price = self.candles.get("Close").item(idx_num)
+        previous_prediction = self.get_prediction(prev_index)
+        current_prediction = self.get_prediction(index)
         diff = current_price - previous_prediction
         real_prediction = current_prediction + diff
 
@@ -2,6 +2,7 @@ from futures_trader import FuturesTrader
 from strategies import RNN
 from orders import Position
 from datetime import datetime
+from time import perf_counter
 
 
 class Strategy(FuturesTrader):
@@ -36,6 +37,8 @@ class Strategy(FuturesTrader):
         )
         self.strategy["RNN"].load_model()
         self.strategy["RNN"].calculate()
+        self.strategy["RNN"].candles = self.candles
+        self.strategy["RNN"].warm_up()
         #self.strategy["invest"] = self.get_max_invest() / 10
 
     def run_strategy(
@@ -69,12 +72,22 @@ class Strategy(FuturesTrader):
             return
 
         period = 12
-        center_of_p = self.data.tail(period)["Close"].mean()
-        low_of_p = min(self.data.tail(period)["Low"])
-        high_of_p = max(self.data.tail(period)["High"])
+        center_of_p = self.candles.get("Close", period).mean()
+        low_of_p = self.candles.get("Low", period).min()
+        high_of_p = self.candles.get("High", period).max()
 
         self.strategy["RNN"].calculate_for_row(index=date)
         predicted_pos = self.strategy["RNN"].strategy(index=date)
+        self.record_latency(
+            "candle_to_signal", perf_counter() - self.message_received
+        )
+        self.record_latency("inference", self.strategy["RNN"].last_inference)
+        self.print_message(
+            "Signal latency: {:.1f} ms (inference {:.1f} ms)".format(
+                self.get_latency("candle_to_signal")["last"],
+                self.get_latency("inference")["last"]
+            )
+        )
 
         # if predicted_pos == Position.LONG and self.currently_short:
         #     self.go_neutral(
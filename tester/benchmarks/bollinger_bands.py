@@ -0,0 +1,67 @@
+"""
+Check and benchmark of BollingerBands.calculate_for_row
+(rolling window, one row at a time) against calculate
+(pandas rolling over all rows).
+
+Values calculated row by row (in arrays, then written to
+data with write_columns) must match calculate (np.allclose,
+nan in the same rows).
+
+Run from tester directory:
+python -m benchmarks.bollinger_bands
+"""
+import numpy as np
+import pandas as pd
+from time import perf_counter
+from strategies import BollingerBands
+
+
+def random_candles(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Gets candles with a random walk close
+    """
+    random = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {"Close": 20000 + random.normal(0, 30, rows).cumsum()},
+        index=pd.date_range("2024-01-01", periods=rows, freq="1h")
+    )
+
+
+def compare(rows: int, periods: int, dev: float = 2.0) -> tuple:
+    """
+    Gets max difference between both methods and
+    microseconds per row of calculate_for_row.
+    """
+    data = random_candles(rows)
+    expected = BollingerBands(data=data.copy(), dev=dev, periods=periods)
+    expected.calculate()
+    streamed = BollingerBands(data=data, dev=dev, periods=periods)
+    start = perf_counter()
+    for row in range(rows):
+        streamed.calculate_for_row(row=row)
+    seconds = perf_counter() - start
+    streamed.write_columns()
+
+    difference = 0.0
+    for column in expected.columns[1:]:
+        values = streamed.data[column].to_numpy()
+        expected_values = expected.data[column].to_numpy()
+        assert np.allclose(
+            values, expected_values, rtol=1e-9, atol=1e-9, equal_nan=True
+        ), column
+        assert np.allclose(
+            streamed.arrays[column][:rows], values, equal_nan=True
+        ), column
+        difference = max(
+            difference, np.nanmax(np.abs(values - expected_values))
+        )
+    return difference, seconds / rows * 1e6
+
+
+if __name__ == "__main__":
+    print(" rows | periods | max difference | us per row")
+    for rows, periods in ((2000, 20), (2000, 50), (20000, 200)):
+        difference, microseconds = compare(rows=rows, periods=periods)
+        print("{:5} | {:7} | {:14.2e} | {:10.1f}".format(
+            rows, periods, difference, microseconds
+        ))
@@ -0,0 +1,205 @@
+"""
+Offline check of KlineDownloader with a fake client that
+serves futures_klines like Binance (limit, startTime and
+endTime included, 1m candles generated from the date).
+
+Checks:
+- paging: chunks cover the window once, without gaps
+  or duplicates, with several workers
+- weight: tokens spent in the bucket match the weight of
+  the requests sent
+- 418/429: the bucket is drained and the chunk retried,
+  errors are raised after max_retries
+
+Run from tester directory:
+python -m benchmarks.kline_downloader
+"""
+import json
+import threading
+import pandas as pd
+from time import perf_counter
+from typing import List
+from binance.exceptions import BinanceAPIException
+from storage import KlineDownloader, TokenBucket
+
+MINUTE_MS = 60_000
+
+
+class FakeKlinesClient():
+    """
+    Serves 1m klines of any window. The first failures
+    requests fail with status_code (418 or 429).
+
+    Attributes:
+    requests: Params of each futures_klines call
+    """
+
+    def __init__(self, failures: int = 0, status_code: int = 429) -> None:
+        self.failures = failures
+        self.status_code = status_code
+        self.requests: List[dict] = []
+        self.lock = threading.Lock()
+
+    def futures_klines(
+        self,
+        symbol: str,
+        interval: str,
+        startTime: int,
+        endTime: int,
+        limit: int = 500
+    ) -> List[list]:
+        with self.lock:
+            self.requests.append(dict(
+                symbol=symbol,
+                interval=interval,
+                startTime=startTime,
+                endTime=endTime,
+                limit=limit
+            ))
+            if len(self.requests) <= self.failures:
+                raise BinanceAPIException(
+                    response=None,
+                    status_code=self.status_code,
+                    text=json.dumps({"code": -1003, "msg": "Rate limited"})
+                )
+        first = -(-startTime // MINUTE_MS) * MINUTE_MS
+        open_times = range(first, endTime + 1, MINUTE_MS)[:limit]
+        return [self.kline(open_time) for open_time in open_times]
+
+    def kline(self, open_time: int) -> list:
+        """
+        Kline with prices taken from open time
+        """
+        price = 20000 + open_time // MINUTE_MS % 1000
+        return [
+            open_time, str(price), str(price + 5), str(price - 5),
+            str(price + 1), "10.0", open_time + MINUTE_MS - 1, "200000.0",
+            100, "5.0", "100000.0", "0"
+        ]
+
+
+class CountingBucket(TokenBucket):
+    """
+    Token bucket that counts drains
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.drains = 0
+
+    def drain(self) -> None:
+        self.drains += 1
+        super().drain()
+
+
+def check_paging() -> float:
+    """
+    Downloads 10 days of 1m candles in 1000 candle chunks,
+    returns seconds used.
+    """
+    client = FakeKlinesClient()
+    bucket = TokenBucket(capacity=10**6, period=10**6)
+    downloader = KlineDownloader(
+        client=client, max_workers=4, chunk_candles=1000, bucket=bucket
+    )
+    start = pd.Timestamp("2024-01-01")
+    end = pd.Timestamp("2024-01-10 23:59")
+    began = perf_counter()
+    data = downloader.download("BTCUSDT", "1m", start, end)
+    seconds = perf_counter() - began
+
+    expected = pd.date_range(start, end, freq="1min")
+    assert data.index.equals(expected), (len(data), len(expected))
+    assert len(client.requests) == -(-len(expected) // 1000)
+    ranges = sorted(
+        (request["startTime"], request["endTime"])
+        for request in client.requests
+    )
+    for (_, previous_end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert next_start == previous_end + 1
+    assert all(request["limit"] == 1000 for request in client.requests)
+    closes = [
+        float(client.kline(open_time)[4])
+        for open_time in expected.asi8 // 10**6
+    ]
+    assert data["Close"].tolist() == closes
+
+    spent = bucket.capacity - bucket.tokens
+    expected_spent = len(client.requests) * downloader.get_weight(1000)
+    assert abs(spent - expected_spent) < 1, (spent, expected_spent)
+    return seconds
+
+
+def check_weights() -> None:
+    """
+    Weight of klines requests by limit
+    """
+    downloader = KlineDownloader(client=FakeKlinesClient())
+    weights = {
+        limit: downloader.get_weight(limit)
+        for limit in (99, 100, 499, 500, 1000, 1001, 1500)
+    }
+    assert weights == {
+        99: 1, 100: 2, 499: 2, 500: 5, 1000: 5, 1001: 10, 1500: 10
+    }, weights
+
+
+def check_rate_limit(status_code: int) -> None:
+    """
+    A chunk failing with status_code drains the bucket
+    and is retried until it succeeds. Each retry waits
+    until the bucket refills the request weight (2 tokens
+    of 10 per second, 0.2 seconds).
+    """
+    client = FakeKlinesClient(failures=2, status_code=status_code)
+    bucket = CountingBucket(capacity=10, period=1)
+    downloader = KlineDownloader(
+        client=client,
+        max_workers=1,
+        chunk_candles=100,
+        bucket=bucket,
+        max_retries=3,
+        retry_wait=0.01
+    )
+    start = perf_counter()
+    data = downloader.download(
+        "BTCUSDT", "1m",
+        pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-01 01:39")
+    )
+    seconds = perf_counter() - start
+    assert len(data) == 100
+    assert len(client.requests) == 3
+    assert bucket.drains == 2
+    assert seconds >= 2 * 0.2 * 0.9, seconds
+
+
+def check_retries_exhausted() -> None:
+    """
+    A chunk that keeps failing raises after max_retries
+    """
+    client = FakeKlinesClient(failures=10, status_code=418)
+    downloader = KlineDownloader(
+        client=client, max_workers=1, chunk_candles=100,
+        bucket=TokenBucket(capacity=1000, period=1),
+        max_retries=2, retry_wait=0.01
+    )
+    try:
+        downloader.download(
+            "BTCUSDT", "1m",
+            pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-01 00:59")
+        )
+    except BinanceAPIException as error:
+        assert error.status_code == 418
+    else:
+        raise AssertionError("Chunk did not fail")
+    assert len(client.requests) == 3
+
+
+if __name__ == "__main__":
+    check_weights()
+    seconds = check_paging()
+    check_rate_limit(status_code=429)
+    check_rate_limit(status_code=418)
+    check_retries_exhausted()
+    print("Paging, weights and 418/429 retries checked")
+    print("10 days of 1m candles downloaded in {:.2f} s".format(seconds))
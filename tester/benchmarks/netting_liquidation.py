@@ -0,0 +1,48 @@
+"""
+Benchmark of OrderManager.calculate_netting_liquidation with
+a growing number of stacked netting orders.
+
+Run from tester directory:
+python -m benchmarks.netting_liquidation
+"""
+import timeit
+from datetime import datetime
+from orders import OrderManager, OrderType, Position
+
+
+def stacked_order_manager(orders: int, leverage: int = 10) -> OrderManager:
+    """
+    Gets an order manager with several LONG orders opened
+    at increasing prices.
+    """
+    order_manager = OrderManager(
+        verbose=False, pair="BTCUSDT", leverage=leverage
+    )
+    for number in range(orders):
+        price = 20000 + 10 * number
+        order = order_manager.create_order(
+            quote=1000,
+            expected_execution_price=price,
+            position=Position.LONG,
+            order_type=OrderType.MARKET,
+            date=datetime.now()
+        )
+        order.open_position(date=datetime.now(), entry_price=price)
+        order_manager.open_orders.append(order)
+        order_manager.netting_position.add_order(order)
+    return order_manager
+
+
+if __name__ == "__main__":
+    print("orders | us per call | liquidation price")
+    for orders in (2, 8, 32, 128, 512):
+        order_manager = stacked_order_manager(orders)
+        number = 2000
+        seconds = timeit.timeit(
+            order_manager.calculate_netting_liquidation, number=number
+        )
+        print("{:6} | {:11.1f} | {}".format(
+            orders,
+            seconds / number * 1e6,
+            order_manager.netting_liquidation
+        ))
@@ -0,0 +1,76 @@
+"""
+Check and benchmark of RollingFeatures.rolling against
+pandas rolling (min_periods=1) with small and large
+periods. Values must match (np.allclose, nan in the same
+rows), a nan in the column included.
+
+Run from tester directory:
+python -m benchmarks.rolling_features
+"""
+import numpy as np
+import pandas as pd
+from time import perf_counter
+from engine import RollingFeatures
+from engine.features import WINDOW_REDUCTIONS
+
+
+def random_candles(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Gets candles with a random walk close and a nan
+    """
+    random = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {"Close": 20000 + random.normal(0, 30, rows).cumsum()},
+        index=pd.date_range("2024-01-01", periods=rows, freq="1min")
+    )
+    data.iloc[rows // 2, 0] = np.nan
+    return data
+
+
+def expected_windows(
+    data: pd.DataFrame,
+    periods: int,
+    function: str
+) -> np.ndarray:
+    """
+    Gets pandas rolling values, nan if the window has
+    a nan (as reducing the window slice)
+    """
+    close = data["Close"]
+    values = close.rolling(periods, min_periods=1).agg(function)
+    nans = close.isna().astype(int).rolling(periods, min_periods=1).sum()
+    return values.where(nans == 0).to_numpy()
+
+
+def compare(rows: int, periods: int, function: str) -> tuple:
+    """
+    Gets max relative difference against pandas and
+    milliseconds of rolling.
+    """
+    data = random_candles(rows)
+    expected = expected_windows(data, periods, function)
+    features = RollingFeatures(data=data)
+    start = perf_counter()
+    name = features.rolling(
+        column="Close", periods=periods, function=function
+    )
+    seconds = perf_counter() - start
+    values = features.arrays[name]
+    assert np.array_equal(np.isnan(values), np.isnan(expected)), function
+    assert np.allclose(
+        values, expected, rtol=1e-9, atol=0, equal_nan=True
+    ), (function, periods)
+    difference = np.nanmax(np.abs(values - expected) / np.abs(expected))
+    return difference, seconds * 1e3
+
+
+if __name__ == "__main__":
+    print("   rows | periods | function | max rel. difference | ms")
+    for rows, periods in ((100000, 24), (100000, 5000), (1000000, 50000)):
+        for function in WINDOW_REDUCTIONS:
+            if function in ("min", "max") and periods > 5000:
+                continue
+            difference, milliseconds = compare(rows, periods, function)
+            print("{:7} | {:7} | {:8} | {:19.2e} | {:6.1f}".format(
+                rows, periods, function, difference, milliseconds
+            ))
@@ -16,11 +16,27 @@ from orders.difficulty import Difficulty
 from datetime import datetime
 import numpy as np
 from wallet import Wallet
+from engine import (
+    Bar,
+    BarFeed,
+    HistoryRecorder,
+    RollingFeatures,
+    vectorized_backtest
+)
+from margin_tables import MARGIN_TABLES
+from chaos.execution_prices import ExecutionPrices
+from storage import (
+    CandleStore,
+    FeatherCandleStore,
+    KlineCache,
+    KlineDownloader
+)
+import os
 from helpers import (
     MAX_INVEST_ERROR,
     REQUIRED_PARAM
 )
-from typing import Union, List, Any
+from typing import Union, List, Any, Dict
 import matplotlib.pyplot as plt
 
 
@@ -47,13 +63,31 @@ class BinanceAPI(BaseModel):
         Hedging: Orders are separated
     fluctuation: Stores max difference of price in percentage:
                 0 < fluctuation < 1 (validated in order)
+    candle_store: Storage backend of downloaded candles,
+                see storage/candle_store.py
+    download_workers: Threads used to download candles
+    params: Parameters of strategy, read them in prepare_strategy
+            and run_strategy to test several configurations
+    seed: Seed of the random generator of execution prices,
+        every test starts a new generator with it
+    source_data: If provided, load_data takes candles from it
+                instead of candle store or API
+    history_details: Also record open margin and PnL of each candle
+    history_filename: If provided, history is stored in memory-mapped
+                    files <history_filename>.<column>.npy
 
     Attributes:
     client: Manages communication with Binance API. Used to load info
     wallet: Stores quote balance
     data: Data to be used in simulator. Load it with load_data method
     order_manager: Stores communication with orders
-    position_history: Stores the position history
+    history: Stores NAV and position of each candle,
+            see engine/history.py
+    position_history: Position of each candle (read-only),
+                    NAV is in wallet.history
+    features: Rolling features declared by strategy in
+            prepare_strategy, see engine/features.py
+    bar_feed: Array backed iterator of data used in test_strategy
     """
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -65,6 +99,13 @@ class BinanceAPI(BaseModel):
     fee_taker: float
     system: OrderSystem = OrderSystem.NETTING
     fluctuation: float = 0.05
+    candle_store: CandleStore = FeatherCandleStore()
+    download_workers: int = 4
+    params: Dict[str, Any] = {}
+    seed: int = 1
+    source_data: pd.DataFrame = None
+    history_details: bool = False
+    history_filename: str = None
 
     client: Client = Client(
         api_key=API_KEY,
@@ -75,7 +116,9 @@ class BinanceAPI(BaseModel):
     wallet: Wallet = Wallet()
     data: pd.DataFrame = None
     order_manager: OrderManager = None
-    position_history: List = []
+    history: HistoryRecorder = None
+    features: RollingFeatures = None
+    bar_feed: BarFeed = None
 
     @field_validator("pair", mode="before")
     def validate_pair(cls, value) -> str:
@@ -84,6 +127,16 @@ class BinanceAPI(BaseModel):
         """
         return value.upper()
 
+    @property
+    def position_history(self) -> pd.Series:
+        """
+        Gets the position of each candle recorded
+        in history (read-only).
+        """
+        if self.history is None:
+            return pd.Series(dtype=object, name="position")
+        return self.history.to_frame()["position"].map(Position)
+
     def get_value(
         self,
         bar: int,
@@ -111,7 +164,10 @@ class BinanceAPI(BaseModel):
             fee_maker=self.fee_maker,
             fee_taker=self.fee_taker,
             system=self.system,
-            fluctuation=self.fluctuation
+            fluctuation=self.fluctuation,
+            execution_prices=ExecutionPrices(
+                generator=np.random.default_rng(self.seed)
+            )
         )
 
     def init_wallet(
@@ -125,6 +181,7 @@ class BinanceAPI(BaseModel):
         self.wallet.set_initial_balance(
             quote=initial_quote
         )
+        self.wallet.recorder = self.history
 
     def print_message(self, message: str) -> None:
         """
@@ -142,6 +199,9 @@ class BinanceAPI(BaseModel):
         """
         Makes filename with variables inside
         data dir.
+
+        This is the csv cache used before candle_store,
+        these files are imported to store when found.
         """
         filename = "_".join(
             [
@@ -160,7 +220,8 @@ class BinanceAPI(BaseModel):
         end_date_utc: str,
     ) -> None:
         """
-        Loads data from API.
+        Loads data from API. Only the parts of the window
+        not found in candle_store are downloaded.
 
         start_date_utc: start date UTC str year-month-day
         end_date_utc: end date UTC str year-month-day
@@ -168,41 +229,22 @@ class BinanceAPI(BaseModel):
                             1d (day), etc. More at Binance API.
         """
         self.print_message("Trying to download info from API...")
-        bars = self.client.futures_historical_klines(
-            symbol=self.pair,
-            interval=interval_of_candles,
-            start_str=start_date_utc,
-            end_str=end_date_utc
-        )
-
-        data = pd.DataFrame(bars)
-        data["Date"] = pd.to_datetime(data.iloc[:, 0], unit="ms")
-        data.columns = [
-            "Open Time", "Open", "High", "Low", "Close", "Volume",
-            "Close Time", "Quote Asset Volume", "Number of Trades",
-            "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume",
-            "Ignore", "Date"
-        ]
-
-        use_columns = [
-            "Date", "Open", "High", "Low", "Close", "Volume",
-            "Quote Asset Volume", "Number of Trades",
-            "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume"
-        ]
-
-        data = data[use_columns].copy()
-        data.set_index("Date", inplace=True)
-        for column in data.columns:
-            data[column] = pd.to_numeric(data[column], errors="coerce")
-
-        data.to_csv(
-            self.make_filename(
-                interval_of_candles,
-                start_date_utc,
-                end_date_utc
+        cache = KlineCache(
+            store=self.candle_store,
+            client=self.client,
+            verbose=self.verbose,
+            downloader=KlineDownloader(
+                client=self.client,
+                max_workers=self.download_workers,
+                verbose=self.verbose
             )
         )
-        self.data = data
+        self.data = cache.load(
+            pair=self.pair,
+            interval=interval_of_candles,
+            start=start_date_utc,
+            end=end_date_utc
+        )
         return self.data
 
     def load_from_directory(
@@ -220,15 +262,32 @@ class BinanceAPI(BaseModel):
                             1d (day), etc. More at Binance API.
         """
         self.print_message("Trying to load info from directory...")
-        filename_dir = self.make_filename(
-            interval_of_candles,
-            start_date_utc,
-            end_date_utc
-        )
-        self.data = pd.read_csv(
-            filename_dir,
-            index_col="Date",
-            parse_dates=["Date"]
+        if not self.candle_store.contains(
+            pair=self.pair,
+            interval=interval_of_candles,
+            start=start_date_utc,
+            end=end_date_utc
+        ):
+            filename_dir = self.make_filename(
+                interval_of_candles,
+                start_date_utc,
+                end_date_utc
+            )
+            if not os.path.exists(filename_dir):
+                raise FileNotFoundError(filename_dir)
+            self.print_message("Importing csv file into candle store...")
+            self.candle_store.import_csv(
+                pair=self.pair,
+                interval=interval_of_candles,
+                filename=filename_dir,
+                start=start_date_utc,
+                end=end_date_utc
+            )
+        self.data = self.candle_store.read(
+            pair=self.pair,
+            interval=interval_of_candles,
+            start=start_date_utc,
+            end=end_date_utc
         )
         return self.data
 
@@ -242,11 +301,19 @@ class BinanceAPI(BaseModel):
         Loads data from "data" directory, if not found,
         downloads info and stores it.
 
+        If source_data is provided, the window is sliced
+        from it instead.
+
         start_date_utc: start date UTC str year-month-day
         end_date_utc: end date UTC str year-month-day
         interval_of_candles: Could be 1m (minute), 1h (hour),
                             1d (day), etc. More at Binance API.
         """
+        if self.source_data is not None:
+            self.data = self.source_data.loc[
+                pd.Timestamp(start_date_utc):pd.Timestamp(end_date_utc)
+            ].copy(deep=False)
+            return self.data
         try:
             self.load_from_directory(
                 interval_of_candles=interval_of_candles,
@@ -264,7 +331,7 @@ class BinanceAPI(BaseModel):
 
     def get_nav(
         self,
-        bar: pd.Series
+        bar: Bar
     ):
         """
         Gets net asset value: Total current balance
@@ -380,7 +447,7 @@ class BinanceAPI(BaseModel):
     def close_position(
         self,
         quote: float,
-        bar: pd.Series,
+        bar: Union[Bar, pd.Series],
         use_prc: bool = True,
         order_type: Union[OrderType, str] = OrderType.MARKET,
         expected_exec_quote: float = None
@@ -410,7 +477,7 @@ class BinanceAPI(BaseModel):
 
     def go_neutral(
         self,
-        bar: pd.Series,
+        bar: Union[Bar, pd.Series],
         order_type: Union[OrderType, str] = OrderType.MARKET,
         expected_exec_quote: float = None
     ) -> None:
@@ -429,7 +496,7 @@ class BinanceAPI(BaseModel):
 
     def go_long(
         self,
-        bar: pd.Series,
+        bar: Union[Bar, pd.Series],
         quote: float,
         expected_exec_quote: float = None,
         wallet_prc: bool = False,
@@ -465,7 +532,7 @@ class BinanceAPI(BaseModel):
 
     def go_short(
         self,
-        bar: pd.Series,
+        bar: Union[Bar, pd.Series],
         quote: float,
         expected_exec_quote: float = None,
         wallet_prc: bool = False,
@@ -499,7 +566,12 @@ class BinanceAPI(BaseModel):
             reduce_only=reduce_only
         )
 
-    def print_final_result(self):
+    def get_results(self) -> dict:
+        """
+        Gets the results of the last simulation:
+        final balance, performance, max drawdown (%),
+        orders, liquidations and paid fee.
+        """
         profits = (self.wallet.balance - self.wallet.initial_balance)
         perf = profits/self.wallet.initial_balance * 100
         total_orders = 0
@@ -509,6 +581,11 @@ class BinanceAPI(BaseModel):
         bad_orders_prc = 0
         times_liquidated = 0
         paid_fee = 0
+        max_drawdown = 0
+        if self.history is not None and len(self.history):
+            nav = self.history.nav
+            peak = np.maximum.accumulate(nav)
+            max_drawdown = float(np.max((peak - nav) / peak)) * 100
         if self.order_manager.closed_orders:
 
             match self.system:
@@ -536,35 +613,50 @@ class BinanceAPI(BaseModel):
                 in self.order_manager.closed_orders
             )
 
+        return {
+            "final_balance": self.wallet.balance,
+            "net_performance": perf,
+            "max_drawdown": max_drawdown,
+            "total_orders": total_orders,
+            "good_orders": good_orders,
+            "good_orders_prc": good_orders_prc,
+            "bad_orders": bad_orders,
+            "bad_orders_prc": bad_orders_prc,
+            "times_liquidated": times_liquidated,
+            "paid_fee": paid_fee
+        }
+
+    def print_final_result(self):
         if self.verbose:
+            results = self.get_results()
             self.print_message(75 * "-")
             self.print_message("+++ CLOSING FINAL POSITION +++")
             self.print_message("net performance (%) = {}".format(
-                    round(perf, 2)
+                    round(results["net_performance"], 2)
                 )
             )
             self.print_message("number of positions opened = {}".format(
-                    total_orders
+                    results["total_orders"]
                 )
             )
             self.print_message("times liquidated = {}".format(
-                    times_liquidated
+                    results["times_liquidated"]
                 )
             )
             self.print_message("number of good orders = {} ({}%)".format(
-                    good_orders,
-                    good_orders_prc
+                    results["good_orders"],
+                    results["good_orders_prc"]
                 )
             )
             self.print_message("number of bad orders = {} ({}%)".format(
-                    bad_orders,
-                    bad_orders_prc
+                    results["bad_orders"],
+                    results["bad_orders_prc"]
                 )
             )
             self.print_message(
                 "Amount spent on fee = {} ({}% of initial balance)".format(
-                    paid_fee, round(
-                        paid_fee/self.wallet.initial_balance*100, 1
+                    results["paid_fee"], round(
+                        results["paid_fee"]/self.wallet.initial_balance*100, 1
                     )
                 )
              )
@@ -602,10 +694,14 @@ class BinanceAPI(BaseModel):
         self.calculate_hold_strategy(
             initial_quote=initial_quote
         )
-        self.position_history = []
+        self.history = HistoryRecorder(
+            index=self.data.index,
+            details=self.history_details,
+            filename=self.history_filename
+        )
+        self.features = RollingFeatures(data=self.data)
         self.init_order_manager()
         self.init_wallet(initial_quote=initial_quote)
-        np.random.seed(1)
 
     def remove_limit_orders(self) -> float:
         """
@@ -617,7 +713,7 @@ class BinanceAPI(BaseModel):
             quote=returns
         )
 
-    def system_checks(self, bar: pd.Series) -> None:
+    def system_checks(self, bar: Bar) -> None:
         """
         Makes system checking like liquidation and
         limit order execution.
@@ -658,14 +754,22 @@ class BinanceAPI(BaseModel):
             )
         )
 
-    def post_system_checks(self, bar: pd.Series) -> None:
+    def post_system_checks(self, bar: Bar) -> None:
         """
         System checking that runs after strategy.
         """
-        self.wallet.history.append(
-            self.get_nav(bar=bar)
-        )
-        self.position_history.append(self.order_manager.get_position)
+        if self.history_details:
+            self.history.record(
+                nav=self.get_nav(bar=bar),
+                position=self.order_manager.get_position.value,
+                margin=self.order_manager.open_margin_quote,
+                PnL=self.order_manager.get_PnL(price=bar["Close"])
+            )
+        else:
+            self.history.record(
+                nav=self.get_nav(bar=bar),
+                position=self.order_manager.get_position.value
+            )
 
     def test_strategy(
         self,
@@ -687,8 +791,10 @@ class BinanceAPI(BaseModel):
         self.print_message("-" * 75)
 
         strategy = self.prepare_strategy()
-        for index, bar in self.data[:-1].iterrows():
-            bar["Date"] = index
+        self.bar_feed = BarFeed(self.data)
+        last_position = len(self.bar_feed) - 1
+        for position in range(last_position):
+            bar = self.bar_feed.get_bar(position)
             self.system_checks(bar=bar)
             strategy = self.run_strategy(
                 bar=bar,
@@ -696,8 +802,7 @@ class BinanceAPI(BaseModel):
             )
             self.post_system_checks(bar=bar)
 
-        last_bar = self.data.iloc[-1].copy()
-        last_bar["Date"] = last_bar.name
+        last_bar = self.bar_feed.get_bar(last_position)
 
         self.system_checks(bar=last_bar)
         self.remove_limit_orders()
@@ -712,6 +817,71 @@ class BinanceAPI(BaseModel):
 
         return self.wallet.balance
 
+    def test_vectorized(
+        self,
+        positions: Union[np.ndarray, List[Position]],
+        initial_quote: float,
+        leverage: int = 1,
+        invest_prc: float = 100.0,
+        order_type: Union[OrderType, str] = OrderType.MARKET
+    ) -> pd.Series:
+        """
+        Fast screening of position-only strategies over
+        loaded data, see engine/vectorized.py.
+
+        positions: one position per row of data, Position
+                enums or 1 LONG, -1 SHORT, 0 NEUTRAL
+        invest_prc: percentage of NAV used as margin of
+                each position
+
+        Returns NAV of each row, it is also stored in
+        data["Vectorized Strategy"].
+
+        It diverges from test_strategy because:
+        - Positions are opened and closed at close price,
+        not at a random price of candle.
+        - Positions are a fraction of NAV, not multiples of
+        min order.
+        - Limit orders are not simulated.
+        - Maintenance margin rate is the one of first bracket
+        and maintenance amount is ignored.
+        - After a liquidation position stays NEUTRAL until
+        the strategy changes position.
+        """
+        if isinstance(order_type, str):
+            order_type = OrderType(order_type.upper())
+        if len(positions) and isinstance(positions[0], Position):
+            positions = [position.value for position in positions]
+        fee = 0.0
+        if self.use_fee:
+            match order_type:
+                case OrderType.MARKET:
+                    fee = self.fee_taker
+                case OrderType.LIMIT:
+                    fee = self.fee_maker
+        table = MARGIN_TABLES.get_table(self.pair)
+        result = vectorized_backtest(
+            close=self.data["Close"].to_numpy(),
+            low=self.data["Low"].to_numpy(),
+            high=self.data["High"].to_numpy(),
+            positions=positions,
+            initial_quote=initial_quote,
+            leverage=leverage,
+            invest=invest_prc / 100,
+            fee=fee,
+            maintenance_margin_rate=table["MMR"].iloc[0]
+        )
+        self.data["Vectorized Strategy"] = result["nav"]
+        self.print_message(
+            "Vectorized | final NAV = {} | positions opened = {}"
+            " | times liquidated = {}".format(
+                round(result["nav"][-1], 2),
+                result["trades"],
+                result["liquidations"]
+            )
+        )
+        return self.data["Vectorized Strategy"]
+
     def plot_data(
         self,
         cols: Union[List[str], str] = ["Hold Strategy"],
@@ -732,22 +902,22 @@ class BinanceAPI(BaseModel):
         if not show_pos:
             plt.plot(
                 self.data.index,
-                self.wallet.history,
+                self.history.nav,
                 label="Strategy"
             )
         else:
             colors = [
-                'green' if pos == Position.LONG
+                'green' if pos == Position.LONG.value
                 else (
-                    "red" if pos == Position.SHORT
+                    "red" if pos == Position.SHORT.value
                     else "gray"
                 )
-                for pos in self.position_history
+                for pos in self.history.position
             ]
             for i in range(1, len(self.data)):
                 plt.plot(
                     self.data.iloc[i-1:i+1].index,
-                    self.wallet.history[i-1:i+1],
+                    self.history.nav[i-1:i+1],
                     c=colors[i-1],
                     linewidth=1,
                     label="Strategy" if i == 1 else None
@@ -761,7 +931,7 @@ class BinanceAPI(BaseModel):
                 color = 'green' if total_realized_PnL_with_fee >= 0 else 'red'
                 colors.append(color)
             history_indexes = self.data.index.get_indexer(grouped_orders.keys())
-            plt.scatter(grouped_orders.keys(), np.array(self.wallet.history)[history_indexes], c=colors, s=7)
+            plt.scatter(grouped_orders.keys(), self.history.nav[history_indexes], c=colors, s=7)
 
             plt.scatter([], [], c='green', label='Total order PnL is positive', s=100)
             plt.scatter([], [], c='red', label='Total order PnL is negative', s=100)
@@ -770,6 +940,17 @@ class BinanceAPI(BaseModel):
         plt.legend(loc="best")
         plt.show()
 
+    def prepare_indicators(self) -> None:
+        """
+        Implement this on child class.
+
+        Adds to data the indicator columns that depend only
+        on candles and params, so they can be computed once
+        for the whole data and reused by several windows
+        (see engine/walk_forward.py).
+        """
+        pass
+
     def prepare_strategy(self) -> Any:
         """
         Implement this on child class.
@@ -781,7 +962,7 @@ class BinanceAPI(BaseModel):
 
     def run_strategy(
         self,
-        bar: pd.Series,
+        bar: Union[Bar, pd.Series],
         strategy: Any
     ) -> Any:
         """
@@ -0,0 +1,107 @@
+import math
+import numpy as np
+from typing import List
+from chaos.triangular_distribution import TriangularDistribution
+
+
+def triangular_inverse_cdf(
+    uniform: float,
+    low: float,
+    center: float,
+    high: float
+) -> float:
+    """
+    Maps a uniform variate (0 <= uniform < 1) to a value
+    of the triangular distribution.
+
+    if low==high, the middle point is returned.
+    """
+    span = high - low
+    if span < 1e-12:
+        return (low + high) / 2
+    left = center - low
+    if uniform * span < left:
+        return low + math.sqrt(uniform * span * left)
+    return high - math.sqrt((1 - uniform) * span * (high - center))
+
+
+class ExecutionPrices(TriangularDistribution):
+    """
+    Triangular distribution of execution prices that draws
+    uniform variates in blocks from its own generator and
+    maps them through the inverse CDF.
+
+    This avoids a numpy call per execution and makes the
+    sequence of prices reproducible per generator, without
+    touching the global np.random state. A generator passed
+    to generate_sample or draw is used instead of the block.
+
+    Init Attributes:
+    generator: Random generator of uniform variates
+    block_size: Uniform variates drawn at once
+
+    Attributes:
+    uniforms: Current block of uniform variates
+    position: Next variate of block to use
+    """
+
+    def __init__(
+        self,
+        generator: np.random.Generator = None,
+        block_size: int = 4096
+    ) -> None:
+        self.generator = generator or np.random.default_rng()
+        self.block_size = block_size
+        self.uniforms: List[float] = []
+        self.position = 0
+
+    def next_uniform(self) -> float:
+        """
+        Gets next uniform variate, drawing a new
+        block when current one is used.
+        """
+        if self.position == len(self.uniforms):
+            self.uniforms = self.generator.random(self.block_size).tolist()
+            self.position = 0
+        uniform = self.uniforms[self.position]
+        self.position += 1
+        return uniform
+
+    def generate_sample(
+        self,
+        low: float,
+        center: float,
+        high: float,
+        size: int = 100,
+        generator: np.random.Generator = None
+    ) -> List[float]:
+        """
+        Generates a sample of the distribution with
+        variates of the block, or of generator if provided.
+        """
+        if generator is not None:
+            uniforms = generator.random(size).tolist()
+        else:
+            uniforms = [self.next_uniform() for _ in range(size)]
+        return [
+            triangular_inverse_cdf(uniform, low, center, high)
+            for uniform in uniforms
+        ]
+
+    def draw(
+        self,
+        low: float,
+        center: float,
+        high: float,
+        generator: np.random.Generator = None
+    ) -> float:
+        """
+        Draws a single value of the distribution with
+        next variate of the block, or of generator if
+        provided.
+        """
+        if generator is not None:
+            uniform = generator.random()
+        else:
+            uniform = self.next_uniform()
+        return triangular_inverse_cdf(uniform, low, center, high)
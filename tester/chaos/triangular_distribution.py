@@ -19,19 +19,41 @@ class TriangularDistribution:
         center: float,
         high: float,
         size: int = 100,
+        generator: np.random.Generator = None
     ) -> List[float]:
         """
         Generates a sample of the distribution.
 
+        Uses generator if provided, global np.random
+        otherwise.
+
         if low==high, triangular distribution
         can't be generated.
         """
         if abs(low - high) < 1e-12:
             dot = (low+high)/2
             return [dot] * size
-        sample = np.random.triangular(low, center, high, size)
+        sample = (generator or np.random).triangular(low, center, high, size)
         return sample
 
+    def draw(
+        self,
+        low: float,
+        center: float,
+        high: float,
+        generator: np.random.Generator = None
+    ) -> float:
+        """
+        Draws a single value of the distribution.
+        """
+        return self.generate_sample(
+            low=low,
+            center=center,
+            high=high,
+            size=1,
+            generator=generator
+        )[0]
+
     def plot_sample(
         self,
         low: float,
@@ -65,6 +87,7 @@ class TriangularDistribution:
         position: Position,
         order_type: OrderType = OrderType.MARKET,
         difficulty: Difficulty = Difficulty.MEDIUM,
+        generator: np.random.Generator = None
     ) -> float:
         """
         Generates a single sample of the distribution given
@@ -121,12 +144,12 @@ class TriangularDistribution:
             case difficulty.HIGH:
                 center = worst_execution
 
-        execution_price = self.generate_sample(
+        execution_price = self.draw(
             low=min(worst_execution, best_execution),
             center=center,
             high=max(worst_execution, best_execution),
-            size=1
-        )[0]
+            generator=generator
+        )
         return execution_price
 
 
@@ -0,0 +1,8 @@
+from .bar import Bar # noqa
+from .bar_feed import BarFeed # noqa
+from .history import HistoryRecorder # noqa
+from .features import RollingFeatures # noqa
+from .vectorized import vectorized_backtest # noqa
+from .sweep import ParameterSweep, SharedCandles # noqa
+from .walk_forward import WalkForward # noqa
+from .monte_carlo import MonteCarlo # noqa
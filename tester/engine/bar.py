@@ -0,0 +1,113 @@
+import pandas as pd
+from typing import Any
+
+
+class Bar():
+    """
+    Lightweight view of a single candle used by the simulator.
+
+    Supports the same access than a pandas row,
+    bar["Close"], and attribute access, bar.Close.
+    Columns different than Open, High, Low and Close
+    are read from the feed on request.
+
+    Attributes:
+    feed: BarFeed that owns the candle arrays
+    position: Integer position of candle in data
+    Open: Open price of candle
+    High: High price of candle
+    Low: Low price of candle
+    Close: Close price of candle
+    """
+    __slots__ = (
+        "feed",
+        "position",
+        "Open",
+        "High",
+        "Low",
+        "Close",
+        "date"
+    )
+
+    def __init__(
+        self,
+        feed: Any,
+        position: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float
+    ) -> None:
+        self.feed = feed
+        self.position = position
+        self.Open = open
+        self.High = high
+        self.Low = low
+        self.Close = close
+        self.date = None
+
+    @property
+    def Date(self) -> pd.Timestamp:
+        """
+        Gets the date of candle. It is built only
+        when requested.
+        """
+        if self.date is None:
+            self.date = self.feed.get_date(self.position)
+        return self.date
+
+    @property
+    def name(self) -> pd.Timestamp:
+        """
+        Same as pandas row name, i.e., the index.
+        """
+        return self.Date
+
+    def __getitem__(self, column: str) -> Any:
+        """
+        Gets value of a column like a pandas row.
+        """
+        match column:
+            case "Date":
+                return self.Date
+            case "Open":
+                return self.Open
+            case "High":
+                return self.High
+            case "Low":
+                return self.Low
+            case "Close":
+                return self.Close
+        return self.feed.get_value(column, self.position)
+
+    def __getattr__(self, column: str) -> Any:
+        """
+        Attribute access for columns not stored in bar.
+        """
+        if column in Bar.__slots__:
+            raise AttributeError(column)
+        try:
+            return self.feed.get_value(column, self.position)
+        except KeyError:
+            raise AttributeError(column)
+
+    def get(self, column: str, default: Any = None) -> Any:
+        """
+        Gets value of column or default if it does not exist.
+        """
+        try:
+            return self[column]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        """
+        String representation of object.
+        """
+        return "Bar({} | O: {} H: {} L: {} C: {})".format(
+            self.Date,
+            self.Open,
+            self.High,
+            self.Low,
+            self.Close
+        )
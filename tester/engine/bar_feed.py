@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, Optional
+from engine.bar import Bar
+
+
+class BarFeed():
+    """
+    Iterates candles of a dataframe without pandas
+    overhead per row.
+
+    Open, High, Low, Close and Date are extracted once
+    into contiguous numpy arrays and every candle is
+    served as a Bar view.
+
+    Attributes:
+    data: dataframe used to build the feed
+    open: Open prices
+    high: High prices
+    low: Low prices
+    close: Close prices
+    dates: Dates as int64 nanoseconds since epoch
+    tz: Timezone of dates, if any
+    columns: Cache of other columns requested by strategies
+    """
+
+    def __init__(self, data: pd.DataFrame) -> None:
+        self.data: pd.DataFrame = data
+        self.open: np.ndarray = self.to_array("Open")
+        self.high: np.ndarray = self.to_array("High")
+        self.low: np.ndarray = self.to_array("Low")
+        self.close: np.ndarray = self.to_array("Close")
+        index = pd.DatetimeIndex(data.index)
+        self.dates: np.ndarray = np.ascontiguousarray(index.asi8)
+        self.tz = index.tz
+        self.columns: Dict[str, np.ndarray] = dict()
+
+    def to_array(self, column: str) -> np.ndarray:
+        """
+        Gets a column as a contiguous float array.
+        """
+        return np.ascontiguousarray(
+            self.data[column].to_numpy(dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        """
+        Number of candles
+        """
+        return len(self.close)
+
+    def get_date(self, position: int) -> pd.Timestamp:
+        """
+        Gets date of a candle given its position
+        """
+        return pd.Timestamp(self.dates.item(position), tz=self.tz)
+
+    def get_position_before(
+        self,
+        position: int,
+        delta: pd.Timedelta
+    ) -> Optional[int]:
+        """
+        Gets position of the candle dated delta before
+        the candle at position, None if there is no
+        candle with that date.
+        """
+        date = self.dates.item(position) - pd.Timedelta(delta).value
+        previous = int(np.searchsorted(self.dates[:position + 1], date))
+        if previous <= position and self.dates.item(previous) == date:
+            return previous
+        return None
+
+    def get_value(self, column: str, position: int) -> Any:
+        """
+        Gets value of any column given the candle
+        position. Columns are cached the first
+        time they are requested.
+        """
+        if column not in self.columns:
+            if column not in self.data.columns:
+                raise KeyError(column)
+            self.columns[column] = self.data[column].to_numpy()
+        return self.columns[column][position]
+
+    def get_bar(self, position: int) -> Bar:
+        """
+        Gets the bar of a candle given its position
+        """
+        return Bar(
+            feed=self,
+            position=position,
+            open=self.open.item(position),
+            high=self.high.item(position),
+            low=self.low.item(position),
+            close=self.close.item(position)
+        )
+
+    def __iter__(self) -> Iterator[Bar]:
+        """
+        Iterates all bars
+        """
+        for position in range(len(self)):
+            yield self.get_bar(position)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+
+HISTORY_DTYPES = {
+    "nav": np.float64,
+    "position": np.int8,
+    "margin": np.float64,
+    "PnL": np.float64
+}
+
+
+class HistoryRecorder():
+    """
+    Records one row per candle of a simulation in typed
+    arrays preallocated with the length of data.
+
+    Columns:
+    nav: Net asset value at close of candle
+    position: Position value (1 LONG, -1 SHORT, 0 NEUTRAL)
+    margin: Open margin (only if details)
+    PnL: Unrealized PnL at close (only if details)
+
+    Init Attributes:
+    index: Index of data, rows are aligned to it
+    details: Also record margin and PnL
+    filename: If provided, columns are memory-mapped .npy files
+            named <filename>.<column>.npy instead of arrays
+            in memory (useful for very long runs)
+
+    Attributes:
+    arrays: Array of each column
+    size: Rows recorded
+    """
+
+    def __init__(
+        self,
+        index: pd.Index,
+        details: bool = False,
+        filename: str = None
+    ) -> None:
+        self.index = index
+        self.details = details
+        self.filename = filename
+        columns = ["nav", "position"]
+        if details:
+            columns += ["margin", "PnL"]
+        self.arrays: Dict[str, np.ndarray] = {
+            column: self.allocate(column, len(index)) for column in columns
+        }
+        self.size = 0
+
+    def allocate(self, column: str, length: int) -> np.ndarray:
+        """
+        Allocates array of a column
+        """
+        dtype = HISTORY_DTYPES[column]
+        if self.filename is None:
+            return np.zeros(length, dtype=dtype)
+        return np.lib.format.open_memmap(
+            "{}.{}.npy".format(self.filename, column),
+            mode="w+",
+            dtype=dtype,
+            shape=(length,)
+        )
+
+    def __len__(self) -> int:
+        return self.size
+
+    def record(
+        self,
+        nav: float,
+        position: int,
+        margin: float = 0.0,
+        PnL: float = 0.0
+    ) -> None:
+        """
+        Records next row
+        """
+        row = self.size
+        arrays = self.arrays
+        arrays["nav"][row] = nav
+        arrays["position"][row] = position
+        if self.details:
+            arrays["margin"][row] = margin
+            arrays["PnL"][row] = PnL
+        self.size = row + 1
+
+    def get(self, column: str) -> np.ndarray:
+        """
+        Gets recorded rows of a column (not copied)
+        """
+        return self.arrays[column][:self.size]
+
+    @property
+    def nav(self) -> np.ndarray:
+        """
+        Gets recorded net asset values
+        """
+        return self.get("nav")
+
+    @property
+    def position(self) -> np.ndarray:
+        """
+        Gets recorded position values
+        """
+        return self.get("position")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Gets recorded rows as a dataframe aligned
+        to data index.
+        """
+        return pd.DataFrame(
+            {column: self.get(column) for column in self.arrays},
+            index=self.index[:self.size]
+        )
+
+    def flush(self) -> None:
+        """
+        Writes memory-mapped columns to disk
+        """
+        for array in self.arrays.values():
+            if isinstance(array, np.memmap):
+                array.flush()
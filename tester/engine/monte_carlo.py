@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Type
+from engine.sweep import ParameterSweep
+
+
+class MonteCarlo():
+    """
+    Runs test_strategy of a BinanceAPI child class many times
+    with different execution noise in a process pool.
+
+    Every run uses the same candles and params, but its own
+    random generator of execution prices, so runs are
+    independent. Seeds of runs are derived from seed and
+    stored in results, so any run can be reproduced with
+    BinanceAPI(seed=<seed of run>).
+
+    Init Attributes:
+    tester_class: BinanceAPI child class
+    tester_kwargs: Init attributes of tester (see ParameterSweep)
+    test_kwargs: Arguments of test_strategy (see ParameterSweep)
+    runs: Number of runs
+    max_workers: Processes to use, all cores by default
+    seed: Seed used to derive the seeds of runs
+    """
+
+    def __init__(
+        self,
+        tester_class: Type,
+        tester_kwargs: dict,
+        test_kwargs: dict,
+        runs: int = 100,
+        max_workers: int = None,
+        seed: int = 1
+    ) -> None:
+        self.runs = runs
+        self.seed = seed
+        self.sweep = ParameterSweep(
+            tester_class=tester_class,
+            tester_kwargs=tester_kwargs,
+            test_kwargs=test_kwargs,
+            max_workers=max_workers,
+            seed=seed
+        )
+
+    def get_seeds(self) -> List[int]:
+        """
+        Gets a seed per run
+        """
+        return np.random.SeedSequence(self.seed).generate_state(
+            self.runs
+        ).tolist()
+
+    def run(
+        self,
+        params: dict = None,
+        data: pd.DataFrame = None
+    ) -> Dict[str, Any]:
+        """
+        Runs the simulations.
+
+        Returns:
+        runs: Table with seed and results of each run
+        summary: Distribution of final balance, max drawdown
+                and liquidations
+        """
+        params = params or dict()
+        if data is None:
+            data = self.sweep.load_data()
+        data = self.sweep.prepare_indicators(data, [params])
+        results = self.sweep.run_tasks(
+            tasks=[
+                {"params": params, "seed": seed}
+                for seed in self.get_seeds()
+            ],
+            data=data
+        )
+        runs = pd.DataFrame(results)
+        summary = runs[
+            ["final_balance", "max_drawdown", "times_liquidated"]
+        ].describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95])
+        return {"runs": runs, "summary": summary}
@@ -0,0 +1,277 @@
+import itertools
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Type
+
+
+class SharedCandles():
+    """
+    Shares candle data with worker processes through shared
+    memory, so the dataframe is not pickled for every task.
+
+    Numeric columns are stored as one float64 block and the
+    index as int64 nanoseconds. Workers rebuild a dataframe
+    backed by the shared block without copying it. Arrays of
+    workers are read-only, so a strategy writing in place to
+    a column fails instead of changing candles of the other
+    workers (new columns can still be added).
+
+    Attributes:
+    values: Shared memory of column values
+    index: Shared memory of index
+    spec: Info needed by workers to attach (picklable)
+    """
+
+    def __init__(self, data: pd.DataFrame) -> None:
+        values = data.to_numpy(dtype=np.float64)
+        dates = pd.DatetimeIndex(data.index).asi8
+        self.values = shared_memory.SharedMemory(
+            create=True, size=max(values.nbytes, 1)
+        )
+        self.index = shared_memory.SharedMemory(
+            create=True, size=max(dates.nbytes, 1)
+        )
+        np.ndarray(
+            values.shape, dtype=np.float64, buffer=self.values.buf
+        )[:] = values
+        np.ndarray(
+            dates.shape, dtype=np.int64, buffer=self.index.buf
+        )[:] = dates
+        self.spec = {
+            "values": self.values.name,
+            "index": self.index.name,
+            "shape": values.shape,
+            "columns": list(data.columns),
+            "index_name": data.index.name
+        }
+
+    @staticmethod
+    def attach(spec: dict) -> Dict[str, Any]:
+        """
+        Attaches to shared candles from a worker.
+
+        Returns the dataframe and the shared memory handles,
+        which must be kept alive while dataframe is used.
+        """
+        values = shared_memory.SharedMemory(name=spec["values"])
+        index = shared_memory.SharedMemory(name=spec["index"])
+        value_array = np.ndarray(
+            spec["shape"], dtype=np.float64, buffer=values.buf
+        )
+        index_array = np.ndarray(
+            spec["shape"][:1], dtype=np.int64, buffer=index.buf
+        )
+        value_array.flags.writeable = False
+        index_array.flags.writeable = False
+        data = pd.DataFrame(
+            value_array,
+            index=pd.DatetimeIndex(
+                index_array.view("datetime64[ns]"),
+                name=spec["index_name"]
+            ),
+            columns=spec["columns"],
+            copy=False
+        )
+        return {"data": data, "handles": (values, index)}
+
+    def close(self) -> None:
+        """
+        Releases shared memory
+        """
+        for memory in (self.values, self.index):
+            memory.close()
+            memory.unlink()
+
+
+WORKER_CANDLES: Dict[str, Any] = dict()
+
+
+def init_worker(spec: dict) -> None:
+    """
+    Attaches shared candles once per worker process.
+    """
+    WORKER_CANDLES.update(SharedCandles.attach(spec))
+
+
+def run_task(
+    tester_class: Type,
+    tester_kwargs: dict,
+    test_kwargs: dict,
+    params: dict,
+    seed: int,
+    history: bool = False
+) -> dict:
+    """
+    Runs test_strategy of a fresh tester with some params
+    and returns params and results.
+
+    If history, NAV of each candle is returned in "nav".
+    """
+    tester = tester_class(**{
+        **tester_kwargs,
+        "verbose": False,
+        "params": params,
+        "seed": seed,
+        "source_data": WORKER_CANDLES["data"]
+    })
+    tester.test_strategy(**test_kwargs)
+    results = {**params, "seed": seed, **tester.get_results()}
+    if history:
+        results["nav"] = tester.history.to_frame()["nav"]
+    return results
+
+
+class ParameterSweep():
+    """
+    Runs test_strategy of a BinanceAPI child class for many
+    parameter combinations in a process pool.
+
+    Candles are loaded once and shared with workers, each
+    task builds its own tester (isolated state) with
+    params=<combination> and a deterministic seed.
+
+    Init Attributes:
+    tester_class: BinanceAPI child class, its strategy
+                reads parameters from self.params
+    tester_kwargs: Init attributes of tester like pair,
+                difficulty, use_fee, fee_maker and fee_taker
+    test_kwargs: Arguments of test_strategy: interval_of_candles,
+                start_date_utc, end_date_utc, initial_quote and
+                initial_leverage
+    max_workers: Processes to use, all cores by default
+    seed: Seed of every task, the same one is used so
+        combinations face the same execution noise
+    """
+
+    def __init__(
+        self,
+        tester_class: Type,
+        tester_kwargs: dict,
+        test_kwargs: dict,
+        max_workers: int = None,
+        seed: int = 1
+    ) -> None:
+        self.tester_class = tester_class
+        self.tester_kwargs = tester_kwargs
+        self.test_kwargs = test_kwargs
+        self.max_workers = max_workers
+        self.seed = seed
+
+    def grid(self, space: Dict[str, List[Any]]) -> List[dict]:
+        """
+        Gets all combinations of a parameter space like
+        {"dev": [1, 2], "periods": [20, 50]}
+        """
+        names = list(space.keys())
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*space.values())
+        ]
+
+    def random(
+        self,
+        space: Dict[str, List[Any]],
+        samples: int
+    ) -> List[dict]:
+        """
+        Gets random combinations of a parameter space,
+        reproducible with seed.
+        """
+        generator = np.random.default_rng(self.seed)
+        return [
+            {
+                name: values[generator.integers(len(values))]
+                for name, values in space.items()
+            }
+            for _ in range(samples)
+        ]
+
+    def load_data(self) -> pd.DataFrame:
+        """
+        Loads candles of test window once in main process.
+        """
+        loader = self.tester_class(**{**self.tester_kwargs, "verbose": False})
+        return loader.load_data(
+            interval_of_candles=self.test_kwargs["interval_of_candles"],
+            start_date_utc=self.test_kwargs["start_date_utc"],
+            end_date_utc=self.test_kwargs["end_date_utc"]
+        )
+
+    def prepare_indicators(
+        self,
+        data: pd.DataFrame,
+        combinations: List[dict]
+    ) -> pd.DataFrame:
+        """
+        Adds indicator columns of every combination to
+        a copy of data (see BinanceAPI.prepare_indicators),
+        so tasks do not recompute them.
+        """
+        data = data.copy()
+        for params in combinations:
+            tester = self.tester_class(**{
+                **self.tester_kwargs,
+                "verbose": False,
+                "params": params
+            })
+            tester.data = data
+            tester.prepare_indicators()
+        return data
+
+    def run_tasks(
+        self,
+        tasks: List[dict],
+        data: pd.DataFrame
+    ) -> List[dict]:
+        """
+        Runs tasks in the process pool sharing data.
+
+        Each task is a dict with params and, optionally,
+        test_kwargs (overriding the ones of sweep), seed
+        (overriding the one of sweep) and history
+        (see run_task).
+        """
+        candles = SharedCandles(data)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_worker,
+                initargs=(candles.spec,)
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        run_task,
+                        self.tester_class,
+                        self.tester_kwargs,
+                        {**self.test_kwargs, **task.get("test_kwargs", {})},
+                        task["params"],
+                        task.get("seed", self.seed),
+                        task.get("history", False)
+                    )
+                    for task in tasks
+                ]
+                return [future.result() for future in futures]
+        finally:
+            candles.close()
+
+    def run(
+        self,
+        combinations: List[dict],
+        data: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """
+        Runs every combination and returns a table with
+        params and results (final balance, orders,
+        liquidations, fee...) sorted by final balance.
+        """
+        if data is None:
+            data = self.load_data()
+        results = self.run_tasks(
+            tasks=[{"params": params} for params in combinations],
+            data=data
+        )
+        return pd.DataFrame(results).sort_values(
+            "final_balance", ascending=False
+        ).reset_index(drop=True)
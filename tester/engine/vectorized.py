@@ -0,0 +1,130 @@
+import numpy as np
+from typing import Dict
+
+
+def liquidation_ratios(
+    leverage: float,
+    maintenance_margin_rate: float
+) -> Dict[str, float]:
+    """
+    Gets the price / entry price ratios where a LONG
+    and a SHORT position are liquidated.
+
+    A position is liquidated when its margin plus PnL
+    reaches the maintenance margin (rate * notional value).
+    """
+    long_ratio = (leverage - 1) / (leverage * (1 - maintenance_margin_rate))
+    short_ratio = (leverage + 1) / (leverage * (1 + maintenance_margin_rate))
+    return {"long": long_ratio, "short": short_ratio}
+
+
+def vectorized_backtest(
+    close: np.ndarray,
+    low: np.ndarray,
+    high: np.ndarray,
+    positions: np.ndarray,
+    initial_quote: float,
+    leverage: float = 1,
+    invest: float = 1.0,
+    fee: float = 0.0004,
+    maintenance_margin_rate: float = 0.004
+) -> Dict[str, np.ndarray]:
+    """
+    Simulates a position-only strategy with numpy.
+
+    positions[i] is the position (1 LONG, -1 SHORT, 0 NEUTRAL)
+    decided with candle i, it is opened at close of candle i
+    and kept until the position changes. Each position uses
+    invest (fraction of NAV when opened) as margin and
+    leverage times that as notional value.
+
+    Fees are paid over notional value when opening and
+    closing. A position is liquidated when low (LONG) or
+    high (SHORT) reaches its liquidation price, losing its
+    margin, and stays NEUTRAL until position changes.
+    NAV never goes below 0.
+
+    Returns:
+    nav: Net asset value at close of each candle
+    trades: Number of positions opened
+    liquidations: Number of positions liquidated
+    """
+    close = np.asarray(close, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.int8)
+    n = len(close)
+    exposure = invest * leverage
+
+    previous = np.concatenate(([0], positions[:-1]))
+    change = positions != previous
+    segment = np.cumsum(change)
+    starts = np.concatenate(([0], np.flatnonzero(change)))
+    direction = positions[starts].astype(np.float64)
+    direction[0] = 0
+    entry = close[starts]
+    used = np.abs(direction)
+    open_fee = fee * exposure * used
+
+    # Liquidations, checked with the segment held during each candle
+    held = np.concatenate(([0], segment[:-1]))
+    ratio = np.where(
+        direction[held] > 0, low / entry[held], high / entry[held]
+    )
+    ratios = liquidation_ratios(leverage, maintenance_margin_rate)
+    liquidated = np.where(
+        direction[held] > 0,
+        ratio <= ratios["long"],
+        np.where(direction[held] < 0, ratio >= ratios["short"], False)
+    )
+    liquidated[0] = False
+    liquidated_at = np.full(len(starts), n)
+    liquidated_bars = np.flatnonzero(liquidated)
+    held_liquidated, first = np.unique(
+        held[liquidated_bars], return_index=True
+    )
+    liquidated_at[held_liquidated] = liquidated_bars[first]
+
+    # Return of each segment, from its start to the next one
+    ends = np.concatenate((starts[1:], [n - 1]))
+    exit_ratio = close[ends] / entry
+    segment_return = (
+        1 - open_fee
+        + exposure * direction * (exit_ratio - 1)
+        - fee * exposure * used * exit_ratio
+    )
+    was_liquidated = liquidated_at < n
+    segment_return[was_liquidated] = (
+        1 - open_fee[was_liquidated] - invest
+    )
+    segment_return = np.maximum(segment_return, 0)
+    nav_start = initial_quote * np.concatenate(
+        ([1.0], np.cumprod(segment_return[:-1]))
+    )
+
+    # Mark to market NAV of each candle
+    bars = np.arange(n)
+    mark = (
+        1 - open_fee[segment]
+        + exposure * direction[segment] * (close / entry[segment] - 1)
+    )
+    mark = np.where(
+        liquidated_at[segment] <= bars,
+        1 - open_fee[segment] - invest * used[segment],
+        mark
+    )
+    nav = nav_start[segment] * np.maximum(mark, 0)
+
+    # Last position is closed at the end
+    last = segment[-1]
+    if liquidated_at[last] >= n:
+        nav[-1] = max(0, nav[-1] - (
+            nav_start[last] * fee * exposure * used[last]
+            * close[-1] / entry[last]
+        ))
+
+    return {
+        "nav": nav,
+        "trades": int(np.count_nonzero(direction)),
+        "liquidations": int(np.count_nonzero(was_liquidated))
+    }
@@ -0,0 +1,183 @@
+import pandas as pd
+from typing import Any, Dict, List, Type
+from engine.sweep import ParameterSweep
+
+
+class WalkForward():
+    """
+    Walk-forward optimization of a BinanceAPI child class.
+
+    Data is split into folds: an in-sample window of
+    in_sample candles followed by an out-of-sample window of
+    out_of_sample candles. Folds roll forward out_of_sample
+    candles each time, so out-of-sample windows do not overlap.
+
+    Every combination is tested on every in-sample window, the
+    best one (by metric) of each fold is tested on its
+    out-of-sample window and out-of-sample NAV curves are
+    stitched into one curve.
+
+    Indicator columns (see BinanceAPI.prepare_indicators) are
+    computed once for the whole data and shared with workers,
+    so folds do not recompute them.
+
+    Init Attributes:
+    tester_class: BinanceAPI child class, its strategy
+                reads parameters from self.params
+    tester_kwargs: Init attributes of tester (see ParameterSweep)
+    test_kwargs: Arguments of test_strategy (see ParameterSweep),
+                start_date_utc and end_date_utc are the
+                whole window to split
+    in_sample: Candles of each in-sample window
+    out_of_sample: Candles of each out-of-sample window
+    anchored: If True, in-sample windows always start at the
+            first candle (expanding window)
+    metric: Result maximized in in-sample windows,
+            see BinanceAPI.get_results
+    max_workers: Processes to use, all cores by default
+    seed: Seed of every task
+    """
+
+    def __init__(
+        self,
+        tester_class: Type,
+        tester_kwargs: dict,
+        test_kwargs: dict,
+        in_sample: int,
+        out_of_sample: int,
+        anchored: bool = False,
+        metric: str = "final_balance",
+        max_workers: int = None,
+        seed: int = 1
+    ) -> None:
+        self.tester_class = tester_class
+        self.tester_kwargs = tester_kwargs
+        self.test_kwargs = test_kwargs
+        self.in_sample = in_sample
+        self.out_of_sample = out_of_sample
+        self.anchored = anchored
+        self.metric = metric
+        self.sweep = ParameterSweep(
+            tester_class=tester_class,
+            tester_kwargs=tester_kwargs,
+            test_kwargs=test_kwargs,
+            max_workers=max_workers,
+            seed=seed
+        )
+
+    def get_folds(self, data: pd.DataFrame) -> List[Dict[str, pd.Timestamp]]:
+        """
+        Gets first and last dates of in-sample and
+        out-of-sample windows of each fold.
+        """
+        index = data.index
+        folds = []
+        start = 0
+        while start + self.in_sample + self.out_of_sample <= len(index):
+            split = start + self.in_sample
+            folds.append({
+                "in_sample_start": index[0 if self.anchored else start],
+                "in_sample_end": index[split - 1],
+                "out_of_sample_start": index[split],
+                "out_of_sample_end": index[split + self.out_of_sample - 1]
+            })
+            start += self.out_of_sample
+        return folds
+
+    def get_window(self, start: pd.Timestamp, end: pd.Timestamp) -> dict:
+        """
+        Gets test_kwargs of a window
+        """
+        return {
+            "start_date_utc": start.isoformat(),
+            "end_date_utc": end.isoformat()
+        }
+
+    def stitch(
+        self,
+        curves: List[pd.Series],
+        initial_quote: float
+    ) -> pd.Series:
+        """
+        Stitches out-of-sample NAV curves, each one starts
+        with the final NAV of the previous one.
+        """
+        stitched = []
+        capital = initial_quote
+        for curve in curves:
+            curve = curve / initial_quote * capital
+            capital = curve.iloc[-1]
+            stitched.append(curve)
+        return pd.concat(stitched)
+
+    def run(
+        self,
+        combinations: List[dict],
+        data: pd.DataFrame = None
+    ) -> Dict[str, Any]:
+        """
+        Runs walk-forward optimization.
+
+        Returns:
+        folds: Table with windows, best params, in-sample
+            and out-of-sample results of each fold
+        nav: Stitched out-of-sample NAV
+        """
+        if data is None:
+            data = self.sweep.load_data()
+        data = self.sweep.prepare_indicators(data, combinations)
+        folds = self.get_folds(data)
+
+        tasks = [
+            {
+                "params": params,
+                "test_kwargs": self.get_window(
+                    fold["in_sample_start"], fold["in_sample_end"]
+                )
+            }
+            for fold in folds
+            for params in combinations
+        ]
+        in_sample = self.sweep.run_tasks(tasks=tasks, data=data)
+
+        best = []
+        for number in range(len(folds)):
+            results = in_sample[
+                number * len(combinations):(number + 1) * len(combinations)
+            ]
+            choice = max(
+                range(len(combinations)),
+                key=lambda position: results[position][self.metric]
+            )
+            best.append((combinations[choice], results[choice]))
+
+        tasks = [
+            {
+                "params": params,
+                "test_kwargs": self.get_window(
+                    fold["out_of_sample_start"], fold["out_of_sample_end"]
+                ),
+                "history": True
+            }
+            for fold, (params, _) in zip(folds, best)
+        ]
+        out_of_sample = self.sweep.run_tasks(tasks=tasks, data=data)
+
+        table = []
+        for fold, (_, in_result), out_result in zip(
+            folds, best, out_of_sample
+        ):
+            row = {**fold, **{
+                name: value for name, value in out_result.items()
+                if name != "nav"
+            }}
+            row["in_sample_" + self.metric] = in_result[self.metric]
+            table.append(row)
+
+        return {
+            "folds": pd.DataFrame(table),
+            "nav": self.stitch(
+                [result["nav"] for result in out_of_sample],
+                self.test_kwargs["initial_quote"]
+            )
+        }
@@ -6,4 +6,5 @@ from .colors import ( # noqa
     yellow
 )
 from .weekday import get_weekday # noqa
+from .file_hash import get_file_hash # noqa
 from .error_messages import * # noqa
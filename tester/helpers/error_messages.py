@@ -7,6 +7,11 @@ INVALID_LEVERAGE = (
     "Leverage must be between 1 and {max_leverage}"
 )
 
+INVALID_EXPECTED_QUOTE = (
+    "Invalid expected quote {expected_quote}. "
+    "Expected quote must be positive"
+)
+
 INVALID_ATTRIBUTE_TYPE = (
     "Attribute '{attribute_name}' "
     "must be of type {expected_type}, "
@@ -49,4 +54,12 @@ NO_MONEY = (
 
 MAX_INVEST_ERROR = "Trying to open position size: {}. Can't open more than {}"
 
-REQUIRED_PARAM = "Some required parameter is None"
\ No newline at end of file
+REQUIRED_PARAM = "Some required parameter is None"
+
+MISSING_PYARROW = (
+    "pyarrow is required to use {store}, install it with: pip install pyarrow"
+)
+
+CANDLES_NOT_STORED = (
+    "Candles of {pair} {interval} from {start} to {end} are not stored"
+)
@@ -0,0 +1,12 @@
+import hashlib
+
+
+def get_file_hash(filename: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns sha256 hex digest of a file, read in chunks
+    """
+    file_hash = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
 from .tables import BTCUSDT_TABLE
 
 
@@ -15,9 +18,32 @@ class MaintenanceMarginTables():
 
     def __init__(self):
         """
-        Get tables from constants
+        Get tables from constants and compile them
         """
         self.BTCUSDT = BTCUSDT_TABLE
+        self.compiled = {
+            "BTCUSDT": self.compile_table(self.BTCUSDT)
+        }
+
+    def compile_table(self, table: pd.DataFrame) -> dict:
+        """
+        Compiles a table into numpy arrays sorted by
+        position bracket, so brackets are found with
+        binary search.
+
+        Python lists of columns are also stored, they
+        are faster for single lookups.
+        """
+        table = table.sort_values("PB")
+        compiled = {
+            column: table[column].to_numpy()
+            for column in ("PB", "ML", "MMR", "MA")
+        }
+        compiled.update({
+            column + "_list": compiled[column].tolist()
+            for column in ("PB", "ML", "MMR", "MA")
+        })
+        return compiled
 
     def get_table(self, pair: str):
         """
@@ -26,6 +52,46 @@ class MaintenanceMarginTables():
         table = getattr(self, pair.upper())
         return table
 
+    def get_compiled_table(self, pair: str) -> dict:
+        """
+        Get a compiled table using its name
+        """
+        return self.compiled[pair.upper()]
+
+    def get_bracket(
+        self,
+        pair: str,
+        notional_value: float
+    ) -> int:
+        """
+        Gets row of the first bracket where notional
+        value fits (notional value <= PB).
+
+        Raises IndexError if notional value is bigger
+        than last bracket.
+        """
+        table = self.get_compiled_table(pair)
+        bracket = bisect_left(table["PB_list"], notional_value)
+        if bracket == len(table["PB_list"]):
+            raise IndexError(notional_value)
+        return bracket
+
+    def get_brackets(
+        self,
+        pair: str,
+        notional_values: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized get_bracket
+        """
+        table = self.get_compiled_table(pair)
+        brackets = np.searchsorted(
+            table["PB"], np.asarray(notional_values), side="left"
+        )
+        if np.any(brackets == len(table["PB"])):
+            raise IndexError(np.max(notional_values))
+        return brackets
+
     def get_max_leverage(
         self,
         pair: str,
@@ -34,9 +100,19 @@ class MaintenanceMarginTables():
         """
         Get max leverage given position size.
         """
-        table = self.get_table(pair)
-        max_lev = table.loc[notional_value <= table['PB']].ML.iloc[0]
-        return max_lev
+        table = self.get_compiled_table(pair)
+        return table["ML_list"][self.get_bracket(pair, notional_value)]
+
+    def get_max_leverages(
+        self,
+        pair: str,
+        notional_values: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized get_max_leverage
+        """
+        table = self.get_compiled_table(pair)
+        return table["ML"][self.get_brackets(pair, notional_values)]
 
     def get_maintenance_margin(
         self,
@@ -47,12 +123,67 @@ class MaintenanceMarginTables():
         Gets maintenance margin of position, useful to calculate
         liquidation price
         """
-        table = self.get_table(pair)
-        row = table.loc[notional_value <= table['PB']].head(1)
-        _, _, _, mmr, ma = row.values[0]
+        table = self.get_compiled_table(pair)
+        bracket = self.get_bracket(pair, notional_value)
+        mmr = table["MMR_list"][bracket]
+        ma = table["MA_list"][bracket]
         mm = notional_value * mmr - ma
         return mm
 
+    def get_maintenance_margins(
+        self,
+        pair: str,
+        notional_values: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized get_maintenance_margin
+        """
+        table = self.get_compiled_table(pair)
+        notional_values = np.asarray(notional_values, dtype=np.float64)
+        brackets = self.get_brackets(pair, notional_values)
+        return notional_values * table["MMR"][brackets] - table["MA"][brackets]
+
+    def get_liquidation_price(
+        self,
+        pair: str,
+        direction: int,
+        size_base: float,
+        size_quote: float,
+        margin_quote: float
+    ) -> float:
+        """
+        Gets liquidation price of a position in closed form.
+
+        direction: 1 LONG, -1 SHORT
+        size_base: Base units of position (positive)
+        size_quote: Quote paid for them at entry (positive),
+                    size_quote/size_base is the average entry price
+        margin_quote: Margin of position
+
+        Position is liquidated when margin plus PnL reaches
+        maintenance margin:
+        margin + direction * (base * price - size_quote)
+            = base * price * MMR - MA
+        which is linear in price for each bracket. The price of
+        each bracket is solved and the first one whose notional
+        value falls inside its bracket is returned.
+        """
+        table = self.get_compiled_table(pair)
+        brackets = table["PB_list"]
+        price = None
+        for bracket, top in enumerate(brackets):
+            mmr = table["MMR_list"][bracket]
+            ma = table["MA_list"][bracket]
+            price = (direction * size_quote - margin_quote - ma) / (
+                size_base * (direction - mmr)
+            )
+            notional_value = size_base * price
+            if notional_value <= top and (
+                bracket == 0 or notional_value > brackets[bracket - 1]
+            ):
+                return price
+        return price
+
     def calculate_margin_ratio(
         self,
         pair: str,
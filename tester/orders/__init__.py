@@ -5,4 +5,6 @@ from .difficulty import Difficulty # noqa
 from .min_orders import MIN_ORDERS # noqa
 from .base_order import BaseOrder # noqa
 from .order import Order # noqa
+from .netting_position import NettingPosition # noqa
+from .limit_order_book import LimitOrderBook # noqa
 from .order_manager import OrderManager # noqa
\ No newline at end of file
@@ -7,21 +7,22 @@ from orders import (
 )
 from helpers import (
     INVALID_LEVERAGE,
+    INVALID_EXPECTED_QUOTE
 )
-from pydantic import (
-    BaseModel,
-    model_validator,
-    PositiveFloat
-)
-from typing import List
+from typing import List, Union
 from helpers import is_zero, cyan, yellow
 
 
-class BaseOrder(BaseModel):
+class BaseOrder():
     """
     This class manages order validations, properties and
     base methods of order class.
 
+    Orders are plain objects with __slots__ (no pydantic model)
+    because the simulator creates and updates thousands of them.
+    Attributes are validated once when order is created and
+    closing totals are kept as running sums.
+
     Note: In BTCUSDT and other pairs,
     BTC -> Base currency (first currency)
     USDT -> Quote currency (second currency)
@@ -65,43 +66,95 @@ class BaseOrder(BaseModel):
     liquidation_price: Tells if position was liquidated and when
     liquidated: Tells if position was liquidated
     closed_at: Stores the closing datetimes of order
+    closed_size_quote: Running sum of closed_size_quotes
+    closing_fee_quote: Running sum of closing_fee_quotes
+    total_PnL: Running sum of PnLs
 
     Post-Init Attributes:
     min_base_open: Min amount of base coin to buy
     """
-    verbose: bool
-    pair: str
-    expected_quote: PositiveFloat
-    expected_entry_price: float
-    position: Position
-    leverage: int = 1
-    use_fee: bool = True
-    fee_maker: float = 0.0002
-    fee_taker: float = 0.0004
-    order_type: OrderType = OrderType.MARKET
-    difficulty: Difficulty = Difficulty.MEDIUM
-    reduce_only: bool = False
-    use_prc_close: bool = False
-    created_at: datetime = datetime.now()
-
-    entry_price: float = None
-    size_quote: float = None
-    margin_quote: float = None
-    opening_fee_quote: float = 0
-    opened_at: datetime = None
-
-    close_prices: List[float] = []
-    closed_size_quotes: List[float] = []
-    closing_fee_quotes: List[float] = []
-    closing_order_types: List[OrderType] = []
-    PnLs: List[float] = []
-    liquidation_price: float = None
-    liquidated: bool = False
-    closed_at: List[datetime] = []
-
-    min_base_open: float = None
-
-    @model_validator(mode='after')
+    __slots__ = (
+        "verbose", "pair", "expected_quote", "expected_entry_price",
+        "position", "leverage", "use_fee", "fee_maker", "fee_taker",
+        "order_type", "difficulty", "reduce_only", "use_prc_close",
+        "created_at",
+        "entry_price", "size_quote", "margin_quote", "opening_fee_quote",
+        "opened_at",
+        "close_prices", "closed_size_quotes", "closing_fee_quotes",
+        "closing_order_types", "PnLs", "liquidation_price", "liquidated",
+        "closed_at", "closed_size_quote", "closing_fee_quote", "total_PnL",
+        "min_base_open"
+    )
+
+    def __init__(
+        self,
+        verbose: bool,
+        pair: str,
+        expected_quote: float,
+        expected_entry_price: float,
+        position: Union[Position, int],
+        leverage: int = 1,
+        use_fee: bool = True,
+        fee_maker: float = 0.0002,
+        fee_taker: float = 0.0004,
+        order_type: Union[OrderType, str] = OrderType.MARKET,
+        difficulty: Union[Difficulty, str] = Difficulty.MEDIUM,
+        reduce_only: bool = False,
+        use_prc_close: bool = False,
+        created_at: datetime = None
+    ) -> None:
+        """
+        Inits and validates attributes
+        """
+        self.verbose = verbose
+        self.pair = pair
+        self.expected_quote = float(expected_quote)
+        self.expected_entry_price = float(expected_entry_price)
+        self.position = Position(position)
+        self.leverage = leverage
+        self.use_fee = use_fee
+        self.fee_maker = fee_maker
+        self.fee_taker = fee_taker
+        self.order_type = OrderType(order_type)
+        self.difficulty = Difficulty(difficulty)
+        self.reduce_only = reduce_only
+        self.use_prc_close = use_prc_close
+        self.created_at = created_at or datetime.now()
+
+        self.entry_price: float = None
+        self.size_quote: float = None
+        self.margin_quote: float = None
+        self.opening_fee_quote: float = 0
+        self.opened_at: datetime = None
+
+        self.close_prices: List[float] = []
+        self.closed_size_quotes: List[float] = []
+        self.closing_fee_quotes: List[float] = []
+        self.closing_order_types: List[OrderType] = []
+        self.PnLs: List[float] = []
+        self.liquidation_price: float = None
+        self.liquidated: bool = False
+        self.closed_at: List[datetime] = []
+        self.closed_size_quote: float = 0
+        self.closing_fee_quote: float = 0
+        self.total_PnL: float = 0
+
+        self.min_base_open: float = None
+
+        self.validate_expected_quote()
+        self.validate_leverage()
+
+    def validate_expected_quote(self) -> None:
+        """
+        Validates expected quote is positive.
+        """
+        if not self.expected_quote > 0:
+            raise ValueError(
+                INVALID_EXPECTED_QUOTE.format(
+                    expected_quote=str(self.expected_quote)
+                )
+            )
+
     def validate_leverage(self) -> None:
         """
         Validates leverage considering used quote.
@@ -134,7 +187,7 @@ class BaseOrder(BaseModel):
         due to market fluctuations.
         Open quote is positive for LONG and negative for SHORT
         """
-        return self.size_quote - sum(self.closed_size_quotes)
+        return self.size_quote - self.closed_size_quote
 
     @property
     def open_margin_quote(self) -> float:
@@ -193,11 +246,7 @@ class BaseOrder(BaseModel):
         LONG: 1
         SHORT: -1
         """
-        match self.position:
-            case Position.LONG:
-                return 1
-            case Position.SHORT:
-                return -1
+        return self.position.value
 
     @property
     def realized_PnL(
@@ -206,9 +255,7 @@ class BaseOrder(BaseModel):
         """
         Returns the realized PnL
         """
-        if not self.PnLs:
-            return 0
-        return sum(self.PnLs)
+        return self.total_PnL
 
     @property
     def realized_fee(
@@ -221,10 +268,7 @@ class BaseOrder(BaseModel):
         Opening (just one)
         closing (could be multiple)
         """
-        fee = 0
-        fee += self.opening_fee_quote
-        fee += sum(self.closing_fee_quotes)
-        return fee
+        return self.opening_fee_quote + self.closing_fee_quote
 
     @property
     def realized_PnL_with_fee(
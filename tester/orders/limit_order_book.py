@@ -0,0 +1,113 @@
+import heapq
+import itertools
+from typing import Iterator, List
+from orders.position import Position
+from orders.base_order import BaseOrder
+
+
+class LimitOrderBook():
+    """
+    Stores limit orders not executed in two heaps keyed by
+    expected entry price:
+
+    Buy side (LONG): highest price first, it is the first
+    one reached when price goes down.
+    Sell side (SHORT): lowest price first, it is the first
+    one reached when price goes up.
+
+    Orders with the same price keep insertion order.
+
+    Attributes:
+    bids: Heap of LONG orders (-price, number, order)
+    asks: Heap of SHORT orders (price, number, order)
+    quote_used: Sum of quote used to register orders
+    """
+    __slots__ = ("bids", "asks", "quote_used", "counter")
+
+    def __init__(self) -> None:
+        self.bids = []
+        self.asks = []
+        self.quote_used = 0.0
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.bids) + len(self.asks)
+
+    def __bool__(self) -> bool:
+        return bool(self.bids or self.asks)
+
+    def __iter__(self) -> Iterator[BaseOrder]:
+        """
+        Iterates LONG orders (descendant price) and then
+        SHORT orders (ascendant price).
+        """
+        for _, _, order in sorted(self.bids):
+            yield order
+        for _, _, order in sorted(self.asks):
+            yield order
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def add(self, order: BaseOrder) -> None:
+        """
+        Adds an order to its side
+        """
+        number = next(self.counter)
+        match order.position:
+            case Position.LONG:
+                heapq.heappush(
+                    self.bids, (-order.expected_entry_price, number, order)
+                )
+            case Position.SHORT:
+                heapq.heappush(
+                    self.asks, (order.expected_entry_price, number, order)
+                )
+        self.quote_used += order.quote_used_to_limit
+
+    def update_quote_used(self, order: BaseOrder) -> None:
+        """
+        Discounts quote of an order leaving the book
+        """
+        if self:
+            self.quote_used -= order.quote_used_to_limit
+        else:
+            self.quote_used = 0.0
+
+    def remove(self, order: BaseOrder) -> None:
+        """
+        Removes an order from book
+        """
+        for side in (self.bids, self.asks):
+            for position, (_, _, stored) in enumerate(side):
+                if stored is order:
+                    side[position] = side[-1]
+                    side.pop()
+                    heapq.heapify(side)
+                    self.update_quote_used(order)
+                    return
+        raise ValueError(order)
+
+    def pop_crossed(self, low: float, high: float) -> List[BaseOrder]:
+        """
+        Pops orders reached by a candle: LONG orders with
+        price >= low and SHORT orders with price <= high.
+        """
+        crossed = []
+        while self.bids and -self.bids[0][0] >= low:
+            crossed.append(heapq.heappop(self.bids)[2])
+            self.update_quote_used(crossed[-1])
+        while self.asks and self.asks[0][0] <= high:
+            crossed.append(heapq.heappop(self.asks)[2])
+            self.update_quote_used(crossed[-1])
+        return crossed
+
+    def clear(self) -> List[BaseOrder]:
+        """
+        Removes all orders and returns them
+        """
+        orders = list(self)
+        self.bids = []
+        self.asks = []
+        self.quote_used = 0.0
+        return orders
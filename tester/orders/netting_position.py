@@ -0,0 +1,80 @@
+from orders.base_order import BaseOrder
+
+
+class NettingPosition():
+    """
+    Aggregate of the open orders of a NETTING position.
+
+    It is updated when orders are opened or closed, so
+    position queries (notional value, PnL, margin) do not
+    loop over open orders.
+
+    Attributes:
+    direction: 1 LONG, -1 SHORT, 0 if there are no orders
+    size_base: Base units still open
+    size_quote: Quote paid at entry for open base units,
+                size_quote/size_base is the average entry price
+    margin_quote: Open margin
+    fee_quote: Fees paid by open orders (opening and
+            partial closings)
+    """
+    __slots__ = (
+        "direction", "size_base", "size_quote", "margin_quote", "fee_quote"
+    )
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Empties position
+        """
+        self.direction = 0
+        self.size_base = 0.0
+        self.size_quote = 0.0
+        self.margin_quote = 0.0
+        self.fee_quote = 0.0
+
+    @property
+    def entry_price(self) -> float:
+        """
+        Gets volume weighted average entry price
+        """
+        if not self.size_base:
+            return None
+        return self.size_quote / self.size_base
+
+    def add_order(self, order: BaseOrder) -> None:
+        """
+        Adds an order just opened
+        """
+        size_quote = order.open_size_quote
+        self.direction = order.direction_int
+        self.size_base += size_quote / order.entry_price
+        self.size_quote += size_quote
+        self.margin_quote += order.open_margin_quote
+        self.fee_quote += order.opening_fee_quote
+
+    def remove_last_close(self, order: BaseOrder) -> None:
+        """
+        Removes the part of an order closed by its
+        last closing.
+        """
+        size_quote = order.closed_size_quotes[-1]
+        self.size_base -= size_quote / order.entry_price
+        self.size_quote -= size_quote
+        self.margin_quote -= abs(size_quote) / order.leverage
+        self.fee_quote += order.closing_fee_quotes[-1]
+
+    def get_notional_value(self, price: float) -> float:
+        """
+        Gets notional value of position at a price
+        """
+        return self.size_base * price
+
+    def get_PnL(self, price: float) -> float:
+        """
+        Gets PnL of position at a price.
+        This does not include fees.
+        """
+        return self.direction * (self.size_base * price - self.size_quote)
@@ -5,6 +5,7 @@ from orders import (
     MIN_ORDERS
 )
 from datetime import datetime
+import numpy as np
 from chaos.triangular_distribution import CHAOS
 from margin_tables import MARGIN_TABLES
 from helpers import (
@@ -25,6 +26,7 @@ class Order(BaseOrder):
 
     Inherits validations from BaseOrder.
     """
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         """
@@ -41,7 +43,8 @@ class Order(BaseOrder):
         close: float,
         expected_price: float,
         order_type: OrderType,
-        opening_order: bool
+        opening_order: bool,
+        generator: np.random.Generator = None
     ) -> float:
         """
         Returns execution price of an order.
@@ -58,6 +61,9 @@ class Order(BaseOrder):
         Example:
         Opening LONG: Best execution is low price
         Closing LONG: Best execution is high price
+
+        generator: Random generator of execution price,
+                global np.random if not provided.
         """
         if not (open or low or high or close):
             raise ValueError(NOT_PROVIDED_CANDLE)
@@ -71,6 +77,7 @@ class Order(BaseOrder):
                 position=self.position,
                 order_type=order_type,
                 difficulty=self.difficulty,
+                generator=generator
             )
         else:
             match self.position:
@@ -88,6 +95,7 @@ class Order(BaseOrder):
                 position=closing_position,
                 order_type=order_type,
                 difficulty=self.difficulty,
+                generator=generator
             )
 
         return execution_price
@@ -277,30 +285,30 @@ class Order(BaseOrder):
         a position (or partially).
         """
         margin_quote_closed = self.size_to_margin(size_quote_closed)
+        closing_fee_quote = self.get_close_fee_quote(
+            quote_to_close=size_quote_closed,
+            close_price=close_price,
+            order_type=order_type
+        ) if not liquidated else 0
+        PnL = self.get_PnL(
+            current_price=close_price,
+            quote=size_quote_closed
+        ) if not liquidated else -margin_quote_closed
         self.closed_at.append(date)
         self.close_prices.append(close_price)
         self.closing_order_types.append(order_type)
-        self.closing_fee_quotes.append(
-            self.get_close_fee_quote(
-                quote_to_close=size_quote_closed,
-                close_price=close_price,
-                order_type=order_type
-            ) if not liquidated else 0
-        )
-        self.PnLs.append(
-            self.get_PnL(
-                current_price=close_price,
-                quote=size_quote_closed
-            ) if not liquidated else -margin_quote_closed
-        )
-        self.closed_size_quotes.append(
-            size_quote_closed
-        )
+        self.closing_fee_quotes.append(closing_fee_quote)
+        self.PnLs.append(PnL)
+        self.closed_size_quotes.append(size_quote_closed)
+        self.closing_fee_quote += closing_fee_quote
+        self.total_PnL += PnL
+        self.closed_size_quote += size_quote_closed
         if print_message:
             self.print_close_message(
                 date=date,
                 close_price=close_price,
                 close_quote=size_quote_closed,
+                pnl_w_fee=PnL - closing_fee_quote,
                 liquidated=liquidated
             )
 
@@ -1,9 +1,12 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, ConfigDict, Field
 from orders import (
     Order,
     Position,
     OrderSystem,
-    OrderType
+    OrderType,
+    MIN_ORDERS,
+    NettingPosition,
+    LimitOrderBook
 )
 from typing import List, Union
 from datetime import datetime
@@ -15,6 +18,9 @@ from helpers import (
     is_zero
 )
 from collections import defaultdict
+from chaos.triangular_distribution import CHAOS
+from margin_tables import MARGIN_TABLES
+from chaos.execution_prices import ExecutionPrices
 
 
 class OrderManager(BaseModel):
@@ -24,6 +30,9 @@ class OrderManager(BaseModel):
     Manages their closing, liquidating and
     other behaviours.
 
+    Settings:
+    model_config: Allows custom objects as attributes
+
     Init Attributes:
     verbose: Print actions
     pair: Use some pair like BTCUSDT
@@ -37,15 +46,24 @@ class OrderManager(BaseModel):
         Hedging: Orders are separated
     fluctuation: Stores max difference of price in percentage:
                 0 < fluctuation < 1
+    execution_prices: Distribution of execution prices with its
+                    own generator, see chaos/execution_prices.py.
+                    CHAOS (global np.random) if not provided
 
     Other Attributes:
     open_orders: Stores current open positions
-    limit_orders: Stores limit orders (pending positions)
+    limit_orders: Stores limit orders (pending positions) in a
+                book sorted by price, see limit_order_book.py
     closed_orders: Stores all closed orders (also liquidated)
+    netting_position: Aggregate of open orders updated when they
+                    open or close, used to answer position
+                    queries without looping over open orders
     netting_liquidaiton: stores the liquidation
                     calculated for open orders
                     just for netting mode.
     """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     verbose: bool
     pair: str
     leverage: int = 1
@@ -55,10 +73,14 @@ class OrderManager(BaseModel):
     fee_taker: float = 0.0004
     system: OrderSystem = OrderSystem.NETTING
     fluctuation: float = 0.05
+    execution_prices: ExecutionPrices = None
 
     open_orders: List[Order] = []
-    limit_orders: List[Order] = []
+    limit_orders: LimitOrderBook = Field(default_factory=LimitOrderBook)
     closed_orders: List[Order] = []
+    netting_position: NettingPosition = Field(
+        default_factory=NettingPosition
+    )
     netting_liquidation: float = None
 
     @field_validator("fluctuation")
@@ -126,9 +148,7 @@ class OrderManager(BaseModel):
         """
         Gets current invested amount from balance.
         """
-        return sum(
-            order.open_margin_quote for order in self.open_orders
-        )
+        return self.netting_position.margin_quote
 
     def print_message(self, message: str) -> None:
         """
@@ -157,18 +177,30 @@ class OrderManager(BaseModel):
         ):
             return 0
 
-        order = self.create_order(
-            quote=1,
-            expected_execution_price=current_quote_val,
-            position=Position.LONG,
-            order_type=order_type,
-            date=datetime.now()
+        min_base_open = MIN_ORDERS.get_min_units(self.pair)
+        min_size_quote = min_base_open * current_quote_val * (
+            1 + self.fluctuation
         )
-        inv = order.get_min_quote_invest(
-            execution_quote=current_quote_val,
-            fluctuation=self.fluctuation
+        min_margin_quote = min_size_quote / self.leverage
+        min_opening_fee_quote = min_size_quote * self.get_fee_constant(
+            order_type
         )
-        return inv["min_quote"]
+        return min_margin_quote + min_opening_fee_quote
+
+    def get_fee_constant(
+        self,
+        order_type: OrderType
+    ) -> float:
+        """
+        Gets fees of orders depending on order type.
+        """
+        if not self.use_fee:
+            return 0.0
+        match order_type:
+            case OrderType.MARKET:
+                return self.fee_taker
+            case OrderType.LIMIT:
+                return self.fee_maker
 
     def must_close_open_positions(
         self,
@@ -195,13 +227,7 @@ class OrderManager(BaseModel):
         Sum all notional values of open orders in quote
         currency.
         """
-        not_val_quote = 0
-        for order in self.open_orders:
-            not_val_quote += order.get_notional_value(
-                current_price=price,
-                base=order.open_size_base
-            )
-        return not_val_quote
+        return self.netting_position.get_notional_value(price)
 
     def get_PnL(
         self,
@@ -214,13 +240,7 @@ class OrderManager(BaseModel):
         """
         match self.system:
             case OrderSystem.NETTING:
-                profit = 0
-                for order in self.open_orders:
-                    profit += order.get_PnL(
-                        current_price=price,
-                        quote=order.open_size_quote
-                    )
-                return profit
+                return self.netting_position.get_PnL(price)
 
     def get_invested_margin_and_PnL(
         self,
@@ -238,14 +258,8 @@ class OrderManager(BaseModel):
                     high=high
                 ):
                     return 0
-                total = 0
-                for order in self.open_orders:
-                    total += order.open_margin_quote
-                    total += order.get_PnL(
-                            current_price=close,
-                            quote=order.open_size_quote
-                        )
-                return total
+                position = self.netting_position
+                return position.margin_quote + position.get_PnL(close)
     
     def get_ROI(
         self,
@@ -265,15 +279,8 @@ class OrderManager(BaseModel):
                     high=high
                 ):
                     return -100
-                margin = 0
-                pnl = 0
-                for order in self.open_orders:
-                    margin += order.open_margin_quote
-                    pnl += order.get_PnL(
-                            current_price=close,
-                            quote=order.open_size_quote
-                        )
-                return pnl/margin * 100
+                position = self.netting_position
+                return position.get_PnL(close)/position.margin_quote * 100
 
     def get_limit_orders_margin(
         self
@@ -282,10 +289,7 @@ class OrderManager(BaseModel):
         Sum all margin of limit orders, i.e., the quote
         used to register each limit order.
         """
-        quote = 0
-        for order in self.limit_orders:
-            quote += order.quote_used_to_limit
-        return quote
+        return self.limit_orders.quote_used
 
     def get_execution_price(
         self,
@@ -299,20 +303,19 @@ class OrderManager(BaseModel):
     ) -> float:
         """
         NETTING:
-        Gets first order close price to use generally.
+        Gets execution price of an order opening position
+        to use generally.
         """
-        order = self.create_order(
-            quote=1,
-            expected_execution_price=expected_price,
-            position=position,
-            order_type=order_type,
-            date=datetime.now()
-        )
-        return order.get_execution_price(
-            open=open, low=low, high=high, close=close,
+        distribution = self.execution_prices or CHAOS
+        return distribution.get_execution_price(
             expected_price=expected_price,
+            open=open,
+            low=low,
+            close=close,
+            high=high,
+            position=position,
             order_type=order_type,
-            opening_order=True
+            difficulty=self.difficulty
         )
 
     def close_position(
@@ -363,6 +366,7 @@ class OrderManager(BaseModel):
                         check_liquidation=False,
                         print_message=False
                     )
+                    self.netting_position.remove_last_close(order)
                     total_return += margin + pnl_w_fee
                     total_pnl_w_fee += pnl_w_fee
                     if order.is_closed:
@@ -371,6 +375,7 @@ class OrderManager(BaseModel):
 
                 if not self.open_orders:
                     self.netting_liquidation = None
+                    self.netting_position.reset()
                     print_order = self.closed_orders[-1]
                 else:
                     print_order = self.open_orders[-1]
@@ -420,35 +425,16 @@ class OrderManager(BaseModel):
 
     def add_to_limit_orders(
         self,
-        order: OrderType
+        order: Order
     ) -> None:
         """
-        Append order to limit orders and arranges them:
+        Adds order to limit order book:
 
-        Put long positions together and arrange them in
-        descendant order.
+        Long positions are arranged in descendant order.
 
-        Put short positions together and arrange them in
-        ascendant order.
+        Short positions are arranged in ascendant order.
         """
-        self.limit_orders.append(order)
-        long_positions = sorted(
-            filter(
-                lambda order: order.position == Position.LONG,
-                self.limit_orders
-            ),
-            key=lambda order: order.expected_entry_price,
-            reverse=True
-        )
-        short_positions = sorted(
-            filter(
-                lambda order: order.position == Position.SHORT,
-                self.limit_orders
-            ),
-            key=lambda order: order.expected_entry_price,
-            reverse=False
-        )
-        self.limit_orders = long_positions + short_positions
+        self.limit_orders.add(order)
 
     def submit_order(
         self,
@@ -605,6 +591,7 @@ class OrderManager(BaseModel):
 
         returns -= response["quote_spent"]
         self.open_orders.append(order)
+        self.netting_position.add_order(order)
         self.calculate_netting_liquidation()
         return returns
 
@@ -666,6 +653,7 @@ class OrderManager(BaseModel):
                 )
                 self.closed_orders.extend(self.open_orders)
                 self.open_orders = []
+                self.netting_position.reset()
                 return self.remove_limit_orders()
 
     def check_liquidation(
@@ -696,6 +684,13 @@ class OrderManager(BaseModel):
         return 0
 
     def calculate_netting_liquidation(self) -> None:
+        """
+        NETTING:
+        Calculates liquidation price of all open orders
+        together, solving the maintenance margin formula
+        of the aggregated position (see
+        MaintenanceMarginTables.get_liquidation_price).
+        """
         if self.system == OrderSystem.HEDGING:
             self.netting_liquidation = None
 
@@ -706,37 +701,14 @@ class OrderManager(BaseModel):
             self.netting_liquidation = self.open_orders[0].liquidation_price
             return
 
-        netting_liq = self.open_orders[-1].entry_price
-        dir_int = self.open_orders[0].direction_int
-        step = 512
-        while step >= 0.4:
-            available_quote = self.open_margin_quote
-            new_nl = netting_liq - step * dir_int
-            for order in self.open_orders:
-                if order.should_liquidate(price=new_nl):
-                    available_quote -= order.open_margin_quote
-                    extra_diff = order.liquidation_price - new_nl
-                    extra_loss = order.entry_price - extra_diff
-                    available_quote += order.get_PnL(
-                        current_price=extra_loss,
-                        quote=order.open_size_quote
-                    )
-                else:
-                    available_quote += order.get_PnL(
-                        current_price=new_nl,
-                        quote=order.open_size_quote
-                    ) + order.get_close_fee_quote(
-                        quote_to_close=order.open_size_quote,
-                        close_price=new_nl,
-                        order_type=OrderType.MARKET
-                    )
-
-            if available_quote >= 0:
-                netting_liq = new_nl
-            else:
-                step /= 2
-
-        self.netting_liquidation = netting_liq
+        position = self.netting_position
+        self.netting_liquidation = MARGIN_TABLES.get_liquidation_price(
+            pair=self.pair,
+            direction=position.direction,
+            size_base=position.size_base,
+            size_quote=position.size_quote,
+            margin_quote=position.margin_quote
+        )
 
     def remove_limit_order(self, order: Order) -> float:
         """
@@ -752,9 +724,8 @@ class OrderManager(BaseModel):
         invested money.
         """
         returns = 0
-        for order in self.limit_orders:
+        for order in self.limit_orders.clear():
             returns += order.quote_used_to_limit
-        self.limit_orders = []
         return returns
 
     def check_limit_orders(
@@ -767,32 +738,28 @@ class OrderManager(BaseModel):
     ) -> float:
         """
         Checks if limit orders should be executed.
+        Only orders reached by candle are taken from book.
 
         Returns the not invested money.
         """
         returns = 0
-        for order in self.limit_orders[:]:
-            if order.should_execute(
+        for order in self.limit_orders.pop_crossed(low=low, high=high):
+            returns += self.submit_order(
+                creation_date=order.created_at,
+                execution_date=date,
+                open=open,
                 low=low,
-                high=high
-            ):
-                returns += self.submit_order(
-                    creation_date=order.created_at,
-                    execution_date=date,
-                    open=open,
-                    low=low,
-                    close=close,
-                    high=high,
-                    quote=order.expected_quote,
-                    position=order.position,
-                    order_type=order.order_type,
-                    expected_exec_quote=order.expected_entry_price,
-                    use_prc_close=order.use_prc_close,
-                    reduce_only=order.reduce_only,
-                    force_limit=True
-                )
-                returns += order.quote_used_to_limit
-                self.limit_orders.remove(order)
+                close=close,
+                high=high,
+                quote=order.expected_quote,
+                position=order.position,
+                order_type=order.order_type,
+                expected_exec_quote=order.expected_entry_price,
+                use_prc_close=order.use_prc_close,
+                reduce_only=order.reduce_only,
+                force_limit=True
+            )
+            returns += order.quote_used_to_limit
         return returns
 
     def get_invested_notional_value(
@@ -808,13 +775,7 @@ class OrderManager(BaseModel):
             case OrderSystem.NETTING:
                 if not self.open_orders:
                     return 0
-                invested = 0
-                for order in self.open_orders:
-                    invested += order.get_notional_value(
-                        current_price=quote_value,
-                        base=order.open_size_base
-                    )
-                return invested
+                return self.netting_position.get_notional_value(quote_value)
 
     def get_min_leverage(self):
         """
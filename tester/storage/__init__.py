@@ -0,0 +1,15 @@
+from .klines import ( # noqa
+    klines_to_dataframe,
+    interval_to_timedelta
+)
+from .candle_store import ( # noqa
+    CandleStore,
+    FeatherCandleStore,
+    ParquetCandleStore,
+    merge_ranges
+)
+from .kline_downloader import ( # noqa
+    KlineDownloader,
+    TokenBucket
+)
+from .kline_cache import KlineCache # noqa
@@ -0,0 +1,392 @@
+import os
+import json
+from abc import ABC, abstractmethod
+import pandas as pd
+from typing import List, Tuple, Union
+from datetime import datetime
+from helpers import (
+    MISSING_PYARROW,
+    CANDLES_NOT_STORED
+)
+
+TOUCHING_RANGES = pd.Timedelta(milliseconds=1)
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+def merge_ranges(
+    ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Merges date windows that overlap or touch each other
+    and returns them sorted.
+
+    Windows are closed: (start, end) includes both dates.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + TOUCHING_RANGES:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CandleStore(ABC):
+    """
+    Stores candles in a columnar binary format.
+
+    Candles are partitioned by pair, interval and month:
+    <directory>/<PAIR>/<interval>/<year>-<month>.<extension>
+
+    Each pair/interval folder also has a ranges.<extension>.json
+    file with the date windows already stored, so the store can
+    tell if a requested window is complete.
+
+    This is an abstract class, child classes implement
+    read_table and write_table with their format, so a
+    store without them can't be created.
+
+    Init Attributes:
+    directory: Root directory of the store
+    """
+    extension: str = None
+
+    def __init__(self, directory: str = "data") -> None:
+        self.directory = directory
+
+    def check_dependencies(self) -> None:
+        """
+        Checks pyarrow is installed before reading
+        or writing partitions.
+        """
+        if pa is None:
+            raise ImportError(
+                MISSING_PYARROW.format(store=type(self).__name__)
+            )
+
+    @abstractmethod
+    def read_table(self, filename: str) -> pd.DataFrame:
+        """
+        Implement this on child class.
+
+        Reads a partition file.
+        """
+
+    @abstractmethod
+    def write_table(self, data: pd.DataFrame, filename: str) -> None:
+        """
+        Implement this on child class.
+
+        Writes a partition file.
+        """
+
+    def get_folder(self, pair: str, interval: str) -> str:
+        """
+        Gets folder of a pair and interval
+        """
+        return os.path.join(self.directory, pair.upper(), interval)
+
+    def get_partition(
+        self,
+        pair: str,
+        interval: str,
+        month: pd.Period
+    ) -> str:
+        """
+        Gets filename of a monthly partition
+        """
+        return os.path.join(
+            self.get_folder(pair, interval),
+            month.strftime("%Y-%m") + "." + self.extension
+        )
+
+    def get_months(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp
+    ) -> pd.PeriodIndex:
+        """
+        Gets months between two dates (both included)
+        """
+        return pd.period_range(
+            start=start.to_period("M"),
+            end=end.to_period("M"),
+            freq="M"
+        )
+
+    def get_ranges_filename(self, pair: str, interval: str) -> str:
+        """
+        Gets filename where stored date windows are saved
+        """
+        return os.path.join(
+            self.get_folder(pair, interval),
+            "ranges." + self.extension + ".json"
+        )
+
+    def get_ranges(
+        self,
+        pair: str,
+        interval: str
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Gets date windows stored for pair and interval
+        """
+        filename = self.get_ranges_filename(pair, interval)
+        if not os.path.exists(filename):
+            return []
+        with open(filename) as file:
+            ranges = json.load(file)
+        return [
+            (pd.Timestamp(start), pd.Timestamp(end))
+            for start, end in ranges
+        ]
+
+    def set_ranges(
+        self,
+        pair: str,
+        interval: str,
+        ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]
+    ) -> None:
+        """
+        Saves date windows stored for pair and interval
+        """
+        filename = self.get_ranges_filename(pair, interval)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename + ".tmp", "w") as file:
+            json.dump(
+                [[start.isoformat(), end.isoformat()] for start, end in ranges],
+                file
+            )
+        os.replace(filename + ".tmp", filename)
+
+    def add_range(
+        self,
+        pair: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp
+    ) -> None:
+        """
+        Registers a date window as stored merging it
+        with the ones already stored.
+        """
+        ranges = self.get_ranges(pair, interval)
+        ranges.append((start, end))
+        self.set_ranges(pair, interval, merge_ranges(ranges))
+
+    def get_missing_ranges(
+        self,
+        pair: str,
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime]
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Gets the parts of a date window not stored yet:
+        before the stored windows, after them or holes
+        between them.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        missing = []
+        for stored_start, stored_end in merge_ranges(
+            self.get_ranges(pair, interval)
+        ):
+            if stored_end < start:
+                continue
+            if stored_start > end:
+                break
+            if stored_start > start:
+                missing.append((start, stored_start - TOUCHING_RANGES))
+            start = stored_end + TOUCHING_RANGES
+            if start > end:
+                return missing
+        missing.append((start, end))
+        return missing
+
+    def contains(
+        self,
+        pair: str,
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime]
+    ) -> bool:
+        """
+        Tells if a date window is completely stored
+        """
+        return not self.get_missing_ranges(pair, interval, start, end)
+
+    def write(
+        self,
+        pair: str,
+        interval: str,
+        data: pd.DataFrame,
+        start: Union[str, datetime] = None,
+        end: Union[str, datetime] = None
+    ) -> None:
+        """
+        Writes candles into monthly partitions merging them
+        with the ones already stored, then registers the
+        window from start to end as stored.
+
+        If start or end are not provided, candles are
+        written but no window is registered.
+        """
+        self.check_dependencies()
+        if len(data):
+            months = data.index.to_period("M")
+            for month in months.unique():
+                filename = self.get_partition(pair, interval, month)
+                new_data = data[months == month]
+                if os.path.exists(filename):
+                    new_data = pd.concat([self.read_table(filename), new_data])
+                    new_data = new_data[
+                        ~new_data.index.duplicated(keep="last")
+                    ].sort_index()
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                self.write_table(new_data, filename + ".tmp")
+                os.replace(filename + ".tmp", filename)
+        if start is not None and end is not None:
+            self.add_range(
+                pair, interval, pd.Timestamp(start), pd.Timestamp(end)
+            )
+
+    def read(
+        self,
+        pair: str,
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        check_range: bool = True
+    ) -> pd.DataFrame:
+        """
+        Reads candles from start to end (both included)
+        loading only the partitions needed.
+
+        If check_range, the window must be completely
+        stored.
+
+        Columns of a single partition are not copied, so
+        they are read-only. New columns can be added.
+        """
+        self.check_dependencies()
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        if check_range and not self.contains(pair, interval, start, end):
+            raise FileNotFoundError(
+                CANDLES_NOT_STORED.format(
+                    pair=pair, interval=interval, start=start, end=end
+                )
+            )
+        partitions = []
+        for month in self.get_months(start, end):
+            filename = self.get_partition(pair, interval, month)
+            if os.path.exists(filename):
+                partitions.append(self.read_table(filename))
+        if not partitions:
+            raise FileNotFoundError(
+                CANDLES_NOT_STORED.format(
+                    pair=pair, interval=interval, start=start, end=end
+                )
+            )
+        data = partitions[0] if len(partitions) == 1 else pd.concat(partitions)
+        return data.loc[start:end].copy(deep=False)
+
+    def import_csv(
+        self,
+        pair: str,
+        interval: str,
+        filename: str,
+        start: Union[str, datetime] = None,
+        end: Union[str, datetime] = None
+    ) -> pd.DataFrame:
+        """
+        Imports a csv file made by the previous cache
+        of BinanceAPI.
+
+        If start or end are not provided, first and
+        last dates of file are used.
+        """
+        data = pd.read_csv(
+            filename,
+            index_col="Date",
+            parse_dates=["Date"]
+        )
+        if start is None:
+            start = data.index[0]
+        if end is None:
+            end = data.index[-1]
+        self.write(pair, interval, data, start, end)
+        return data
+
+    def import_csv_directory(self, directory: str = None) -> List[str]:
+        """
+        Imports all csv files named <PAIR>_<interval>_<start>_<end>.csv
+        inside a directory (store directory by default).
+
+        Returns imported filenames.
+        """
+        directory = directory or self.directory
+        imported = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".csv"):
+                continue
+            parts = name[:-len(".csv")].split("_")
+            if len(parts) != 4:
+                continue
+            pair, interval, start, end = parts
+            filename = os.path.join(directory, name)
+            self.import_csv(pair, interval, filename, start, end)
+            imported.append(filename)
+        return imported
+
+
+class FeatherCandleStore(CandleStore):
+    """
+    Stores partitions as uncompressed Arrow IPC (Feather v2)
+    files, which are memory-mapped when read so columns
+    are not copied.
+    """
+    extension: str = "arrow"
+
+    def read_table(self, filename: str) -> pd.DataFrame:
+        """
+        Reads a partition file memory-mapped.
+        """
+        table = feather.read_table(filename, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def write_table(self, data: pd.DataFrame, filename: str) -> None:
+        """
+        Writes a partition file.
+        """
+        feather.write_feather(
+            pa.Table.from_pandas(data),
+            filename,
+            compression="uncompressed"
+        )
+
+
+class ParquetCandleStore(CandleStore):
+    """
+    Stores partitions as Parquet files. These are smaller
+    on disk than Feather ones, but need decoding when read.
+    """
+    extension: str = "parquet"
+
+    def read_table(self, filename: str) -> pd.DataFrame:
+        """
+        Reads a partition file.
+        """
+        table = pq.read_table(filename, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def write_table(self, data: pd.DataFrame, filename: str) -> None:
+        """
+        Writes a partition file.
+        """
+        pq.write_table(pa.Table.from_pandas(data), filename)
@@ -0,0 +1,147 @@
+import pandas as pd
+from binance.client import Client
+from typing import List, Tuple, Union
+from datetime import datetime
+from storage.candle_store import CandleStore
+from storage.klines import interval_to_timedelta
+from storage.kline_downloader import KlineDownloader
+
+
+class KlineCache():
+    """
+    Serves any date window of candles from a candle store
+    downloading from Binance only the parts not stored yet
+    (before, after or holes between stored windows).
+
+    Missing windows are downloaded in parallel chunks,
+    see kline_downloader.py
+
+    Init Attributes:
+    store: Candle store where candles are saved
+    client: Binance client used to download candles
+    verbose: Print actions
+    downloader: Downloader of missing windows, by default
+                one using client
+    """
+
+    def __init__(
+        self,
+        store: CandleStore,
+        client: Client,
+        verbose: bool = False,
+        downloader: KlineDownloader = None
+    ) -> None:
+        self.store = store
+        self.client = client
+        self.verbose = verbose
+        self.downloader = downloader or KlineDownloader(
+            client=client,
+            verbose=verbose
+        )
+
+    def last_closed_candle(self, interval: str) -> pd.Timestamp:
+        """
+        Gets the latest open time whose candle is already
+        closed. Newer candles may change, so they are
+        never registered as stored.
+        """
+        now = pd.Timestamp.utcnow().tz_localize(None)
+        return now - interval_to_timedelta(interval)
+
+    def store_range(
+        self,
+        pair: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        data: pd.DataFrame
+    ) -> None:
+        """
+        Writes a downloaded window into the store. The window
+        is registered only up to the last closed candle.
+        """
+        stored_end = min(end, self.last_closed_candle(interval))
+        if stored_end < start:
+            self.store.write(pair=pair, interval=interval, data=data)
+        else:
+            self.store.write(
+                pair=pair,
+                interval=interval,
+                data=data,
+                start=start,
+                end=stored_end
+            )
+
+    def update_pairs(
+        self,
+        pairs: List[str],
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime]
+    ) -> List[Tuple[str, pd.Timestamp, pd.Timestamp]]:
+        """
+        Downloads the missing parts of a window for several
+        pairs at once.
+
+        Returns the windows downloaded.
+        """
+        jobs = []
+        for pair in pairs:
+            for missing_start, missing_end in self.store.get_missing_ranges(
+                pair=pair,
+                interval=interval,
+                start=start,
+                end=end
+            ):
+                jobs.append((pair, interval, missing_start, missing_end))
+        if not jobs:
+            return []
+        for job, data in self.downloader.download_many(jobs).items():
+            pair, interval, missing_start, missing_end = job
+            self.store_range(pair, interval, missing_start, missing_end, data)
+        return [
+            (pair, missing_start, missing_end)
+            for pair, _, missing_start, missing_end in jobs
+        ]
+
+    def update(
+        self,
+        pair: str,
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime]
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Downloads the missing parts of a window.
+
+        Returns the windows downloaded.
+        """
+        return [
+            (missing_start, missing_end)
+            for _, missing_start, missing_end in self.update_pairs(
+                pairs=[pair],
+                interval=interval,
+                start=start,
+                end=end
+            )
+        ]
+
+    def load(
+        self,
+        pair: str,
+        interval: str,
+        start: Union[str, datetime],
+        end: Union[str, datetime]
+    ) -> pd.DataFrame:
+        """
+        Loads candles from start to end (both included)
+        downloading only what is missing.
+        """
+        self.update(pair=pair, interval=interval, start=start, end=end)
+        return self.store.read(
+            pair=pair,
+            interval=interval,
+            start=start,
+            end=end,
+            check_range=False
+        )
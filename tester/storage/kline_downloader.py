@@ -0,0 +1,231 @@
+import time
+import threading
+import pandas as pd
+from binance.client import Client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from storage.klines import (
+    klines_to_dataframe,
+    interval_to_timedelta
+)
+
+
+Job = Tuple[str, str, pd.Timestamp, pd.Timestamp]
+
+
+class TokenBucket():
+    """
+    Limits the request weight sent to Binance.
+
+    The bucket starts full with capacity tokens and is
+    refilled continuously, capacity tokens per period.
+
+    Init Attributes:
+    capacity: Max weight that can be spent at once
+    period: Seconds to refill the whole bucket
+    """
+
+    def __init__(
+        self,
+        capacity: float = 2400,
+        period: float = 60
+    ) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self) -> None:
+        """
+        Adds tokens generated since last update
+        """
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(
+            self.capacity,
+            self.tokens + elapsed * self.capacity / self.period
+        )
+        self.updated_at = now
+
+    def acquire(self, weight: float = 1) -> None:
+        """
+        Waits until weight tokens are available and
+        spends them.
+        """
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                missing = weight - self.tokens
+            time.sleep(missing * self.period / self.capacity)
+
+    def drain(self) -> None:
+        """
+        Empties the bucket, used when Binance warns
+        the limit was reached.
+        """
+        with self.lock:
+            self.refill()
+            self.tokens = 0
+
+
+class KlineDownloader():
+    """
+    Downloads historical klines splitting date windows into
+    chunks of one request each and fetching them concurrently
+    in a thread pool.
+
+    Request weight is budgeted with a token bucket and failed
+    chunks are retried with exponential backoff.
+
+    Init Attributes:
+    client: Binance client, any object with a futures_klines
+            method works (useful for offline tests)
+    max_workers: Threads fetching chunks at the same time
+    chunk_candles: Candles requested per chunk (max 1500)
+    bucket: Token bucket of request weight
+    max_retries: Times a chunk is retried before failing
+    retry_wait: Seconds to wait before first retry
+    verbose: Print actions
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        max_workers: int = 4,
+        chunk_candles: int = 1500,
+        bucket: TokenBucket = None,
+        max_retries: int = 3,
+        retry_wait: float = 1.0,
+        verbose: bool = False
+    ) -> None:
+        self.client = client
+        self.max_workers = max_workers
+        self.chunk_candles = chunk_candles
+        self.bucket = bucket or TokenBucket()
+        self.max_retries = max_retries
+        self.retry_wait = retry_wait
+        self.verbose = verbose
+
+    def print_message(self, message: str) -> None:
+        """
+        Prints messages if verbose is True
+        """
+        if self.verbose:
+            print(message)
+
+    def get_weight(self, limit: int) -> int:
+        """
+        Request weight of futures klines endpoint
+        depending on limit.
+        """
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+
+    def split_range(
+        self,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Splits a window (both dates included) into chunks
+        of chunk_candles candles.
+        """
+        chunk = interval_to_timedelta(interval) * self.chunk_candles
+        chunks = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(end, chunk_start + chunk - pd.Timedelta(1, "ms"))
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + pd.Timedelta(1, "ms")
+        return chunks
+
+    def fetch_chunk(
+        self,
+        pair: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp
+    ) -> List[list]:
+        """
+        Fetches the klines of a chunk retrying on errors.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire(self.get_weight(self.chunk_candles))
+            try:
+                return self.client.futures_klines(
+                    symbol=pair,
+                    interval=interval,
+                    startTime=start.value // 10**6,
+                    endTime=end.value // 10**6,
+                    limit=self.chunk_candles
+                )
+            except Exception as error:
+                if attempt == self.max_retries:
+                    raise
+                if getattr(error, "status_code", None) in (418, 429):
+                    self.bucket.drain()
+                self.print_message(
+                    "Retrying chunk {} {} from {}: {}".format(
+                        pair, interval, start, repr(error)
+                    )
+                )
+                time.sleep(self.retry_wait * 2 ** attempt)
+
+    def download_many(self, jobs: List[Job]) -> Dict[Job, pd.DataFrame]:
+        """
+        Downloads several windows (pair, interval, start, end)
+        sharing the same pool and request budget.
+
+        Returns a dataframe per window.
+        """
+        chunks = []
+        for job in jobs:
+            pair, interval, start, end = job
+            for chunk_start, chunk_end in self.split_range(
+                interval, start, end
+            ):
+                chunks.append((job, pair, interval, chunk_start, chunk_end))
+
+        self.print_message(
+            "Downloading {} chunks with {} workers...".format(
+                len(chunks), self.max_workers
+            )
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(self.fetch_chunk, pair, interval, start, end)
+                for _, pair, interval, start, end in chunks
+            ]
+            results = [future.result() for future in futures]
+
+        bars = {job: [] for job in jobs}
+        for (job, *_), chunk_bars in zip(chunks, results):
+            bars[job].extend(chunk_bars)
+        response = dict()
+        for job, job_bars in bars.items():
+            data = klines_to_dataframe(job_bars)
+            response[job] = data[~data.index.duplicated(keep="last")]
+        return response
+
+    def download(
+        self,
+        pair: str,
+        interval: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp
+    ) -> pd.DataFrame:
+        """
+        Downloads candles from start to end (both included)
+        """
+        job = (pair, interval, start, end)
+        return self.download_many([job])[job]
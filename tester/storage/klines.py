@@ -0,0 +1,47 @@
+import pandas as pd
+from typing import List
+
+
+KLINE_COLUMNS = [
+    "Open Time", "Open", "High", "Low", "Close", "Volume",
+    "Close Time", "Quote Asset Volume", "Number of Trades",
+    "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume",
+    "Ignore"
+]
+
+USE_COLUMNS = [
+    "Date", "Open", "High", "Low", "Close", "Volume",
+    "Quote Asset Volume", "Number of Trades",
+    "Taker Buy Base Asset Volume", "Taker Buy Quote Asset Volume"
+]
+
+
+def klines_to_dataframe(bars: List[list]) -> pd.DataFrame:
+    """
+    Converts klines returned by Binance API into
+    a dataframe indexed by Date with numeric columns.
+    """
+    data = pd.DataFrame(bars, columns=KLINE_COLUMNS)
+    data["Date"] = pd.to_datetime(data["Open Time"], unit="ms")
+    data = data[USE_COLUMNS].copy()
+    data.set_index("Date", inplace=True)
+    for column in data.columns:
+        data[column] = pd.to_numeric(data[column], errors="coerce")
+    return data
+
+
+def interval_to_timedelta(interval: str) -> pd.Timedelta:
+    """
+    Converts a Binance interval like 1m, 4h or 1d into
+    a timedelta. Months (1M) are considered of 30 days.
+    """
+    units = {
+        "m": "minutes",
+        "h": "hours",
+        "d": "days",
+        "w": "weeks",
+    }
+    number, unit = int(interval[:-1]), interval[-1]
+    if unit == "M":
+        return pd.Timedelta(days=30 * number)
+    return pd.Timedelta(**{units[unit]: number})
@@ -1,2 +1,3 @@
 # from .rnn import RNN # noqa
-from .bbs import BollingerBands # noqa
\ No newline at end of file
+from .bbs import BollingerBands # noqa
+from .rolling_window import RollingWindow # noqa
\ No newline at end of file
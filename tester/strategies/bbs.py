@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 from orders import Position
 from typing import Union
 from datetime import datetime
+from strategies.rolling_window import RollingWindow
 
 
 class BollingerBands():
@@ -32,24 +34,103 @@ class BollingerBands():
         self.BBS_lower = self.BBS + "|Lower"
         self.SMA = prefix + "|SMA|" + str(periods)
         self.last_position = Position.NEUTRAL
+        self.columns = [
+            self.column, self.SMA, self.BBS_lower,
+            self.BBS_upper, self.BBS_distance
+        ]
+        self.arrays = None
+        self.size = 0
+        self.window = None
+        self.last_row = None
+
+    def get_row(
+        self,
+        index: Union[datetime, pd.Timestamp] = None,
+        row: int = None
+    ) -> int:
+        """
+        Gets position of row, given directly or
+        by its index.
+        """
+        if row is None:
+            row = self.data.index.get_loc(index)
+        return row
 
     def enough_info_to_predict(
         self,
-        index: Union[datetime, pd.Timestamp]
+        index: Union[datetime, pd.Timestamp] = None,
+        row: int = None
     ) -> bool:
         """
         Tells if position can be predicted
         """
-        idx_num = self.data.index.get_loc(index)
-        return idx_num + 1 >= self.periods
+        return self.get_row(index=index, row=row) + 1 >= self.periods
+
+    def load_arrays(self) -> None:
+        """
+        Caches columns of strategy as arrays, strategy
+        reads them by position.
+        """
+        self.arrays = {
+            column: self.data[column].to_numpy(dtype=np.float64, copy=True)
+            for column in self.columns
+        }
+        self.size = len(self.data)
+        self.window = None
+        self.last_row = None
+
+    def ensure_capacity(self, rows: int) -> None:
+        """
+        Grows arrays (doubling them) so they fit rows
+        of data, new rows are nan.
+        """
+        if self.arrays is None:
+            self.arrays = {
+                column: np.empty(0, dtype=np.float64)
+                for column in self.columns
+            }
+        size = len(self.arrays[self.column])
+        if size >= rows:
+            return
+        new_size = max(rows, 2 * size)
+        for column, array in self.arrays.items():
+            grown = np.full(new_size, np.nan)
+            grown[:size] = array
+            self.arrays[column] = grown
+
+    def load_rows(self) -> None:
+        """
+        Copies rows appended to data since last call into
+        arrays: values of column, and values of strategy
+        columns already in data (nan otherwise).
+        """
+        rows = len(self.data)
+        self.ensure_capacity(rows)
+        for column in self.columns:
+            if column in self.data.columns:
+                self.arrays[column][self.size:rows] = (
+                    self.data[column].to_numpy(dtype=np.float64)[self.size:]
+                )
+        self.size = rows
+
+    def write_columns(self) -> None:
+        """
+        Writes strategy columns of arrays into data,
+        a whole column at a time. Call it when data
+        needs the values of calculate_for_row (e.g.
+        at the end of a backtest).
+        """
+        for column in self.columns[1:]:
+            self.data[column] = self.arrays[column][:len(self.data)].copy()
 
     def calculate(self, force: bool = False) -> None:
         """Calculates strategy for all dataframe"""
         if self.BBS_distance in self.data.columns and not force:
+            self.load_arrays()
             return
 
+        SM = self.data[self.column].rolling(self.periods)
         if self.SMA not in self.data.columns or force:
-            SM = self.data[self.column].rolling(self.periods)
             self.data[self.SMA] = SM.mean()
 
         std_dev = SM.std()
@@ -58,44 +139,95 @@ class BollingerBands():
         self.data[
             self.BBS_distance
         ] = self.data[self.column] - self.data[self.SMA]
+        self.load_arrays()
 
     def calculate_for_row(
         self,
-        index: Union[datetime, pd.Timestamp]
+        index: Union[datetime, pd.Timestamp] = None,
+        row: int = None
     ) -> None:
-        """Calculate strategy for some row using index"""
-        index_num = self.data.index.get_loc(index)
-        SM = self.data[self.column][
-            index_num+1-self.periods:index_num+1
-        ].rolling(self.periods)
-        std_dev = SM.std().iloc[-1]
-        sma = SM.mean().iloc[-1]
-
-        self.data.loc[index, self.SMA] = sma
-        self.data.loc[index, self.BBS_lower] = sma - std_dev * self.dev
-        self.data.loc[index, self.BBS_upper] = sma + std_dev * self.dev
-        self.data.loc[
-            index, self.BBS_distance
-        ] = self.data.loc[index, self.column] - sma
+        """
+        Calculate strategy for some row, given by its
+        index or its position (faster).
+
+        Rows are expected in order (e.g. new candles of a
+        stream), then each row costs O(1) with a rolling
+        window. Otherwise window is rebuilt from arrays.
+
+        Values are only stored in arrays, rows appended
+        to data are read when reached. Use write_columns
+        to store them in data.
+        """
+        row = self.get_row(index=index, row=row)
+        if row >= self.size:
+            self.load_rows()
+        arrays = self.arrays
+        values = arrays[self.column]
+        if self.window is None or row != self.last_row + 1:
+            self.window = RollingWindow(self.periods)
+            for value in values[max(0, row+1-self.periods):row].tolist():
+                self.window.push(value)
+        value = values.item(row)
+        self.window.push(value)
+        self.last_row = row
+
+        sma = self.window.get_mean()
+        std_dev = self.window.get_std()
+        arrays[self.SMA][row] = sma
+        arrays[self.BBS_lower][row] = sma - std_dev * self.dev
+        arrays[self.BBS_upper][row] = sma + std_dev * self.dev
+        arrays[self.BBS_distance][row] = value - sma
 
     def strategy(
         self,
-        index: Union[datetime, pd.Timestamp]
+        index: Union[datetime, pd.Timestamp] = None,
+        row: int = None
     ) -> Position:
-        '''Returns predicted position'''
-        if not self.enough_info_to_predict(index=index):
+        '''
+        Returns predicted position of a row, given by
+        its index or its position (faster).
+        '''
+        idx_num = self.get_row(index=index, row=row)
+        if not self.enough_info_to_predict(row=idx_num):
             self.last_position = Position.NEUTRAL
             return self.last_position
-        idx_num = self.data.index.get_loc(index)
+        if self.arrays is None:
+            self.load_arrays()
+        arrays = self.arrays
 
-        curr_value = self.data.loc[index, self.column]
-        prev_distance = self.data[self.BBS_distance].iloc[idx_num-1]
-        distance = self.data[self.BBS_distance].iloc[idx_num]
+        curr_value = arrays[self.column][idx_num]
+        prev_distance = arrays[self.BBS_distance][idx_num-1]
+        distance = arrays[self.BBS_distance][idx_num]
 
-        if curr_value < self.data.loc[index, self.BBS_lower]:
+        if curr_value < arrays[self.BBS_lower][idx_num]:
             self.last_position = Position.LONG
-        elif curr_value > self.data.loc[index, self.BBS_upper]:
+        elif curr_value > arrays[self.BBS_upper][idx_num]:
             self.last_position = Position.SHORT
         elif distance * prev_distance < 0:
             self.last_position = Position.NEUTRAL
         return self.last_position
+
+    def positions(self) -> np.ndarray:
+        """
+        Returns predicted positions of all rows at once
+        (1 LONG, -1 SHORT, 0 NEUTRAL), same as calling
+        strategy row by row.
+        """
+        self.calculate()
+        value = self.data[self.column].to_numpy()
+        distance = self.data[self.BBS_distance].to_numpy()
+        prev_distance = np.concatenate(([np.nan], distance[:-1]))
+
+        positions = pd.Series(np.nan, index=self.data.index)
+        crossed = distance * prev_distance < 0
+        positions[crossed] = Position.NEUTRAL.value
+        positions[value > self.data[self.BBS_upper].to_numpy()] = (
+            Position.SHORT.value
+        )
+        positions[value < self.data[self.BBS_lower].to_numpy()] = (
+            Position.LONG.value
+        )
+        positions.iloc[:self.periods - 1] = Position.NEUTRAL.value
+        return positions.ffill().fillna(
+            Position.NEUTRAL.value
+        ).to_numpy(dtype=np.int8)
@@ -1,3 +1,5 @@
+import os
+import hashlib
 import pandas as pd
 from orders import Position
 from pydantic import (
@@ -5,13 +7,15 @@ from pydantic import (
     ConfigDict
 )
 import keras
-from typing import List, Union
+from typing import Dict, List, Union
 from pickle import load
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from keras import Sequential
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime
 import pandas_ta as ta
+from helpers import get_file_hash
 
 
 class RNN(BaseModel):
@@ -29,6 +33,13 @@ class RNN(BaseModel):
     columns_filename_dir: File where columns are stored
     last_position: stores last position
     column_name: Column where prediction is saved
+    batch_size: Windows predicted at once, bounds memory used
+                by calculate
+    cache_dir: If provided, predictions of calculate are stored
+            there keyed by model, scalers and data, so tests
+            with the same model and data skip inference
+    arrays: Close and prediction columns cached as arrays,
+            strategy reads them by position
 
     Post-Init Attributes:
     model: Architecture of model
@@ -48,12 +59,15 @@ class RNN(BaseModel):
     columns_filename_dir: str = None
     last_position: Position = Position.NEUTRAL
     column_name: str = "rnn"
+    batch_size: int = 1024
+    cache_dir: str = None
 
     model: Sequential = None
     scaler: StandardScaler = None
     scaler_obj: StandardScaler = None
     timestamps: int = None
     columns_to_use: List[str] = ['Close']
+    arrays: Dict[str, np.ndarray] = None
 
     def load_model(self) -> None:
         """
@@ -82,33 +96,94 @@ class RNN(BaseModel):
         """
         return row + 1 >= self.timestamps
 
+    def get_windows(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Gets the timeseries of every row as a strided view
+        of inputs (nothing is copied), with shape
+        (rows - timestamps + 1, timestamps, columns).
+        """
+        return sliding_window_view(
+            inputs, self.timestamps, axis=0
+        ).transpose(0, 2, 1)
+
+    def predict_windows(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Predicts windows in batches of batch_size, only
+        one batch is copied to memory at a time.
+        """
+        predictions = np.empty(len(windows), dtype=np.float64)
+        for start in range(0, len(windows), self.batch_size):
+            batch = np.ascontiguousarray(
+                windows[start:start + self.batch_size]
+            )
+            predictions[start:start + len(batch)] = np.asarray(
+                self.model.predict_on_batch(batch)
+            ).flatten()
+        return predictions
+
+    def get_cache_filename(self, inputs: np.ndarray) -> str:
+        """
+        Gets file of cached predictions, named by a hash of
+        model and scaler files, columns used, data range
+        and scaled inputs.
+        """
+        key = hashlib.sha256()
+        for filename in (self.model_dir, self.scaler_dir, self.scaler_obj_dir):
+            key.update(get_file_hash(filename).encode())
+        key.update(str(list(self.columns_to_use)).encode())
+        if len(self.data):
+            key.update("{}|{}|{}".format(
+                self.data.index[0], self.data.index[-1], len(self.data)
+            ).encode())
+        key.update(np.ascontiguousarray(inputs).tobytes())
+        return os.path.join(self.cache_dir, key.hexdigest() + ".npy")
+
     def calculate(self, force=False) -> None:
         """
         1. Gets data and scales it
-        2. Prepares timeseries
-        3. Predicts position for each timeseries
+        2. Prepares timeseries (strided views)
+        3. Predicts position for each timeseries in batches
         4. Unscale result
         5. Put info in dataframe
+
+        If cache_dir is provided, steps 2 to 4 are skipped
+        when predictions of same model and data are stored.
         """
         if self.column_name in self.data.columns and not force:
+            self.load_arrays()
             return
 
-        inputs = self.data[self.columns_to_use].copy()
-        inputs = self.scaler.transform(inputs)
-
-        X = []
-        for i in range(self.timestamps, len(inputs)+1):
-            X.append(inputs[i-self.timestamps:i])
-        X = np.array(X)
+        inputs = self.scaler.transform(self.data[self.columns_to_use])
+        filename = None
+        if self.cache_dir:
+            filename = self.get_cache_filename(inputs)
 
-        predicted_position = np.concatenate((
-            [np.nan]*(self.timestamps-1), self.model.predict(
-                X, verbose=0
+        if filename and os.path.exists(filename):
+            prediction = np.load(filename)
+        else:
+            predicted_position = np.full(len(inputs), np.nan)
+            if len(inputs) >= self.timestamps:
+                predicted_position[self.timestamps-1:] = (
+                    self.predict_windows(self.get_windows(inputs))
+                )
+            prediction = self.scaler_obj.inverse_transform(
+                predicted_position.reshape(-1, 1)
             ).flatten()
-        ))
-        self.data[self.column_name] = self.scaler_obj.inverse_transform(
-            predicted_position.reshape(-1, 1)
-        )
+            if filename:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.save(filename, prediction)
+
+        self.data[self.column_name] = prediction
+        self.load_arrays()
+
+    def load_arrays(self) -> None:
+        """
+        Caches Close and prediction columns as arrays
+        """
+        self.arrays = {
+            column: self.data[column].to_numpy(dtype=np.float64, copy=True)
+            for column in ("Close", self.column_name)
+        }
 
     def calculate_for_row(
         self,
@@ -129,22 +204,36 @@ class RNN(BaseModel):
                 predicted_position.reshape(-1, 1)
             )[0]
         )
+        if (
+            self.arrays is not None
+            and len(self.arrays["Close"]) == len(self.data)
+        ):
+            self.arrays[self.column_name][index_num] = (
+                self.data[self.column_name].iat[index_num]
+            )
+        else:
+            self.arrays = None
 
     def strategy(
         self,
-        index: Union[datetime, pd.Timestamp]
+        index: Union[datetime, pd.Timestamp] = None,
+        row: int = None
     ) -> Position:
         '''
-        Returns predicted position for a row.
+        Returns predicted position for a row, given by
+        its index or its position (faster).
         '''
-        idx_num = self.data.index.get_loc(index)
+        idx_num = row
+        if idx_num is None:
+            idx_num = self.data.index.get_loc(index)
         if not self.enough_info_to_predict(row=idx_num):
             self.last_position = Position.NEUTRAL
             return self.last_position
-        prev_index = self.data.index[idx_num-1]
-        current_price = self.data.loc[index, "Close"]
-        previous_prediction = self.data.loc[prev_index, self.column_name]
-        current_prediction = self.data.loc[index, self.column_name]
+        if self.arrays is None:
+            self.load_arrays()
+        current_price = self.arrays["Close"][idx_num]
+        previous_prediction = self.arrays[self.column_name][idx_num-1]
+        current_prediction = self.arrays[self.column_name][idx_num]
         diff = current_price - previous_prediction
         real_prediction = current_prediction + diff
 
@@ -155,3 +244,16 @@ class RNN(BaseModel):
         else:
             self.last_position = Position.NEUTRAL
         return self.last_position
+
+    def positions(self) -> np.ndarray:
+        """
+        Returns predicted positions of all rows at once
+        (1 LONG, -1 SHORT, 0 NEUTRAL), same as calling
+        strategy row by row.
+        """
+        self.calculate()
+        prediction = self.data[self.column_name].to_numpy()
+        change = np.diff(prediction, prepend=np.nan)
+        positions = np.sign(np.nan_to_num(change)).astype(np.int8)
+        positions[:self.timestamps - 1] = Position.NEUTRAL.value
+        return positions
@@ -0,0 +1,86 @@
+import math
+
+
+class RollingWindow():
+    """
+    Mean and sample standard deviation of the last periods
+    values, updated in O(1) per new value.
+
+    Values are kept in a ring buffer and statistics are
+    updated with Welford's algorithm (adding the new value
+    and removing the oldest one). Each time the buffer wraps
+    around, statistics are recomputed from it so rounding
+    errors do not accumulate over long streams.
+
+    Init Attributes:
+    periods: Size of window
+
+    Attributes:
+    buffer: Last values (ring buffer)
+    position: Where next value is stored in buffer
+    count: Values in window (at most periods)
+    mean: Mean of window
+    M2: Sum of squared differences from the mean
+    """
+    __slots__ = ("periods", "buffer", "position", "count", "mean", "M2")
+
+    def __init__(self, periods: int) -> None:
+        self.periods = periods
+        self.buffer = [0.0] * periods
+        self.position = 0
+        self.count = 0
+        self.mean = 0.0
+        self.M2 = 0.0
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Tells if window has periods values
+        """
+        return self.count == self.periods
+
+    def push(self, value: float) -> None:
+        """
+        Adds a value, removing the oldest one if
+        window is full.
+        """
+        if self.is_full:
+            old_value = self.buffer[self.position]
+            old_mean = self.mean
+            self.mean += (value - old_value) / self.periods
+            self.M2 += (value - old_value) * (
+                value - self.mean + old_value - old_mean
+            )
+        else:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.M2 += delta * (value - self.mean)
+        self.buffer[self.position] = value
+        self.position = (self.position + 1) % self.periods
+        if self.position == 0 and self.is_full:
+            self.recompute()
+
+    def recompute(self) -> None:
+        """
+        Recomputes statistics from buffer
+        """
+        self.mean = math.fsum(self.buffer) / self.periods
+        self.M2 = math.fsum((value - self.mean) ** 2 for value in self.buffer)
+
+    def get_mean(self) -> float:
+        """
+        Gets mean, nan until window is full
+        """
+        if not self.is_full:
+            return math.nan
+        return self.mean
+
+    def get_std(self) -> float:
+        """
+        Gets sample standard deviation (ddof=1),
+        nan until window is full
+        """
+        if not self.is_full or self.periods < 2:
+            return math.nan
+        return math.sqrt(max(self.M2, 0.0) / (self.periods - 1))
@@ -1,6 +1,6 @@
 from binance_api import BinanceAPI
 from typing import Any
-import pandas as pd
+from engine import Bar
 
 
 class Tester(BinanceAPI):
@@ -16,7 +16,7 @@ class Tester(BinanceAPI):
 
     def run_strategy(
         self,
-        bar: pd.Series,
+        bar: Bar,
         strategy: Any
     ) -> Any:
         """
@@ -9,6 +9,17 @@ class Tester(BinanceAPI):
     """
     This class includes test methods
     """
+    def prepare_indicators(self) -> None:
+        """
+        Adds Bollinger Bands columns of params to data.
+        """
+        BollingerBands(
+            data=self.data,
+            dev=self.params.get("dev", 2),
+            periods=self.params.get("periods", 50),
+            column="Close",
+        ).calculate()
+
     def prepare_strategy(self) -> Any:
         """
         Prepare the strategy and return it.
@@ -16,10 +27,21 @@ class Tester(BinanceAPI):
         strategy = dict()
         strategy["strategy"] = BollingerBands(
             data=self.data,
-            dev=2,
-            periods=50,
+            dev=self.params.get("dev", 2),
+            periods=self.params.get("periods", 50),
             column="Close",
         )
+        strategy["period"] = self.params.get("period", 24)
+        strategy["offset"] = self.params.get("offset", 0.05)
+        strategy["center"] = self.features.rolling(
+            column="Close", periods=strategy["period"], function="mean"
+        )
+        strategy["low"] = self.features.rolling(
+            column="Low", periods=strategy["period"], function="min"
+        )
+        strategy["high"] = self.features.rolling(
+            column="High", periods=strategy["period"], function="max"
+        )
         strategy["strategy"].calculate()
         return strategy
 
@@ -36,13 +58,13 @@ class Tester(BinanceAPI):
         if self.order_manager.currently_neutral:
             self.remove_limit_orders()
 
-        idx_num = self.data.index.get_loc(bar["Date"])
-        period = 24
-        center_of_period = self.data[max(0, idx_num+1-period):idx_num+1]["Close"].mean()
-        low_of_period = min(self.data[max(0, idx_num+1-period):idx_num+1]["Low"])
-        high_of_period = max(self.data[max(0, idx_num+1-period):idx_num+1]["High"])
+        idx_num = bar.position
+        offset = strategy["offset"]
+        center_of_period = self.features.get(strategy["center"], idx_num)
+        low_of_period = self.features.get(strategy["low"], idx_num)
+        high_of_period = self.features.get(strategy["high"], idx_num)
 
-        predicted_pos = strategy["strategy"].strategy(index=bar["Date"])
+        predicted_pos = strategy["strategy"].strategy(row=idx_num)
 
         if predicted_pos == Position.LONG and self.order_manager.currently_neutral:
             strategy["invest"] = self.max_invest(consider_closing=False) / 10
@@ -52,7 +74,7 @@ class Tester(BinanceAPI):
                 wallet_prc=False,
                 go_neutral_first=False,
                 order_type="LIMIT",
-                expected_exec_quote=low_of_period + abs(center_of_period - low_of_period) * 0.05
+                expected_exec_quote=low_of_period + abs(center_of_period - low_of_period) * offset
             )
 
         elif predicted_pos == Position.SHORT and self.order_manager.currently_neutral:
@@ -63,14 +85,14 @@ class Tester(BinanceAPI):
                 wallet_prc=False,
                 go_neutral_first=False,
                 order_type="LIMIT",
-                expected_exec_quote=high_of_period - abs(center_of_period - high_of_period) * 0.05
+                expected_exec_quote=high_of_period - abs(center_of_period - high_of_period) * offset
             )
         elif predicted_pos == Position.NEUTRAL and not self.order_manager.currently_neutral:
             self.remove_limit_orders()
             if self.order_manager.currently_long:
-                execution = high_of_period - abs(center_of_period - high_of_period) * 0.05
+                execution = high_of_period - abs(center_of_period - high_of_period) * offset
             else:
-                execution= low_of_period + abs(center_of_period - low_of_period) * 0.05
+                execution= low_of_period + abs(center_of_period - low_of_period) * offset
             self.go_neutral(
                bar=bar,
                order_type="LIMIT",
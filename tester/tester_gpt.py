@@ -22,6 +22,18 @@ class Tester(BinanceAPI):
             'wait': 0,  # Cantidad de iteraciones a esperar
             'curr_level': 0  # Guarda el nivel actual
         }
+        strategy["change_24h"] = self.features.pct_change(
+            column="Close", hours=24
+        )
+        strategy["mean_24"] = self.features.rolling(
+            column="Close", periods=24, function="mean"
+        )
+        strategy["low_24"] = self.features.rolling(
+            column="Low", periods=24, function="min"
+        )
+        strategy["high_24"] = self.features.rolling(
+            column="High", periods=24, function="max"
+        )
         return strategy
 
     def get_investment_proportion(self, number: float, resistance_levels: list, investment_proportions: list, threshold: float) -> float:
@@ -66,20 +78,16 @@ class Tester(BinanceAPI):
 
         Returns strategy.
         """
-        date_prev_24h = bar["Date"] - pd.Timedelta(hours=24)
-        try:
-            prev24h_bar = self.data.loc[date_prev_24h]
-        except KeyError:
+        percent_change_24h = self.features.get(
+            strategy["change_24h"], bar.position
+        )
+        if pd.isna(percent_change_24h):
             return strategy
+
+        mean_of_period = self.features.get(strategy["mean_24"], bar.position)
+        low_of_period = self.features.get(strategy["low_24"], bar.position)
+        high_of_period = self.features.get(strategy["high_24"], bar.position)
         
-        idx_num = self.data.index.get_loc(bar["Date"])
-        period = 24
-        mean_of_period = self.data[max(0, idx_num+1-period):idx_num+1]["Close"].mean()
-        low_of_period = min(self.data[max(0, idx_num+1-period):idx_num+1]["Low"])
-        high_of_period = max(self.data[max(0, idx_num+1-period):idx_num+1]["High"])
-        
-        # Calcular el cambio porcentual en el precio durante las últimas 24 horas
-        percent_change_24h = (bar['Close'] - prev24h_bar['Close']) / prev24h_bar['Close'] * 100
         # if bar['Close'] > prev24h_bar['Close']:
         #     percent_change_24h = (bar['High'] - prev24h_bar['Low']) / prev24h_bar['Low'] * 100
         # else:
@@ -19,6 +19,9 @@ class Tester(BinanceAPI):
             'investment_proportions': [0.06, 0.02, 0.02, 0.02],  # Proporciones de inversión según la importancia de la resistencia
             'take_profit_threshold': 2  # Umbral de ROI para tomar ganancias y cerrar la posición
         }
+        strategy["change_24h"] = self.features.pct_change(
+            column="Close", hours=24
+        )
         return strategy
 
     def get_investment_proportion(self, price: float, resistance_levels: list, investment_proportions: list, threshold: float) -> float:
@@ -52,14 +55,11 @@ class Tester(BinanceAPI):
 
         Returns strategy.
         """
-        date_prev_24h = bar["Date"] - pd.Timedelta(hours=24)
-        try:
-            prev24h_bar = self.data.loc[date_prev_24h]
-        except KeyError:
+        percent_change_24h = self.features.get(
+            strategy["change_24h"], bar.position
+        )
+        if pd.isna(percent_change_24h):
             return strategy
-        
-        # Calcular el cambio porcentual en el precio durante las últimas 24 horas
-        percent_change_24h = (bar['Close'] - prev24h_bar['Close']) / prev24h_bar['Close'] * 100
 
         # Criterio de salida basado en el ROI
         if not self.order_manager.currently_neutral:
@@ -20,6 +20,9 @@ class Tester(BinanceAPI):
             'percent_change_proximity': 0.05,  # Umbral de proximidad para el cierre basado en el porcentaje de cambio
             'wait': 0  # Cantidad de iteraciones a esperar 
         }
+        strategy["change_24h"] = self.features.pct_change(
+            column="Close", hours=24
+        )
         return strategy
 
     def get_investment_proportion(self, number: float, resistance_levels: list, investment_proportions: list, threshold: float) -> float:
@@ -55,14 +58,11 @@ class Tester(BinanceAPI):
         Returns strategy.
         """
         self.remove_limit_orders() 
-        date_prev_24h = bar["Date"] - pd.Timedelta(hours=24)
-        try:
-            prev24h_bar = self.data.loc[date_prev_24h]
-        except KeyError:
+        percent_change_24h = self.features.get(
+            strategy["change_24h"], bar.position
+        )
+        if pd.isna(percent_change_24h):
             return strategy
-        
-        # Calcular el cambio porcentual en el precio durante las últimas 24 horas
-        percent_change_24h = (bar['Close'] - prev24h_bar['Close']) / prev24h_bar['Close'] * 100
         # if bar['Close'] > prev24h_bar['Close']:
         #     percent_change_24h = (bar['High'] - prev24h_bar['Low']) / prev24h_bar['Low'] * 100
         # else:
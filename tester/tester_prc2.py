@@ -16,6 +16,9 @@ class Tester(BinanceAPI):
         strategy = dict()
         strategy["strategy"] = {7.5: 20}
         strategy["stop"] = False
+        strategy["change_24h"] = self.features.pct_change(
+            column="Close", hours=24
+        )
         return strategy
 
     def run_strategy(
@@ -29,12 +32,11 @@ class Tester(BinanceAPI):
 
         Returns strategy.
         """
-        date_prev_24h = bar["Date"] - pd.Timedelta(hours=24)
-        try:
-            prev24h_bar = self.data.loc[date_prev_24h]
-        except KeyError:
+        chg24h = self.features.get(
+            strategy["change_24h"], bar.position
+        )
+        if pd.isna(chg24h):
             return strategy
-        chg24h = (bar["Close"] - prev24h_bar["Close"])/prev24h_bar["Close"] * 100
 
         if self.order_manager.currently_neutral:
             strategy["min_invest"] = self.max_invest(consider_closing=False) / 100
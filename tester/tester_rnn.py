@@ -60,7 +60,7 @@ class Tester(BinanceAPI):
         # if abs(low_of_period - high_of_period) / center_of_period < 0.01:
         #     return strategy
 
-        predicted_pos = strategy["RNN"].strategy(index=bar["Date"])
+        predicted_pos = strategy["RNN"].strategy(row=bar.position)
 
         if self.order_manager.currently_neutral:
             if predicted_pos == Position.LONG:
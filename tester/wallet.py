@@ -1,5 +1,5 @@
+import pandas as pd
 from helpers import NO_MONEY
-from typing import List
 
 
 class Wallet():
@@ -10,13 +10,24 @@ class Wallet():
     initial_balance: Initial balance quote. For example, in BTCUSDT,
                     this indicates x USDT you have initially
     balance: is the current balance quote
-    history: Stores the balance history
+    recorder: History recorder of the simulation using the
+            wallet, see engine/history.py
     """
 
     def __init__(self) -> None:
         self.initial_balance: float = 0
         self.balance: float = 0
-        self.history: List[float] = []
+        self.recorder = None
+
+    @property
+    def history(self) -> pd.Series:
+        """
+        Gets the balance (NAV) history recorded, one row
+        per candle (read-only).
+        """
+        if self.recorder is None:
+            return pd.Series(dtype=float, name="nav")
+        return self.recorder.to_frame()["nav"]
 
     def cant_spend_msg(
         self,